@@ -0,0 +1,136 @@
+"""
+Keep one local server on one model for as long as there is work for it.
+
+players.json gives nearly every seat its own model, and LM Studio on one
+machine holds only a few resident. A parallel fan-out (every seat's opening
+statement, every vote) then makes the server load and unload models in
+whatever order the requests happen to arrive, and a swap costs far more than
+the generation behind it.
+
+`--model-affinity` puts a ModelAffinity gate in front of the backend. The
+model with requests in flight is the resident one. More requests for it go
+straight through, requests for any other model wait, and when the resident
+model's last request finishes the gate moves to the model that has been
+waiting longest and lets all of its requests through together. Each seat's
+prompt is built before it reaches the gate, so waiting changes when a reply
+arrives, never what the seat was shown.
+
+Without the flag the gate admits everything and only counts, so the swap
+counter in the stats compares the two modes.
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Callable, Deque, Dict, Optional
+
+
+class ModelAffinity:
+    """Groups requests by model. Thread-safe; threads (turn) and coroutines
+    (turn_async) share one queue."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.resident: Optional[str] = None
+        self.swaps = 0
+        self.calls = 0
+        self.waited_s = 0.0
+        self._last: Optional[str] = None
+        self._runs: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._active = 0
+        # model -> wake callbacks, models in the order they started waiting
+        self._waiting: "OrderedDict[str, Deque[Callable[[], None]]]" = OrderedDict()
+
+    @contextmanager
+    def turn(self, model: str):
+        """Hold the server on `model` around one request."""
+        granted = threading.Event()
+        queued = time.monotonic()
+        with self._lock:
+            admitted = self._enter(model, granted.set)
+        if not admitted:
+            granted.wait()
+            self._waited(queued)
+        try:
+            yield
+        finally:
+            self._leave()
+
+    @asynccontextmanager
+    async def turn_async(self, model: str):
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(None))
+
+        queued = time.monotonic()
+        with self._lock:
+            admitted = self._enter(model, wake)
+        if not admitted:
+            try:
+                await granted
+            except asyncio.CancelledError:
+                with self._lock:
+                    queue = self._waiting.get(model)
+                    if queue is not None and wake in queue:
+                        queue.remove(wake)
+                        if not queue:
+                            del self._waiting[model]
+                    else:
+                        # admitted just as we were cancelled: give the turn back
+                        self._release()
+                raise
+            self._waited(queued)
+        try:
+            yield
+        finally:
+            self._leave()
+
+    def _enter(self, model: str, wake: Callable[[], None]) -> bool:
+        # Caller holds self._lock
+        if not self.enabled or self._active == 0 or model == self.resident:
+            self._admit(model)
+            return True
+        self._waiting.setdefault(model, deque()).append(wake)
+        return False
+
+    def _admit(self, model: str):
+        if self._last is not None and model != self._last:
+            self.swaps += 1
+        if model != self._last:
+            self._runs[model] = self._runs.get(model, 0) + 1
+        self._last = model
+        self.calls += 1
+        self.resident = model
+        self._active += 1
+
+    def _leave(self):
+        with self._lock:
+            self._release()
+
+    def _release(self):
+        # Caller holds self._lock
+        self._active -= 1
+        if self._active or not self._waiting:
+            return
+        model, queue = self._waiting.popitem(last=False)
+        for wake in queue:
+            self._admit(model)
+            wake()
+
+    def _waited(self, queued: float):
+        with self._lock:
+            self.waited_s += time.monotonic() - queued
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "mode": "affinity" if self.enabled else "arrival",
+                "calls": self.calls,
+                "swaps": self.swaps,
+                "runs": dict(self._runs),
+                "waited_s": round(self.waited_s, 1),
+            }
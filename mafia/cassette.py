@@ -0,0 +1,138 @@
+"""
+Record a game's model traffic once, replay it offline as often as you like.
+
+`--record cassette.jsonl` appends one line per answered request: model,
+messages, max_tokens and the reply text, plus a header with the seed the game
+was played with. `--replay cassette.jsonl` serves those replies back with no
+network, so a full game re-runs in seconds. That is the regression check for
+sanitize_response, extract_vote and event emission that otherwise costs
+hundreds of paid calls.
+
+A replayed game asks the same questions only as long as it takes the same
+path, and parallel fan-outs finish in whatever order they finish. Each reply
+is therefore filed under two keys. The exact key is a hash of the whole
+request. The loose key is the same hash with the game history cut out of the
+system prompt: same seat, same model, same task. An exact match is served
+first, then the oldest unused loose match. Repeated requests are served in
+recording order under either key.
+"""
+import hashlib
+import json
+import threading
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Deque, Dict, List, Optional
+
+# Everything after this in a system prompt is game history (game.py's layout)
+HISTORY_MARKER = "### CURRENT GAME STATE"
+
+
+class CassetteMiss(RuntimeError):
+    """Replay was asked something the recording never saw."""
+
+
+def _digest(model: str, messages: List[Dict], max_tokens: Optional[int]) -> str:
+    blob = json.dumps(
+        {"model": model, "messages": messages, "max_tokens": max_tokens},
+        sort_keys=True, ensure_ascii=False,
+    )
+    return hashlib.sha256(blob.encode()).hexdigest()[:24]
+
+
+def request_key(model: str, messages: List[Dict], max_tokens: Optional[int]) -> str:
+    return _digest(model, messages, max_tokens)
+
+
+def loose_key(model: str, messages: List[Dict], max_tokens: Optional[int]) -> str:
+    trimmed = [
+        {**m, "content": (m.get("content") or "").split(HISTORY_MARKER)[0]}
+        for m in messages
+    ]
+    return _digest(model, trimmed, max_tokens)
+
+
+class Cassette:
+    def __init__(self, path: Path, replaying: bool, seed: Optional[int] = None):
+        self.path = Path(path)
+        self.replaying = replaying
+        self.seed = seed
+        self._lock = threading.Lock()
+        self._replies: List[str] = []
+        self._used: List[bool] = []
+        self._exact: Dict[str, Deque[int]] = defaultdict(deque)
+        self._loose: Dict[str, Deque[int]] = defaultdict(deque)
+        self.recorded = 0
+        self.hits = 0
+        self.loose_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def record_to(cls, path: Path, seed: int) -> "Cassette":
+        cassette = cls(path, replaying=False, seed=seed)
+        with open(cassette.path, "w") as f:
+            f.write(json.dumps({"cassette": 1, "seed": seed}) + "\n")
+        return cassette
+
+    @classmethod
+    def load(cls, path: Path) -> "Cassette":
+        cassette = cls(path, replaying=True)
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if "cassette" in entry:
+                    cassette.seed = entry.get("seed")
+                    continue
+                index = len(cassette._replies)
+                cassette._replies.append(entry["reply"])
+                cassette._used.append(False)
+                cassette._exact[entry["key"]].append(index)
+                cassette._loose[entry["loose_key"]].append(index)
+        return cassette
+
+    def record(self, model: str, messages: List[Dict], max_tokens: Optional[int], reply: str):
+        line = json.dumps({
+            "key": request_key(model, messages, max_tokens),
+            "loose_key": loose_key(model, messages, max_tokens),
+            "model": model,
+            "max_tokens": max_tokens,
+            "messages": messages,
+            "reply": reply,
+        }, ensure_ascii=False)
+        with self._lock, open(self.path, "a") as f:
+            f.write(line + "\n")
+            self.recorded += 1
+
+    def _take(self, queue: Deque[int]) -> Optional[int]:
+        while queue:
+            index = queue.popleft()
+            if not self._used[index]:
+                self._used[index] = True
+                return index
+        return None
+
+    def play(self, model: str, messages: List[Dict], max_tokens: Optional[int]) -> str:
+        with self._lock:
+            index = self._take(self._exact[request_key(model, messages, max_tokens)])
+            if index is not None:
+                self.hits += 1
+                return self._replies[index]
+            index = self._take(self._loose[loose_key(model, messages, max_tokens)])
+            if index is not None:
+                self.loose_hits += 1
+                return self._replies[index]
+            self.misses += 1
+        raise CassetteMiss(f"no recorded reply for this {model} request in {self.path.name}")
+
+    def stats(self) -> Dict:
+        if not self.replaying:
+            return {"mode": "record", "file": self.path.name, "recorded": self.recorded}
+        return {
+            "mode": "replay",
+            "file": self.path.name,
+            "hits": self.hits,
+            "loose_hits": self.loose_hits,
+            "misses": self.misses,
+            "unused": self._used.count(False),
+        }
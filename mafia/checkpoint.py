@@ -0,0 +1,72 @@
+"""
+Pick up an aborted game where it stopped.
+
+When the backend goes away mid-game (the quota window ran out, the network
+dropped), main.py exits 2. That used to throw away every call the game had
+already paid for. Now MafiaGame writes a checkpoint after each phase it
+completes (day, vote, night), and `main.py --resume CHECKPOINT` rebuilds the
+game from it and carries on with the next phase.
+
+A checkpoint holds everything a later phase reads: the players with their
+roles and who is alive, the event stream and console logs, vote and night-kill
+histories, private notes, day recaps, the detective's and doctor's memory, and
+the game's seed and random generator state. GM narration that was still being
+written when the phase ended is saved as the call to make, and made again on
+resume, so the narration keeps running alongside the game instead of being
+waited for at every phase boundary.
+
+The file is written to a temp file and renamed into place, so a crash while
+saving leaves the previous checkpoint intact.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+
+# 2: log lines carry the public flag they were written with
+CHECKPOINT_VERSION = 2
+
+# A game round, in order. A checkpoint names the last one that completed.
+PHASES = ("day", "vote", "night")
+
+
+def default_path(output: Union[str, Path]) -> Path:
+    """Where a game writing its log to `output` keeps its checkpoint."""
+    output = Path(output)
+    return output.with_name(f"{output.stem}.checkpoint.json")
+
+
+def next_phase(state: Dict) -> int:
+    """Index into PHASES of the phase a resumed game plays first."""
+    return (PHASES.index(state["phase"]) + 1) % len(PHASES)
+
+
+def rng_state(state: Tuple) -> List:
+    """Random.getstate() as JSON."""
+    version, internal, gauss_next = state
+    return [version, list(internal), gauss_next]
+
+
+def rng_restore(saved: List) -> Tuple:
+    """The other way, for Random.setstate()."""
+    version, internal, gauss_next = saved
+    return version, tuple(internal), gauss_next
+
+
+def save(path: Union[str, Path], state: Dict):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def load(path: Union[str, Path]) -> Dict:
+    with open(path) as f:
+        state = json.load(f)
+    if state.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"checkpoint version {state.get('version')!r}, expected {CHECKPOINT_VERSION}")
+    if state.get("phase") not in PHASES:
+        raise ValueError(f"unknown phase {state.get('phase')!r}")
+    return state
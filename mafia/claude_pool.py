@@ -0,0 +1,254 @@
+"""
+Warm `claude` CLI processes, so a call doesn't pay Node startup and auth.
+
+Every `claude -p` spends a second or two booting before it sends anything, and
+a 10-player game makes hundreds of calls. The pool keeps a few processes per
+model alias already started in stream-json input mode, idling on stdin; a call
+takes one, writes its request as one JSON line and reads the reply back.
+
+A worker answers ONE request and is then recycled. A stream-json session keeps
+its history, so a second request on the same process would see the first —
+one seat's role and private notes in another seat's context. Recycling costs
+nothing on the critical path: the replacement is spawned the moment a spare is
+taken, and boots while the taken one works.
+
+The session's system prompt is fixed when the process starts, before anyone
+knows what the call will be, so pooled calls carry the game's system prompt
+at the top of the user turn instead. That is a different prompt shape from
+one-shot `claude -p`, which is why the pool is opt-in (`--claude-pool`).
+
+Workers print partial messages, so a name-only call (`--stream-names`) can
+read the reply as it is written and kill the worker once it has said enough.
+"""
+import json
+import subprocess
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+# Fixed at spawn; the real per-call instructions ride in the user turn.
+POOL_SYSTEM_PROMPT = (
+    "You are a text generator for a Mafia party game. Each message opens with "
+    "an <instructions> block: follow it exactly, as if it were your system "
+    "prompt, and reply to the request after it.\n\n"
+    "Never use markdown formatting: no headers, no bold, no bullet points. "
+    "Reply in plain sentences only."
+)
+
+# A spare older than this is replaced rather than used: an idle CLI can sit on
+# an expired login, and a fresh one costs nothing the caller waits on.
+MAX_SPARE_AGE = 600.0
+
+
+def worker_command(alias: str) -> List[str]:
+    return [
+        "claude", "-p",
+        "--input-format", "stream-json",
+        "--output-format", "stream-json",
+        "--verbose",
+        "--include-partial-messages",
+        "--model", alias,
+        "--system-prompt", POOL_SYSTEM_PROMPT,
+        "--tools", "",
+        "--setting-sources", "",
+        "--strict-mcp-config",
+        "--no-session-persistence",
+    ]
+
+
+def pooled_prompt(messages: List[Dict]) -> str:
+    return (
+        "<instructions>\n" + messages[0]["content"] + "\n</instructions>\n\n"
+        + messages[-1]["content"]
+    )
+
+
+class PartialReply:
+    """Follows one stream-json reply line by line. With `early_stop`, the text
+    so far is offered to it after every delta; once it returns the reply to
+    keep, the caller can stop reading and kill the process."""
+
+    def __init__(self, early_stop: Optional[Callable[[str], Optional[str]]] = None):
+        self.early_stop = early_stop
+        self.model: Optional[str] = None
+        self.result: Optional[Dict] = None
+        self.kept: Optional[str] = None
+        self._text: List[str] = []
+
+    def feed(self, raw: str) -> bool:
+        """Take one output line; True once there is nothing more to wait for."""
+        try:
+            message = json.loads(raw)
+        except json.JSONDecodeError:
+            return False
+        kind = message.get("type")
+        if kind == "system" and message.get("subtype") == "init":
+            self.model = message.get("model")
+        elif kind == "stream_event":
+            event = message.get("event") or {}
+            delta = event.get("delta") or {}
+            if event.get("type") == "content_block_delta" and delta.get("type") == "text_delta":
+                self._text.append(delta.get("text", ""))
+                if self.early_stop:
+                    self.kept = self.early_stop("".join(self._text))
+                    return self.kept is not None
+        elif kind == "result":
+            self.result = message
+            return True
+        return False
+
+    def payload(self) -> Dict:
+        """The `result` message, or a stand-in shaped like one when the reply
+        was cut short (the init line named the model; there is no API time)."""
+        if self.result is not None:
+            return self.result
+        return {
+            "result": self.kept or "",
+            "modelUsage": {self.model: {}} if self.model else {},
+            "stopped_early": True,
+        }
+
+
+class ClaudeWorker:
+    """One warm CLI process, good for a single request."""
+
+    def __init__(self, alias: str):
+        self.alias = alias
+        self.born = time.time()
+        # Not a pipe: nothing reads stderr while a spare idles, and a chatty
+        # CLI would fill the pipe and hang. A file takes it all.
+        self.stderr = tempfile.TemporaryFile(mode="w+")
+        self.proc = subprocess.Popen(
+            worker_command(alias),
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=self.stderr,
+            text=True, bufsize=1,
+        )
+
+    def healthy(self) -> bool:
+        return self.proc.poll() is None and time.time() - self.born < MAX_SPARE_AGE
+
+    def ask(
+        self, prompt: str, timeout: float = 180,
+        early_stop: Optional[Callable[[str], Optional[str]]] = None,
+    ) -> Dict:
+        """Send one request and return the CLI's final `result` message (see
+        PartialReply for an `early_stop` cut)."""
+        line = json.dumps({"type": "user", "message": {"role": "user", "content": prompt}})
+        timer = threading.Timer(timeout, self.proc.kill)
+        timer.start()
+        reply = PartialReply(early_stop)
+        try:
+            self.proc.stdin.write(line + "\n")
+            # EOF after the one request: the CLI answers it and exits
+            self.proc.stdin.close()
+            for raw in self.proc.stdout:
+                if reply.feed(raw):
+                    if reply.kept is not None:
+                        self.kill()  # single-use anyway; stop the generation
+                    return reply.payload()
+        finally:
+            timer.cancel()
+            self.close()
+            stderr = self._read_stderr()
+        raise RuntimeError(stderr or f"claude worker exited {self.proc.returncode} without a result")
+
+    def _read_stderr(self) -> str:
+        """What the process printed to stderr; closes the file."""
+        if self.stderr.closed:
+            return ""
+        self.stderr.seek(0)
+        text = self.stderr.read().strip()
+        self.stderr.close()
+        return text
+
+    def close(self):
+        if self.proc.poll() is None:
+            try:
+                self.proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+                self.proc.wait()
+
+    def kill(self):
+        if self.proc.poll() is None:
+            self.proc.kill()
+            self.proc.wait()
+        self.stderr.close()
+
+
+class ClaudePool:
+    """Warm spares per model alias. Thread-safe; call() blocks its caller."""
+
+    def __init__(self, spares: int = 2):
+        self.spares = max(1, spares)
+        self._idle: Dict[str, List[ClaudeWorker]] = {}
+        # Spares being spawned, counted so two warm() calls don't both top up
+        self._spawning: Dict[str, int] = {}
+        self._closed = False
+        # Guards the lists only: spawning and killing happen outside it, so a
+        # call taking a spare never waits on another process starting
+        self._lock = threading.Lock()
+        self.recycled = 0  # spares discarded by the health check
+        self.cold_starts = 0  # calls that found no healthy spare
+
+    def warm(self, alias: str):
+        """Top the alias up to `spares` idle processes."""
+        with self._lock:
+            pending = self._spawning.get(alias, 0)
+            needed = self.spares - len(self._idle.setdefault(alias, [])) - pending
+            if needed <= 0 or self._closed:
+                return
+            self._spawning[alias] = pending + needed
+        for _ in range(needed):
+            try:
+                worker = ClaudeWorker(alias)
+            except Exception:
+                with self._lock:
+                    self._spawning[alias] -= 1
+                raise
+            with self._lock:
+                self._spawning[alias] -= 1
+                keep = not self._closed
+                if keep:
+                    self._idle[alias].append(worker)
+            if not keep:
+                worker.kill()
+
+    def _take(self, alias: str) -> ClaudeWorker:
+        stale = []
+        with self._lock:
+            idle = self._idle.setdefault(alias, [])
+            worker = None
+            while idle:
+                spare = idle.pop(0)
+                if spare.healthy():
+                    worker = spare
+                    break
+                stale.append(spare)
+            self.recycled += len(stale)
+            if worker is None:
+                self.cold_starts += 1
+        for spare in stale:
+            spare.kill()
+        return worker or ClaudeWorker(alias)
+
+    def call(
+        self, alias: str, messages: List[Dict], timeout: float = 180,
+        early_stop: Optional[Callable[[str], Optional[str]]] = None,
+    ) -> Dict:
+        worker = self._take(alias)
+        # The replacement boots while this one works
+        self.warm(alias)
+        return worker.ask(pooled_prompt(messages), timeout=timeout, early_stop=early_stop)
+
+    def stats(self) -> Dict:
+        return {"recycled": self.recycled, "cold_starts": self.cold_starts}
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            workers = [w for idle in self._idle.values() for w in idle]
+            self._idle.clear()
+        for worker in workers:
+            worker.kill()
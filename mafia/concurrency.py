@@ -0,0 +1,189 @@
+"""
+How many model requests a game keeps in flight, found by feel (AIMD).
+
+A local LM Studio box saturates at two or three parallel generations (past
+that each one just gets slower), while NVIDIA or the Claude CLI take many
+more. Rather than guess a --max-workers per backend, the limit starts low,
+adds one slot after every window of calls that came back clean and no slower
+than usual while the limit was actually full, and halves as soon as the
+backend pushes back: a 429 or 5xx, a timeout, or a window whose calls ran at
+twice their usual latency.
+
+"Usual" is the uncontended latency, tracked per call size (max_tokens), since
+a 48-token vote and a 2048-token speech say nothing about each other's speed.
+
+A fixed --max-workers N is the same gate pinned at N.
+"""
+import asyncio
+import re
+import statistics
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+AUTO_INITIAL = 2
+AUTO_MAXIMUM = 16
+# A window's median latency, relative to the usual for each call's size,
+# past which the backend counts as overloaded
+LATENCY_SPIKE = 2.0
+MIN_WINDOW = 4
+
+OVERLOAD = re.compile(r"\b(429|5\d\d)\b|rate.?limit|overloaded|timed out|timeout", re.IGNORECASE)
+
+
+class ConcurrencyLimit:
+    """An in-flight gate whose size moves with the backend. Thread-safe; one
+    queue serves threads (slot) and coroutines (slot_async) in arrival order."""
+
+    def __init__(
+        self,
+        initial: int = AUTO_INITIAL,
+        minimum: int = 1,
+        maximum: int = AUTO_MAXIMUM,
+        on_change: Optional[Callable[[int, str], None]] = None,
+    ):
+        self.limit = max(minimum, min(initial, maximum))
+        self.minimum = minimum
+        self.maximum = maximum
+        self.on_change = on_change
+        self.peak = 0
+        self.decisions: List[Dict] = []
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._waiters: Deque[Callable[[], None]] = deque()
+        self._window: List[Tuple[int, float]] = []
+        self._window_full = False
+        self._usual: Dict[int, float] = {}
+        self._epoch = 0
+        self._start = time.monotonic()
+
+    @classmethod
+    def fixed(cls, size: int) -> "ConcurrencyLimit":
+        return cls(initial=size, minimum=size, maximum=size)
+
+    @property
+    def adaptive(self) -> bool:
+        return self.minimum != self.maximum
+
+    @contextmanager
+    def slot(self, size: int = 0):
+        """Hold one in-flight slot around a request of `size` max_tokens."""
+        granted = threading.Event()
+        with self._lock:
+            self._waiters.append(granted.set)
+            self._grant()
+        granted.wait()
+        epoch, started = self._epoch, time.monotonic()
+        try:
+            yield
+        except BaseException as error:
+            self._finish(epoch, size, started, error)
+            raise
+        self._finish(epoch, size, started, None)
+
+    @asynccontextmanager
+    async def slot_async(self, size: int = 0):
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(None))
+
+        with self._lock:
+            self._waiters.append(wake)
+            self._grant()
+        try:
+            await granted
+        except asyncio.CancelledError:
+            with self._lock:
+                if wake in self._waiters:
+                    self._waiters.remove(wake)
+                else:
+                    # granted just as we were cancelled: hand the slot on
+                    self._in_flight -= 1
+                    self._grant()
+            raise
+        epoch, started = self._epoch, time.monotonic()
+        try:
+            yield
+        except BaseException as error:
+            self._finish(epoch, size, started, error)
+            raise
+        self._finish(epoch, size, started, None)
+
+    def _grant(self):
+        # Caller holds self._lock
+        while self._waiters and self._in_flight < self.limit:
+            self._in_flight += 1
+            self.peak = max(self.peak, self._in_flight)
+            if self._in_flight >= self.limit:
+                self._window_full = True
+            self._waiters.popleft()()
+
+    def _finish(self, epoch: int, size: int, started: float, error: Optional[BaseException]):
+        elapsed = time.monotonic() - started
+        with self._lock:
+            self._in_flight -= 1
+            decision = None
+            if self.adaptive:
+                decision = self._learn(epoch, size, elapsed, error)
+            self._grant()
+        if decision and self.on_change:
+            self.on_change(*decision)
+
+    def _learn(self, epoch, size, elapsed, error) -> Optional[Tuple[int, str]]:
+        if error is not None:
+            # Only the first push-back from calls sent under the current
+            # limit counts; the rest of that cohort was already in the air.
+            if OVERLOAD.search(str(error)) and epoch == self._epoch:
+                return self._set(max(self.minimum, self.limit // 2), f"backend pushed back: {str(error)[:60]}")
+            return None
+
+        self._window.append((size, elapsed))
+        if len(self._window) < max(MIN_WINDOW, self.limit):
+            return None
+        window, self._window = self._window, []
+        full, self._window_full = self._window_full, self._in_flight >= self.limit
+        ratios = [t / self._usual[s] for s, t in window if self._usual.get(s)]
+        slowdown = statistics.median(ratios) if ratios else 1.0
+        for s, t in window:
+            # The uncontended speed: follow a faster call at once. A slower
+            # one only counts from a window that never filled the limit (then
+            # the backend itself got slower, not our load on it), or when
+            # there is no load left to shed.
+            usual = self._usual.get(s)
+            if usual is None or t < usual:
+                self._usual[s] = t
+            elif not full or self.limit == self.minimum:
+                self._usual[s] = 0.8 * usual + 0.2 * t
+        if slowdown >= LATENCY_SPIKE:
+            return self._set(max(self.minimum, self.limit // 2), f"latency x{slowdown:.1f} of usual")
+        if full and self.limit < self.maximum:
+            return self._set(self.limit + 1, "clean window at the limit")
+        return None
+
+    def _set(self, limit: int, reason: str) -> Optional[Tuple[int, str]]:
+        if limit == self.limit:
+            return None
+        if limit < self.limit:
+            self._epoch += 1
+        self._window = []
+        self.limit = limit
+        self.decisions.append({
+            "at_s": round(time.monotonic() - self._start, 1),
+            "limit": limit,
+            "reason": reason,
+        })
+        return limit, reason
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "mode": "auto" if self.adaptive else "fixed",
+                "limit": self.limit,
+                "range": [self.minimum, self.maximum],
+                "peak_in_flight": self.peak,
+                "decisions": list(self.decisions),
+            }
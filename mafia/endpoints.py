@@ -0,0 +1,282 @@
+"""
+Spread one game's LM Studio calls over several OpenAI-compatible servers.
+
+`--lm-studio-url http://a:1234/v1,http://b:1234/v1` builds an EndpointPool,
+and the game talks to it through client() / async_client(), which quack like
+OpenAI() / AsyncOpenAI() as far as call_llm is concerned
+(`.chat.completions.create`). Each request goes to the healthy endpoint with
+the fewest requests outstanding, so a slow box collects less work instead of
+an equal share.
+
+An endpoint that fails EJECT_AFTER times in a row (no connection, a timeout or
+a 5xx) is ejected for EJECT_FOR seconds. After that it is on probation: one
+request at a time goes to it as its health check, success puts it back in
+rotation, failure ejects it again. A 429 only backs the endpoint off for its
+Retry-After (BACK_OFF_FOR without one); any other 4xx is the request's fault,
+not the server's. A request that could not connect at all is retried on the
+next endpoint straight away. Per-endpoint counters go into the game stats.
+
+A streamed request (--stream-names) is still outstanding after create()
+returns: its endpoint is counted busy until the stream has been read to the
+end or closed, and an error while reading it counts against the endpoint.
+"""
+import threading
+import time
+from typing import Dict, List, Optional
+
+from openai import AsyncOpenAI, OpenAI
+
+from mafia.ratelimit import retry_after
+
+EJECT_AFTER = 3
+EJECT_FOR = 30.0
+# How long a 429 without a Retry-After keeps requests off the endpoint
+BACK_OFF_FOR = 5.0
+
+
+def _unreachable(error: Exception) -> bool:
+    # APIConnectionError / APITimeoutError: the request never got an answer,
+    # so another server can take it without anything having been generated
+    return type(error).__name__ in ("APIConnectionError", "APITimeoutError")
+
+
+def _status(error: Exception) -> Optional[int]:
+    return getattr(error, "status_code", None)
+
+
+class Endpoint:
+    def __init__(self, url: str, api_key: str):
+        self.url = url
+        # No SDK retries: an unreachable box should hand the request to the
+        # next one now, and call_llm already backs off 429s and 5xx itself
+        self.client = OpenAI(base_url=url, api_key=api_key, max_retries=0)
+        self._api_key = api_key
+        self._async_client: Optional[AsyncOpenAI] = None
+        self.outstanding = 0
+        self.calls = 0
+        self.errors = 0
+        self.failures_in_a_row = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+        self.backed_off_until = 0.0
+        self.backoffs = 0
+        # Ejected and not yet back: one request at a time, the health check
+        self.probation = False
+        self.probing = False
+        self.busy_s = 0.0
+
+    def ready_at(self) -> float:
+        return max(self.ejected_until, self.backed_off_until)
+
+    def available(self, now: float) -> bool:
+        return self.ready_at() <= now and not self.probing
+
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        if self._async_client is None:
+            self._async_client = AsyncOpenAI(base_url=self.url, api_key=self._api_key, max_retries=0)
+        return self._async_client
+
+
+class EndpointPool:
+    def __init__(self, urls: List[str], api_key: str = "lm-studio"):
+        self.endpoints = [Endpoint(url, api_key) for url in urls]
+        self._lock = threading.Lock()
+
+    def _pick(self, tried: List[Endpoint]) -> Optional[Endpoint]:
+        with self._lock:
+            now = time.monotonic()
+            untried = [e for e in self.endpoints if e not in tried]
+            if not untried:
+                return None
+            healthy = [e for e in untried if e.available(now)]
+            # Everyone ejected: ask the one closest to coming back rather than
+            # failing a seat outright
+            pool = healthy or [min(untried, key=lambda e: (e.probing, e.ready_at()))]
+            endpoint = min(pool, key=lambda e: (e.outstanding, e.calls))
+            endpoint.outstanding += 1
+            endpoint.calls += 1
+            endpoint.probing = endpoint.probing or endpoint.probation
+            return endpoint
+
+    def _eject(self, endpoint: Endpoint):
+        # Caller holds self._lock
+        endpoint.ejected_until = time.monotonic() + EJECT_FOR
+        endpoint.ejections += 1
+        endpoint.probation = True
+
+    def _done(self, endpoint: Endpoint, started: float, error: Optional[Exception]):
+        with self._lock:
+            endpoint.outstanding -= 1
+            endpoint.busy_s += time.monotonic() - started
+            endpoint.probing = False
+            status = _status(error) if error is not None else None
+            if error is not None:
+                endpoint.errors += 1
+            if status == 429:
+                endpoint.backed_off_until = time.monotonic() + (retry_after(error) or BACK_OFF_FOR)
+                endpoint.backoffs += 1
+                return
+            if error is None or (status is not None and status < 500):
+                # It answered: whatever was wrong with the request, the box is up
+                endpoint.failures_in_a_row = 0
+                endpoint.ejected_until = 0.0
+                endpoint.probation = False
+                return
+            endpoint.failures_in_a_row += 1
+            if endpoint.probation or endpoint.failures_in_a_row >= EJECT_AFTER:
+                self._eject(endpoint)
+
+    def create(self, **kwargs):
+        tried: List[Endpoint] = []
+        while True:
+            endpoint = self._pick(tried)
+            tried.append(endpoint)
+            started = time.monotonic()
+            try:
+                response = endpoint.client.chat.completions.create(**kwargs)
+            except Exception as error:
+                self._done(endpoint, started, error)
+                if _unreachable(error) and len(tried) < len(self.endpoints):
+                    continue
+                raise
+            if kwargs.get("stream"):
+                return _Stream(self, endpoint, started, response)
+            self._done(endpoint, started, None)
+            return response
+
+    async def create_async(self, **kwargs):
+        tried: List[Endpoint] = []
+        while True:
+            endpoint = self._pick(tried)
+            tried.append(endpoint)
+            started = time.monotonic()
+            try:
+                response = await endpoint.async_client.chat.completions.create(**kwargs)
+            except Exception as error:
+                self._done(endpoint, started, error)
+                if _unreachable(error) and len(tried) < len(self.endpoints):
+                    continue
+                raise
+            if kwargs.get("stream"):
+                return _AsyncStream(self, endpoint, started, response)
+            self._done(endpoint, started, None)
+            return response
+
+    def client(self) -> "_PoolClient":
+        return _PoolClient(self.create)
+
+    def async_client(self) -> "_PoolClient":
+        return _PoolClient(self.create_async, close=self.close_async)
+
+    async def close_async(self):
+        for endpoint in self.endpoints:
+            if endpoint._async_client is not None:
+                await endpoint._async_client.close()
+                endpoint._async_client = None
+
+    def health_check(self, timeout: float = 3.0) -> Dict[str, Optional[str]]:
+        """List models on every endpoint; eject the ones that don't answer.
+        Returns url -> None when healthy, else the error."""
+        results: Dict[str, Optional[str]] = {}
+        for endpoint in self.endpoints:
+            try:
+                endpoint.client.with_options(timeout=timeout).models.list()
+                results[endpoint.url] = None
+            except Exception as error:
+                with self._lock:
+                    self._eject(endpoint)
+                results[endpoint.url] = str(error)
+        return results
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                e.url: {
+                    "calls": e.calls,
+                    "errors": e.errors,
+                    "ejections": e.ejections,
+                    "backoffs": e.backoffs,
+                    "mean_latency_s": round(e.busy_s / e.calls, 2) if e.calls else None,
+                }
+                for e in self.endpoints
+            }
+
+
+class _PoolClient:
+    """Just enough of the OpenAI client surface for call_llm: chat.completions.create."""
+
+    def __init__(self, create, close=None):
+        self.chat = self
+        self.completions = self
+        self.create = create
+        self._close = close
+
+    async def close(self):
+        if self._close:
+            await self._close()
+
+
+class _Stream:
+    """A streamed response that keeps its endpoint outstanding until it has
+    been read to the end or closed."""
+
+    def __init__(self, pool: EndpointPool, endpoint: Endpoint, started: float, stream):
+        self._pool = pool
+        self._endpoint = endpoint
+        self._started = started
+        self._stream = stream
+        self._finished = False
+
+    def _finish(self, error: Optional[Exception]):
+        if not self._finished:
+            self._finished = True
+            self._pool._done(self._endpoint, self._started, error)
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+    def __iter__(self):
+        try:
+            yield from self._stream
+        except Exception as error:
+            self._finish(error)
+            raise
+        self._finish(None)
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            self._finish(None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _AsyncStream(_Stream):
+    async def __aiter__(self):
+        try:
+            async for chunk in self._stream:
+                yield chunk
+        except Exception as error:
+            self._finish(error)
+            raise
+        self._finish(None)
+
+    async def close(self):
+        try:
+            await self._stream.close()
+        finally:
+            self._finish(None)
+
+    aclose = close
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
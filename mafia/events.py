@@ -7,8 +7,14 @@ events that a web viewer can dramatize. One place owns the schema.
 This is the source of truth. It is mirrored in `viewer/lib/events.ts`; the two
 are kept in sync by `tools/make_sample_log.py` (check_schema_parity), which
 fails if the event-type lists drift apart.
+
+EventLog indexes events by day, type and actor as they are appended, and keeps
+the views the game reads on every call (each day's public transcript lines,
+who is alive, each day's ballots, the episode timeline) current the same way,
+so reading one never means rescanning the whole log.
 """
-from typing import Dict, List
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
 
 # Per-seat avatar colors, assigned by seat index.
 PALETTE = [
@@ -42,11 +48,60 @@ def seat_color(seat: int) -> str:
     return PALETTE[seat % len(PALETTE)]
 
 
+def transcript_line(event: Dict) -> Optional[str]:
+    """How an event reads in the day's discussion transcript, if it does."""
+    t = event["type"]
+    if t == "statement":
+        return f"{event['actor']}: {event['text']}"
+    if t == "question":
+        return f"{event['actor']} → {event['target']}: {event['text']}"
+    if t == "answer":
+        return f"{event['actor']} (to {event['target']}): {event['text']}"
+    if t == "accusation":
+        return f"{event['actor']} accuses: {event['text']}"
+    if t == "vote":
+        return f"{event['actor']} votes {event['target']}"
+    return None
+
+
+def timeline_line(event: Dict) -> Optional[str]:
+    """How an event reads in the episode recap's timeline, if it does."""
+    t = event["type"]
+    if t == "elimination":
+        return f"Day {event['day']}: the town voted out {event['target']} — they were {event.get('role', '?')}."
+    if t == "night_kill" and not event.get("saved"):
+        return f"Night {event['day']}: the mafia killed {event['target']} — they were {event.get('role', '?')}."
+    if t == "save" or (t == "night_kill" and event.get("saved")):
+        return f"Night {event['day']}: the mafia struck, but the Doctor saved {event['target']}."
+    if t == "night_no_kill":
+        return f"Night {event['day']}: nobody died."
+    return None
+
+
 class EventLog:
-    """Append-only ordered list of validated event dicts."""
+    """Append-only ordered list of validated event dicts, with indexes and
+    views maintained on append. Lists handed out are the live ones: read,
+    don't modify."""
 
     def __init__(self) -> None:
         self.events: List[Dict] = []
+        self._by_day: Dict[Optional[int], List[Dict]] = defaultdict(list)
+        self._by_type: Dict[str, List[Dict]] = defaultdict(list)
+        self._by_actor: Dict[str, List[Dict]] = defaultdict(list)
+        self._transcript: Dict[Optional[int], List[str]] = defaultdict(list)
+        self._ballots: Dict[Optional[int], Dict[str, str]] = defaultdict(dict)
+        self.alive: Set[str] = set()
+        self.timeline: List[str] = []
+        self.last_day = 0
+
+    @classmethod
+    def from_list(cls, events: Iterable[Dict]) -> "EventLog":
+        """Index a saved log's events as they stand (no validation: old logs
+        predate some of today's fields)."""
+        log = cls()
+        for event in events:
+            log._append(event)
+        return log
 
     def emit(self, type: str, **fields) -> Dict:
         if type not in REQUIRED:
@@ -55,12 +110,56 @@ class EventLog:
         if missing:
             raise ValueError(f"event {type!r} missing fields: {missing}")
         event = {"type": type, **fields}
-        self.events.append(event)
+        self._append(event)
         return event
 
+    def _append(self, event: Dict) -> None:
+        self.events.append(event)
+        t, day = event["type"], event.get("day")
+        self._by_day[day].append(event)
+        self._by_type[t].append(event)
+        if "actor" in event:
+            self._by_actor[event["actor"]].append(event)
+        self.last_day = max(self.last_day, day or 0)
+
+        line = transcript_line(event)
+        if line is not None:
+            self._transcript[day].append(line)
+        if t == "vote":
+            self._ballots[day][event["actor"]] = event["target"]
+        if t == "game_start":
+            self.alive = {p["name"] for p in event["players"]}
+        elif t == "elimination" or (t == "night_kill" and not event.get("saved")):
+            self.alive.discard(event["target"])
+        line = timeline_line(event)
+        if line is not None:
+            self.timeline.append(line)
+
     def to_list(self) -> List[Dict]:
         return self.events
 
+    def of_day(self, day: Optional[int]) -> List[Dict]:
+        return self._by_day.get(day, [])
+
+    def of_type(self, type: str) -> List[Dict]:
+        return self._by_type.get(type, [])
+
+    def of_actor(self, actor: str) -> List[Dict]:
+        return self._by_actor.get(actor, [])
+
+    def first(self, type: str) -> Optional[Dict]:
+        found = self._by_type.get(type)
+        return found[0] if found else None
+
+    def transcript(self, day: int) -> List[str]:
+        """The day's discussion, one rendered line per statement, question,
+        answer, accusation and vote, in order."""
+        return self._transcript.get(day, [])
+
+    def ballots(self, day: int) -> Dict[str, str]:
+        """voter -> target for the day's votes (a re-vote replaces the first)."""
+        return self._ballots.get(day, {})
+
 
 def demo() -> None:
     """Self-check: validation accepts good events and rejects bad ones."""
@@ -88,6 +187,13 @@ def demo() -> None:
     fallback = log.emit("vote", day=1, actor="PIP", target="RICO", defaulted=True)
     assert "defaulted" not in real
     assert fallback["defaulted"] is True
+
+    # The indexes and views track every append
+    assert [e["type"] for e in log.of_day(1)] == ["phase", "statement", "vote", "vote"]
+    assert log.of_actor("HOLMES") == [log.events[1], real]
+    assert log.transcript(1) == ["HOLMES: hi", "HOLMES votes RICO", "PIP votes RICO"]
+    assert log.ballots(1) == {"HOLMES": "RICO", "PIP": "RICO"} and log.transcript(2) == []
+    assert EventLog.from_list(log.to_list()).transcript(1) == log.transcript(1)
     print("events.py demo OK")
 
 
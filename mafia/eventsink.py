@@ -0,0 +1,171 @@
+"""
+The game on disk as it happens, one JSON line at a time.
+
+main.py used to hold the whole game in memory and write game_log.json only
+once it was over, so a crash lost all of it and nobody could follow a game in
+progress. EventSink appends to a .jsonl file every event MafiaGame emits and
+every console line it logs, flushing each record so that a reader tailing the
+file sees it at once. Forcing every line to the disk as well would cost more
+than the game writes, so fsync is batched: every `fsync_every` records, and
+on close (0 leaves it to the OS).
+
+Records, one per line:
+
+    {"seq": 12, "event": {...}}      an event, numbered from 0 in game order
+    {"amend": 0, "event": {...}}     event 0 rewritten after the fact
+    {"log": "...", "public": true}   a console line (public_log if public)
+    {"end": {"day", "stats", "episode"}}   the game finished
+
+compact() folds a file back into the game_log.json shape main.py writes, and
+tail() follows one that is still being written.
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+
+class EventSink:
+    """Append-only JSONL writer for one game. Lines may come from worker
+    threads; events come from the game's loop."""
+
+    def __init__(self, path: Union[str, Path], fsync_every: int = 0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fsync_every = fsync_every
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self.seq = 0
+        self.records = 0
+        self.fsyncs = 0
+
+    def backlog(self, events: List[Dict], game_log: List[str], log_public: List[bool]):
+        """Write what a resumed game already has: its events, and each log
+        line with the public flag it was written with."""
+        for event in events:
+            self.event(event)
+        for message, public in zip(game_log, log_public):
+            self.line(message, public)
+
+    def event(self, event: Dict):
+        with self._lock:
+            self._put({"seq": self.seq, "event": event})
+            self.seq += 1
+
+    def amend(self, seq: int, event: Dict):
+        """Event `seq` as it reads now (game_start once the models resolve)."""
+        with self._lock:
+            self._put({"amend": seq, "event": event})
+
+    def line(self, message: str, public: bool):
+        with self._lock:
+            self._put({"log": message, "public": public})
+
+    def end(self, day: int, stats: Dict, episode: Dict):
+        with self._lock:
+            self._put({"end": {"day": day, "stats": stats, "episode": episode}})
+
+    def _put(self, record: Dict):
+        # Caller holds self._lock
+        if self._file.closed:
+            return
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.records += 1
+        self._unsynced += 1
+        if self.fsync_every and self._unsynced >= self.fsync_every:
+            self._sync()
+
+    def _sync(self):
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self.fsyncs += 1
+
+    def close(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            if self.fsync_every and self._unsynced:
+                self._sync()
+            self._file.close()
+
+    def stats(self) -> Dict:
+        return {
+            "file": self.path.name,
+            "records": self.records,
+            "events": self.seq,
+            "fsync_every": self.fsync_every,
+            "fsyncs": self.fsyncs,
+        }
+
+
+def default_path(output: Union[str, Path]) -> Path:
+    """Where a game writing its log to `output` streams it meanwhile."""
+    output = Path(output)
+    return output.with_name(f"{output.stem}.events.jsonl")
+
+
+def _records(lines: Iterator[str]) -> Iterator[Dict]:
+    for line in lines:
+        try:
+            yield json.loads(line)
+        except ValueError:
+            continue  # the line a crash cut short
+
+
+def compact(path: Union[str, Path]) -> Dict:
+    """A .jsonl file as the game_log.json main.py writes. A game that never
+    finished has no stats or episode, and its last day from the events."""
+    log: Dict = {"events": [], "game_log": [], "public_log": [], "day": 0, "stats": None, "episode": {}}
+    with open(path, encoding="utf-8") as f:
+        for record in _records(f):
+            if "amend" in record:
+                log["events"][record["amend"]] = record["event"]
+            elif "event" in record:
+                log["events"].append(record["event"])
+                log["day"] = max(log["day"], record["event"].get("day") or 0)
+            elif "log" in record:
+                log["game_log"].append(record["log"])
+                if record["public"]:
+                    log["public_log"].append(record["log"])
+            elif "end" in record:
+                log.update(record["end"])
+    return log
+
+
+def tail(path: Union[str, Path], since: int = 0, follow: bool = True, poll: float = 0.2,
+         timeout: Optional[float] = None) -> Iterator[Dict]:
+    """Records from a .jsonl file in order, starting at the event numbered
+    `since` (a reader picking up where it left off). With follow it waits for
+    the file to appear and keeps reading as it grows, until the end record or
+    `timeout` seconds without a new one."""
+    path = Path(path)
+    started = since <= 0
+    idle_since = time.monotonic()
+    while not path.exists():
+        if not follow or (timeout is not None and time.monotonic() - idle_since > timeout):
+            return
+        time.sleep(poll)
+    with open(path, encoding="utf-8") as f:
+        partial = ""
+        while True:
+            chunk = f.readline()
+            if chunk:
+                partial += chunk
+                if not partial.endswith("\n"):
+                    continue  # the writer is mid-line
+                line, partial = partial, ""
+                idle_since = time.monotonic()
+                for record in _records([line]):
+                    started = started or record.get("seq", -1) >= since or "end" in record
+                    if started:
+                        yield record
+                    if "end" in record:
+                        return
+            elif not follow or (timeout is not None and time.monotonic() - idle_since > timeout):
+                return
+            else:
+                time.sleep(poll)
@@ -1,23 +1,43 @@
+import asyncio
+import contextvars
+import functools
 import gc
 import random
 import re
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import zlib
 from enum import Enum
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Any, AsyncIterator, Awaitable, Dict, Generator, List, Optional, Tuple, Union
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
+from mafia import checkpoint
+from mafia.affinity import ModelAffinity
+from mafia.concurrency import ConcurrencyLimit
+from mafia.endpoints import EndpointPool
 from mafia.events import EventLog, seat_color
+from mafia.eventsink import EventSink
 from mafia.game_master import (
+    RATE_LIMITS,
     RESOLVED_CLAUDE_MODELS,
+    EarlyStop,
     GameMaster,
     call_llm,
+    call_llm_async,
+    cassette_stats,
+    claude_overhead_summary,
     episode_inputs_from_events,
+    shared_budget_stats,
+    stream_summary,
 )
-from mafia.game_state import build_day_summary
+from mafia.game_state import DaySummaryCache, SharedContext, _is_word_char
+from mafia.liveserver import EventServer
+from mafia.narration import Narration, NarrationQueue
 from mafia.player import Player, Role, load_players_from_file
+from mafia.scheduler import GameScheduler
+from mafia.sanitize import ResponseSanitizer
 
 
 LM_STUDIO_URL = "http://localhost:1234/v1"
@@ -37,6 +57,14 @@ DEFAULT_GM_MODEL = "qwen/qwen3.5-9b"
 # finished and is worthless.
 MAX_CONSECUTIVE_FAILURES = 3
 
+# The SharedContext the calls of a fan-out read: the one of the moment it
+# started (see MafiaGame._start)
+_PINNED_CONTEXT: contextvars.ContextVar[Optional[SharedContext]] = contextvars.ContextVar(
+    "pinned_context", default=None,
+)
+
+NO_KILL_RE = re.compile(r"\b(?:no[ _]?kill|nokill|skip|pass|nobody|no one|none|don'?t kill)\b")
+
 
 class BackendUnavailable(RuntimeError):
     """Raised when MAX_CONSECUTIVE_FAILURES backend calls fail in a row."""
@@ -58,19 +86,103 @@ def short_model_name(model_id: str) -> str:
     return f"{family}-{version}"
 
 
+class AliasMatcher:
+    """Every alias of a target list, found in one regex pass.
+
+    Aliases: the full name plus each distinctive word, so a bare "SILVA"
+    hits AMBASSADOR SILVA and "VANCE" hits DR. VANCE (full-name-only
+    matching once recorded PIP's accusation of SILVA as targeting RICO).
+    An alias shared by two players identifies neither and is dropped.
+
+    hits() gives what a \\b-bounded search per alias would, in the same
+    order: by position, then by alias order. The lookahead tries longer
+    aliases first and so can report one alias per position; the shorter
+    aliases that match wherever it does are worked out up front.
+    """
+
+    def __init__(self, valid_targets: Tuple[str, ...]):
+        name_map: Dict[str, str] = {}
+        ambiguous = set()
+        for name in valid_targets:
+            keys = {name.lower()} | {
+                w for w in re.findall(r"[a-z]+", name.lower()) if len(w) >= 3
+            }
+            for key in keys:
+                if name_map.get(key, name) != name:
+                    ambiguous.add(key)
+                name_map[key] = name
+        for key in ambiguous:
+            del name_map[key]
+        self.name_map = name_map
+        # alias -> the names hit at a position where it is the longest match
+        self._names: Dict[str, List[str]] = {
+            longest: [
+                name for key, name in name_map.items()
+                if longest.startswith(key) and (
+                    len(key) == len(longest)
+                    or _is_word_char(key[-1]) != _is_word_char(longest[len(key)])
+                )
+            ]
+            for longest in name_map
+        }
+        alternation = "|".join(re.escape(k) for k in sorted(name_map, key=len, reverse=True))
+        self._pattern = re.compile(rf"(?=\b({alternation})\b)") if name_map else None
+
+    def hits(self, text_lower: str) -> List[Tuple[int, str]]:
+        """(position, name) for every alias in `text_lower`, earliest first."""
+        if self._pattern is None:
+            return []
+        return [
+            (m.start(), name)
+            for m in self._pattern.finditer(text_lower)
+            for name in self._names[m.group(1)]
+        ]
+
+    def first(self, text_lower: str) -> Optional[str]:
+        """The name behind the earliest alias in `text_lower`."""
+        m = self._pattern.search(text_lower) if self._pattern else None
+        return self._names[m.group(1)][0] if m else None
+
+
+@functools.lru_cache(maxsize=64)
+def alias_matcher(valid_targets: Tuple[str, ...]) -> AliasMatcher:
+    """One AliasMatcher per target list: a phase asks every seat about the same one."""
+    return AliasMatcher(valid_targets)
+
+
 class MafiaGame:
+    # The two house rules (README, "Two house rules"). Always on in a real
+    # game; the simulator (simulate.py) turns them off to measure them.
+    detective_will = True
+    trusted_person_rule = True
+    # A full collection between days keeps a long game's heap flat. A
+    # simulated game is over in milliseconds and would spend most of them here.
+    collect_between_days = True
+
     def __init__(
         self,
         reveal_secrets: bool = False,
         player_count: Optional[int] = None,
-        max_workers: int = 4,
+        max_workers: Optional[int] = None,
         model_override: Optional[str] = None,
-        lm_studio_url: str = LM_STUDIO_URL,
+        lm_studio_url: Union[str, List[str]] = LM_STUDIO_URL,
         nvidia_api_key: Optional[str] = None,
         gm_model: Optional[str] = None,
         gm_enabled: bool = True,
         use_claude: bool = False,
         mafia_count: int = 2,
+        use_async: bool = False,
+        model_affinity: bool = False,
+        stream_names: bool = False,
+        questioning: str = "sequential",
+        question_window: int = 4,
+        parallel_mafia_confirm: bool = False,
+        checkpoint_path: Optional[str] = None,
+        events_path: Optional[str] = None,
+        fsync_every: int = 0,
+        server: Optional[EventServer] = None,
+        seed: Optional[int] = None,
+        run_stats: bool = False,
     ):
         _root = Path(__file__).parent.parent
         base_players = load_players_from_file(str(_root / "players.json"))
@@ -86,16 +198,12 @@ class MafiaGame:
 
         self.use_nvidia = nvidia_api_key is not None
         self.use_claude = use_claude
+        # Async mode: player calls are coroutines (AsyncOpenAI, an asyncio
+        # subprocess for the CLI). Otherwise they run on the game's worker
+        # threads. Either way self.concurrency caps requests in flight.
+        self.use_async = use_async
         self.consecutive_failures = 0
-        if self.use_claude:
-            self.model = model_override or DEFAULT_CLAUDE_MODEL
-            self._lm_client = None  # claude backend shells out, no HTTP client
-        elif self.use_nvidia:
-            self.model = model_override or DEFAULT_NVIDIA_MODEL
-            self._lm_client = OpenAI(base_url=NVIDIA_API_URL, api_key=nvidia_api_key)
-        else:
-            self.model = model_override or DEFAULT_MODEL
-            self._lm_client = OpenAI(base_url=lm_studio_url, api_key="lm-studio")
+        self._connect(model_override, lm_studio_url, nvidia_api_key, use_async)
 
         if self.use_claude:
             # --model forces one model everywhere; otherwise cycle the tiers
@@ -115,13 +223,70 @@ class MafiaGame:
         self.day = 0
         self.game_log = []
         self.public_log = []
+        # Each game_log line's public flag, for a resumed game's event stream
+        self.log_public: List[bool] = []
+        # GM narration runs in the background; the log keeps game order
+        self.narration = NarrationQueue(self._write_log)
+        # Day recaps still being written, joined when the next day starts (a
+        # resumed game may start with some already written)
+        self._recaps: Dict[int, Union[Narration, str]] = {}
         self.events = EventLog()
         self.night_actions = {}
         self.private_notes: Dict[str, List[str]] = {}
         self.vote_history: List[Dict] = []
         self.night_kill_history: List[Dict] = []
+        # Every seat in a phase reads the same summary (see game_state.py)
+        self.summaries = DaySummaryCache()
+        # Guards _shared_context; per game, so games side by side don't
+        # wait on each other's renders
+        self._context_lock = threading.Lock()
         self.reveal_secrets = reveal_secrets
-        self.max_workers = max_workers
+        # max_workers None = auto: the in-flight cap follows the backend (see
+        # concurrency.py); a number pins it there
+        self.concurrency = (
+            ConcurrencyLimit.fixed(max_workers) if max_workers
+            else ConcurrencyLimit(on_change=self._log_concurrency)
+        )
+        self.max_workers = max_workers or self.concurrency.maximum
+        # --model-affinity: requests for the model the server already has
+        # loaded go first (see affinity.py). Off, it only counts swaps.
+        self.affinity = ModelAffinity(enabled=model_affinity)
+        # --stream-names: name-only calls stream and stop at the name
+        self.stream_names = stream_names
+        # --run-stats: print the infrastructure counters after the game
+        self.run_stats = run_stats
+        # --questioning pipelined: up to question_window exchanges in flight
+        # at once (see questioning_round); sequential is a window of one
+        self.questioning = questioning
+        self.question_window = 1 if questioning == "sequential" else max(1, question_window)
+        self.questioning_s = 0.0
+        # The mafia's round 1 and final vote are blind and always fan out;
+        # this fans out the confirmation round too, each member reading
+        # only round 1
+        self.parallel_mafia_confirm = parallel_mafia_confirm
+        # LM Studio decodes name-only replies against an enum of the valid
+        # names (NVIDIA takes no schema, the CLI no schema at all)
+        self.names_constrained = not (self.use_nvidia or self.use_claude)
+        # One worker pool for the whole game, set up by run() (see scheduler.py)
+        self.scheduler: Optional[GameScheduler] = None
+        # A checkpoint after every completed phase (see checkpoint.py), and
+        # where a resumed game picks up: index into checkpoint.PHASES
+        self.checkpoint_path = checkpoint_path
+        self.last_checkpoint: Optional[Tuple[int, str]] = None
+        self.resumed_from: Optional[Tuple[int, str]] = None
+        self._next_phase = 0
+        self._resume_held: List = []
+        # Every event and log line appended to a .jsonl as it happens, opened
+        # by run() (see eventsink.py)
+        self.events_path = events_path
+        self.fsync_every = fsync_every
+        # --serve: spectators follow the events live (see liveserver.py)
+        self.server = server
+        # Every random decision the game makes comes from here, so a seed
+        # replays the game (--seed; --record keeps it in the cassette). No
+        # seed draws one, from the random module as before.
+        self.seed = random.randrange(2**32) if seed is None else seed
+        self.rng = random.Random(self.seed)
         self.mafia_count = mafia_count
         self.last_doctor_target: Optional[str] = None
         self.detective_investigated: set = set()
@@ -150,6 +315,39 @@ class MafiaGame:
             print("ERROR: system_prompt.md not found. Using default prompt.")
             self.universal_prompt = "You are a player in a game of Mafia."
 
+    def _connect(
+        self,
+        model_override: Optional[str],
+        lm_studio_url: Union[str, List[str]],
+        nvidia_api_key: Optional[str],
+        use_async: bool,
+    ):
+        """The backend clients and the default model. The simulator
+        (simulate.py) plays without a backend and skips this."""
+        self._async_client: Optional[AsyncOpenAI] = None
+        self.endpoint_pool: Optional[EndpointPool] = None
+        if self.use_claude:
+            self.model = model_override or DEFAULT_CLAUDE_MODEL
+            self._lm_client = None  # claude backend shells out, no HTTP client
+        elif self.use_nvidia:
+            self.model = model_override or DEFAULT_NVIDIA_MODEL
+            self._lm_client = OpenAI(base_url=NVIDIA_API_URL, api_key=nvidia_api_key)
+            if use_async:
+                self._async_client = AsyncOpenAI(base_url=NVIDIA_API_URL, api_key=nvidia_api_key)
+        else:
+            self.model = model_override or DEFAULT_MODEL
+            urls = [lm_studio_url] if isinstance(lm_studio_url, str) else list(lm_studio_url)
+            if len(urls) > 1:
+                # Several boxes: every call goes to the least busy one
+                self.endpoint_pool = EndpointPool(urls)
+                self._lm_client = self.endpoint_pool.client()
+                if use_async:
+                    self._async_client = self.endpoint_pool.async_client()
+            else:
+                self._lm_client = OpenAI(base_url=urls[0], api_key="lm-studio")
+                if use_async:
+                    self._async_client = AsyncOpenAI(base_url=urls[0], api_key="lm-studio")
+
     def assign_roles(self):
         """Assign roles to players"""
         player_count = len(self.players)
@@ -161,7 +359,7 @@ class MafiaGame:
 
         # Shuffle and assign
         shuffled = self.players.copy()
-        random.shuffle(shuffled)
+        self.rng.shuffle(shuffled)
 
         # Assign mafia
         for i in range(mafia_count):
@@ -184,13 +382,13 @@ class MafiaGame:
         # the published cases, 3-mafia won 5/15, and every mafia win opened with
         # a day-1 mislynch — so the buff is aimed at day 1 and gated to 3 wolves.
         det = next((p for p in self.players if p.role == Role.DETECTIVE), None)
-        if mafia_count >= 3 and det:
+        if self.trusted_person_rule and mafia_count >= 3 and det:
             candidates = [
                 p.name for p in self.players
                 if p.role != Role.MAFIA and p.name != det.name
             ]
             if candidates:
-                self.trusted_person = random.choice(candidates)
+                self.trusted_person = self.rng.choice(candidates)
                 # The note names the trade-off rather than granting permission.
                 # Under the first wording ("use or share as you see fit") no
                 # detective ever vouched in seven games, and in case-023 the
@@ -268,7 +466,179 @@ class MafiaGame:
 
         return None
 
-    def day_phase(self):
+    async def _ask(self, player: Player, prompt: str, context: str = "", **kwargs) -> str:
+        """query_model from inside a phase. Async mode awaits the coroutine;
+        otherwise the blocking call goes to the game's worker threads, so the
+        loop keeps the other seats moving while this one waits. Inside a
+        fan-out the call reads the context the fan-out started with."""
+        kwargs["shared"] = _PINNED_CONTEXT.get()
+        if self.use_async:
+            return await self.scheduler.track(
+                "query_model_async", self.query_model_async(player, prompt, context, **kwargs)
+            )
+        return await self._offload(self.query_model, player, prompt, context, **kwargs)
+
+    async def _offload(self, fn, *args, **kwargs):
+        """Run a blocking call (a GM narration, a sync query) on the game's
+        worker threads."""
+        return await self.scheduler.run(fn, *args, **kwargs)
+
+    def _narrate(self, label: str, fn, *args, fallback: Optional[Tuple[str, str]] = None,
+                 **kwargs) -> Narration:
+        """Start a GM narration in the background (see narration.py). Its
+        line, or `fallback` (message, style) when the GM has nothing, is
+        logged where this was called. `fn` is a GameMaster method, so a
+        checkpoint can save the call by name (see _resume_narration)."""
+        spec = {"label": label, "call": fn.__name__, "args": list(args), "kwargs": kwargs,
+                "fallback": list(fallback) if fallback else None}
+        return self.narration.submit(
+            label, self._offload(fn, *args, **kwargs),
+            functools.partial(self._narration_lines, spec), spec,
+        )
+
+    def _narration_lines(self, spec: Dict, text: str) -> List[Tuple[str, str, bool]]:
+        if spec["label"] == "day_summary":
+            # The recap is for the context; on the console only with secrets
+            return [(f"\n📋 Day {spec['args'][0]} recap: {text}", "cyan", False)] if text else []
+        if text:
+            return [(f"\n📜 {text}", "magenta", True)]
+        return [(*spec["fallback"], True)] if spec["fallback"] else []
+
+    def _resume_narration(self, spec: Dict):
+        """Make again a narration a checkpoint saved unfinished."""
+        narration = self._narrate(
+            spec["label"], getattr(self.gm, spec["call"]), *spec["args"],
+            fallback=tuple(spec["fallback"]) if spec["fallback"] else None, **spec["kwargs"],
+        )
+        if spec["label"] == "day_summary":
+            self._recaps[spec["args"][0]] = narration
+
+    async def _join_recaps(self):
+        """Wait for the recaps of days already over and file them for the
+        context (build_context_for_player)."""
+        for day in sorted(self._recaps):
+            recap = self._recaps.pop(day)
+            summary = recap if isinstance(recap, str) else await recap.join()
+            if summary:
+                self.day_summaries[day] = summary
+                self.summary_version += 1
+
+    def _start(self, job: Awaitable) -> asyncio.Task:
+        """Start `job` reading the shared context as it is now, whatever is
+        emitted while it waits for a worker (see _ask)."""
+        token = _PINNED_CONTEXT.set(self.shared_context())
+        try:
+            return asyncio.ensure_future(job)
+        finally:
+            _PINNED_CONTEXT.reset(token)
+
+    async def _fan_out(self, jobs: List[Tuple[Any, Awaitable]]) -> AsyncIterator[Tuple[Any, Any]]:
+        """Run the jobs side by side and yield (tag, result) for each in list
+        order, however the calls finish (under --model-affinity they finish
+        grouped by model). Every job reads the context as it was when the
+        fan-out started, so which reply landed first never reaches another
+        seat's prompt or the event order: a seed and a replayed backend give
+        the same events."""
+        async def tagged(tag, job):
+            return tag, await job
+
+        tasks = [self._start(tagged(tag, job)) for tag, job in jobs]
+        for task in tasks:
+            yield await task
+
+    async def questioning_round(
+        self, exchanges: List[Tuple[Player, Player, str]], alive_names: List[str]
+    ) -> List[str]:
+        """Play one round of (asker, target, prompt) exchanges: a question,
+        then the target's answer to it. Returns the day_statements lines.
+
+        Events always come out in list order, each question followed by its
+        answer, whatever order the model calls finish in. An exchange starts
+        as soon as it is fewer than question_window places behind the
+        earliest unpublished one and every earlier exchange with either of
+        its seats has been published, so a seat never talks past its own last
+        exchange. It sees every exchange published by then; with a window of
+        one that is all earlier ones, which is the sequential mode, and there
+        the question is published before the answer is asked for, so the
+        answerer sees it in the transcript too. A wider window lets exchanges
+        between different seats run side by side: a question may then be
+        asked without the ones still in flight ahead of it, and the answerer
+        has its question only in the prompt until the exchange is published. Which ones those are depends only on the publishing so far,
+        never on which call came back first, so a seeded game replays.
+        """
+        statements: List[str] = []
+
+        async def exchange(player: Player, target: Player, prompt: str):
+            question = await self._ask(player, prompt, self.day_summary(alive_names), min_words=3, public_speech=True)
+            if question == f"*{player.name} remains silent*":
+                return question, None
+            if self.question_window == 1:
+                # The question is emitted before its answer is queried, so the
+                # answerer (and every later asker) sees it in the shared
+                # transcript. Only one exchange is running, so this is the
+                # same spot in the event order it is published at anyway.
+                publish_question(player, target, question)
+                _PINNED_CONTEXT.set(self.shared_context())
+            # Pipelined, the question is in the answer's prompt only: the
+            # transcript catches up once the exchange is published
+            answer_prompt = f"{player.name} just asked you: '{question}'. Respond directly in 1-2 sentences."
+            answer = await self._ask(target, answer_prompt, self.day_summary(alive_names), public_speech=True)
+            return question, answer
+
+        def publish_question(player: Player, target: Player, question: str):
+            self.log(f"🔍 {player.name} → {target.name}: {question}", "yellow")
+            self.emit("question", day=self.day, actor=player.name, target=target.name, text=question)
+            statements.append(f"{player.name} questions {target.name}: {question}")
+
+        def publish(player: Player, target: Player, question: str, answer: Optional[str]):
+            if answer is None:
+                # Failed generation — skip the exchange, don't publish it
+                self.log(f"🔍 {player.name} has no question for {target.name}", "yellow", public=False)
+                return
+            if self.question_window > 1:
+                publish_question(player, target, question)
+            if answer == f"*{target.name} remains silent*":
+                self.log(f"💬 {target.name} does not answer", "normal", public=False)
+                return
+            self.log(f"💬 {target.name}: {answer}", "normal")
+            self.emit("answer", day=self.day, actor=target.name, target=player.name, text=answer)
+            statements.append(f"{target.name} answers {player.name}: {answer}")
+
+        seats = [{player.name, target.name} for player, target, _ in exchanges]
+        running: Dict[asyncio.Task, int] = {}
+        done: Dict[int, Tuple[str, Optional[str]]] = {}
+        published = 0
+        waiting = list(range(len(exchanges)))
+
+        def start_ready():
+            # Whatever may go now, earliest first. The earliest unpublished
+            # exchange can always go, so this never stalls.
+            for i in list(waiting):
+                if i - published >= self.question_window:
+                    break
+                if any(seats[i] & seats[j] for j in range(published, i)):
+                    continue
+                waiting.remove(i)
+                running[self._start(exchange(*exchanges[i]))] = i
+
+        try:
+            start_ready()
+            while published < len(exchanges):
+                finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    done[running.pop(task)] = task.result()
+                # One at a time, so what an exchange starts with is the same
+                # however many of the ones ahead of it landed together
+                while published in done:
+                    publish(*exchanges[published][:2], *done.pop(published))
+                    published += 1
+                    start_ready()
+        finally:
+            for task in running:
+                task.cancel()
+        return statements
+
+    async def day_phase(self):
         """Run day discussion phase with direct player interaction"""
         self.day += 1
         self.log(f"\n\n☀️  DAY {self.day} - TOWN MEETING", "bold")
@@ -281,14 +651,14 @@ class MafiaGame:
 
         last_kill = self.night_kill_history[-1] if self.night_kill_history else None
         last_vote = self.vote_history[-1] if self.vote_history else None
-        gm_intro = self.gm.narrate_day_start(self.day, alive_names, last_kill, last_vote)
-        if gm_intro:
-            self.log(f"\n📜 {gm_intro}", "magenta")
+        self._narrate(
+            "day_start", self.gm.narrate_day_start, self.day, alive_names, last_kill, last_vote,
+        )
+        # Earlier days' recaps go into every prompt from here on
+        await self._join_recaps()
 
         # Build context from recent events
-        recent_context = build_day_summary(
-            self.day, alive_names, self.vote_history, self.night_kill_history
-        )
+        recent_context = self.day_summary(alive_names)
 
         day_statements: List[str] = []
 
@@ -297,36 +667,31 @@ class MafiaGame:
             self.log(
                 f"\n💬 Initial Impressions (No deaths yet, no prior behavior)", "cyan"
             )
-            random.shuffle(alive)
-
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                futures = {}
-                for player in alive:
-                    others = self.probe_candidates(player, alive_names)
-                    prompt = f"This is Day 1. No one has died yet and no one has done anything. Pick ONE player from: {', '.join(random.sample(others, min(3, len(others))))} whose behavior you most want to probe today, and say what you want to see or hear from them (1 sentence). A player's name, title, or manner of speaking is NOT evidence — do not call anyone suspicious because of it. Do NOT reference past events or history."
-                    future = executor.submit(
-                        self.query_model,
-                        player,
-                        prompt,
-                        "Day 1: No previous events. First discussion.",
-                        min_words=5,
-                        public_speech=True,
-                    )
-                    futures[future] = player
-
-                for future in as_completed(futures):
-                    player = futures[future]
-                    response = future.result()
-                    if response == f"*{player.name} remains silent*":
-                        self.log(f"🗣️  {player.name} has nothing to say", "yellow", public=False)
-                        continue
-                    self.log(f"🗣️  {player.name}: {response}", "normal")
-                    self.emit("statement", day=self.day, actor=player.name, text=response)
-                    day_statements.append(f"{player.name}: {response}")
+            self.rng.shuffle(alive)
+
+            jobs = []
+            for player in alive:
+                others = self.probe_candidates(player, alive_names)
+                prompt = f"This is Day 1. No one has died yet and no one has done anything. Pick ONE player from: {', '.join(self.rng.sample(others, min(3, len(others))))} whose behavior you most want to probe today, and say what you want to see or hear from them (1 sentence). A player's name, title, or manner of speaking is NOT evidence — do not call anyone suspicious because of it. Do NOT reference past events or history."
+                jobs.append((player, self._ask(
+                    player,
+                    prompt,
+                    "Day 1: No previous events. First discussion.",
+                    min_words=5,
+                    public_speech=True,
+                )))
+
+            async for player, response in self._fan_out(jobs):
+                if response == f"*{player.name} remains silent*":
+                    self.log(f"🗣️  {player.name} has nothing to say", "yellow", public=False)
+                    continue
+                self.log(f"🗣️  {player.name}: {response}", "normal")
+                self.emit("statement", day=self.day, actor=player.name, text=response)
+                day_statements.append(f"{player.name}: {response}")
         else:
             # NORMAL DAY
             self.log(f"\n💬 Opening Statements", "cyan")
-            random.shuffle(alive)
+            self.rng.shuffle(alive)
 
             # Build list of ELIMINATED players for context
             eliminated = [p.name for p in self.players if not p.alive]
@@ -354,26 +719,22 @@ class MafiaGame:
 
             key_facts = (" ".join(key_facts_parts) + " ") if key_facts_parts else ""
 
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                futures = {}
-                for player in alive:
-                    others = self.probe_candidates(player, alive_names)
-                    prompt = f"KEY FACTS: {key_facts}Day {self.day}. {eliminated_str}. Given these new facts, who among the ALIVE players is most suspicious? Reference specific past behavior from: {', '.join(others[:5])}."
-                    future = executor.submit(
-                        self.query_model, player, prompt, recent_context,
-                        public_speech=True,
-                    )
-                    futures[future] = player
-
-                for future in as_completed(futures):
-                    player = futures[future]
-                    response = future.result()
-                    if response == f"*{player.name} remains silent*":
-                        self.log(f"🗣️  {player.name} has nothing to say", "yellow", public=False)
-                        continue
-                    self.log(f"🗣️  {player.name}: {response}", "normal")
-                    self.emit("statement", day=self.day, actor=player.name, text=response)
-                    day_statements.append(f"{player.name}: {response}")
+            jobs = []
+            for player in alive:
+                others = self.probe_candidates(player, alive_names)
+                prompt = f"KEY FACTS: {key_facts}Day {self.day}. {eliminated_str}. Given these new facts, who among the ALIVE players is most suspicious? Reference specific past behavior from: {', '.join(others[:5])}."
+                jobs.append((player, self._ask(
+                    player, prompt, recent_context,
+                    public_speech=True,
+                )))
+
+            async for player, response in self._fan_out(jobs):
+                if response == f"*{player.name} remains silent*":
+                    self.log(f"🗣️  {player.name} has nothing to say", "yellow", public=False)
+                    continue
+                self.log(f"🗣️  {player.name}: {response}", "normal")
+                self.emit("statement", day=self.day, actor=player.name, text=response)
+                day_statements.append(f"{player.name}: {response}")
 
         # QUESTIONING ROUNDS (THIS WAS MISSING!)
         QUESTION_TEMPLATES = [
@@ -385,18 +746,15 @@ class MafiaGame:
             "Ask {target} to defend themselves against current suspicions. One direct question.",
         ]
         questioning_rounds = 2
+        started = time.monotonic()
         for round_num in range(questioning_rounds):
             self.log(
                 f"\n❓ Questioning Round {round_num + 1}/{questioning_rounds}", "cyan"
             )
 
-            random.shuffle(alive)
+            self.rng.shuffle(alive)
 
-            # Each exchange runs to completion before the next starts: the
-            # question is emitted before its answer is queried, so the answerer
-            # (and every later asker) sees it in the shared transcript. Sequential
-            # costs little real time — NVIDIA throttles globally and a single
-            # local model serializes anyway — and reads as an actual conversation.
+            exchanges = []
             for player in alive:
                 # The templates below are adversarial ("Challenge", "Confront"),
                 # so who gets drawn here is who the player is made to attack.
@@ -404,36 +762,15 @@ class MafiaGame:
                 others = [p for p in alive if p.name in allowed]
                 if not others:
                     continue
-                target = random.choice(others)
-
-                recent_context = build_day_summary(
-                    self.day, alive_names, self.vote_history, self.night_kill_history
-                )
-                template = QUESTION_TEMPLATES[(round_num + abs(hash(player.name))) % len(QUESTION_TEMPLATES)]
-                question = self.query_model(
-                    player, template.format(target=target.name), recent_context,
-                    min_words=3, public_speech=True,
-                )
-                if question == f"*{player.name} remains silent*":
-                    # Failed generation — skip the exchange, don't publish it
-                    self.log(f"🔍 {player.name} has no question for {target.name}", "yellow", public=False)
-                    continue
-                self.log(f"🔍 {player.name} → {target.name}: {question}", "yellow")
-                self.emit("question", day=self.day, actor=player.name, target=target.name, text=question)
-                day_statements.append(f"{player.name} questions {target.name}: {question}")
-
-                answer_prompt = f"{player.name} just asked you: '{question}'. Respond directly in 1-2 sentences."
-                answer = self.query_model(target, answer_prompt, recent_context, public_speech=True)
-                if answer == f"*{target.name} remains silent*":
-                    self.log(f"💬 {target.name} does not answer", "normal", public=False)
-                    continue
-                self.log(f"💬 {target.name}: {answer}", "normal")
-                self.emit("answer", day=self.day, actor=target.name, target=player.name, text=answer)
-                day_statements.append(f"{target.name} answers {player.name}: {answer}")
+                target = self.rng.choice(others)
+                template = QUESTION_TEMPLATES[(round_num + zlib.crc32(player.name.encode())) % len(QUESTION_TEMPLATES)]
+                exchanges.append((player, target, template.format(target=target.name)))
+            day_statements.extend(await self.questioning_round(exchanges, alive_names))
+        self.questioning_s += time.monotonic() - started
 
         # FINAL ACCUSATIONS
         self.log(f"\n⚖️  Final Accusations", "cyan")
-        random.shuffle(alive)
+        self.rng.shuffle(alive)
 
         eliminated = [p.name for p in self.players if not p.alive]
         eliminated_str = (
@@ -442,28 +779,24 @@ class MafiaGame:
             else "No deaths yet"
         )
 
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = {}
-            for player in alive:
-                others = self.probe_candidates(player, alive_names)
-                prompt = f"{eliminated_str}. Who should be eliminated TODAY from the ALIVE players? Choose from: {', '.join(others)}. Be decisive (1 sentence). START your sentence with the name of the player you accuse, then give your reason. Your reason must cite a recorded action (a vote, claim, or contradiction) — personality and speaking style are not evidence."
-                future = executor.submit(
-                    self.query_model, player, prompt, build_day_summary(self.day, alive_names, self.vote_history, self.night_kill_history),
-                    public_speech=True,
-                )
-                futures[future] = player
-
-            # Collect everything BEFORE emitting: accusations are written
-            # blind, so one early pick can't cascade into a dogpile (day 1
-            # against the Detective was decided this way)
-            collected = []
-            for future in as_completed(futures):
-                player = futures[future]
-                response = future.result()
-                if response == f"*{player.name} remains silent*":
-                    self.log(f"⚔️  {player.name} offers no accusation", "yellow", public=False)
-                    continue
-                collected.append((player, response))
+        jobs = []
+        for player in alive:
+            others = self.probe_candidates(player, alive_names)
+            prompt = f"{eliminated_str}. Who should be eliminated TODAY from the ALIVE players? Choose from: {', '.join(others)}. Be decisive (1 sentence). START your sentence with the name of the player you accuse, then give your reason. Your reason must cite a recorded action (a vote, claim, or contradiction) — personality and speaking style are not evidence."
+            jobs.append((player, self._ask(
+                player, prompt, self.day_summary(alive_names),
+                public_speech=True,
+            )))
+
+        # Collect everything BEFORE emitting: accusations are written
+        # blind, so one early pick can't cascade into a dogpile (day 1
+        # against the Detective was decided this way)
+        collected = []
+        async for player, response in self._fan_out(jobs):
+            if response == f"*{player.name} remains silent*":
+                self.log(f"⚔️  {player.name} offers no accusation", "yellow", public=False)
+                continue
+            collected.append((player, response))
 
         for player, response in collected:
             self.log(f"⚔️  {player.name}: {response}", "red")
@@ -474,12 +807,11 @@ class MafiaGame:
             day_statements.append(f"{player.name} accuses: {response}")
 
         # GM summarizes the day for injection into subsequent context
-        summary = self.gm.narrate_day_summary(self.day, day_statements)
-        if summary:
-            self.day_summaries[self.day] = summary
-            self.log(f"\n📋 Day {self.day} recap: {summary}", "cyan", public=False)
+        # Only read from tomorrow on (see _join_recaps)
+        day = self.day
+        self._recaps[day] = self._narrate("day_summary", self.gm.narrate_day_summary, day, day_statements)
 
-    def voting_phase(self) -> Optional[Player]:
+    async def voting_phase(self) -> Optional[Player]:
         """Run voting phase and return eliminated player"""
         self.log(f"\n🗳️  VOTING PHASE", "bold")
 
@@ -494,50 +826,50 @@ class MafiaGame:
             else ""
         )
 
-        recent_context = build_day_summary(
-            self.day, alive_names, self.vote_history, self.night_kill_history
-        )
+        recent_context = self.day_summary(alive_names)
         votes: Dict[str, str] = {}
 
         # Collect votes
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = {}
-            for player in alive:
-                valid_targets = [
-                    n for n in alive_names if n != player.name
-                ]  # CANNOT VOTE FOR SELF
-                prompt = f"Vote to eliminate ONE player. {eliminated_str}. You CANNOT vote for yourself. Available: {', '.join(valid_targets)}. Reply with their name ONLY."
-                future = executor.submit(
-                    self.query_model, player, prompt, recent_context, min_words=1,
-                    max_tokens=512,
-                )
-                futures[future] = (player, valid_targets)
-
-            for future in as_completed(futures):
-                player, valid_targets = futures[future]
-                response = future.result()
-                vote = self.extract_vote(response, valid_targets)
-
-                # PREVENT SELF-VOTING
-                if vote == player.name:
-                    vote = None
-
-                defaulted = not vote
-                if not defaulted:
-                    votes[player.name] = vote
-                    self.log(f"{player.name} votes: {vote}", "yellow")
-                else:
-                    # Parsing failed (empty/short reply, e.g. reasoning ate the
-                    # token budget). Random fallback so the day still resolves —
-                    # but flag it: a defaulted vote is noise, not a real read,
-                    # and once decided a whole game. Consumers must be able to
-                    # tell it apart from a deliberate ballot.
-                    vote = random.choice(valid_targets)
-                    votes[player.name] = vote
-                    self.log(f"{player.name} votes: {vote} (default)", "yellow")
-
-                self.emit("vote", day=self.day, actor=player.name, target=vote,
-                          **({"defaulted": True} if defaulted else {}))
+        jobs = []
+        for player in alive:
+            valid_targets = [
+                n for n in alive_names if n != player.name
+            ]  # CANNOT VOTE FOR SELF
+            prompt = f"Vote to eliminate ONE player. {eliminated_str}. You CANNOT vote for yourself. Available: {', '.join(valid_targets)}. Reply with their name ONLY."
+            jobs.append(((player, valid_targets), self._ask(
+                player, prompt, recent_context, min_words=1,
+                max_tokens=512, **self._name_only(valid_targets),
+            )))
+
+        async for (player, valid_targets), response in self._fan_out(jobs):
+            vote = self.extract_vote(response, valid_targets)
+
+            # PREVENT SELF-VOTING
+            if vote == player.name:
+                vote = None
+
+            defaulted = not vote
+            if not defaulted:
+                votes[player.name] = vote
+                self.log(f"{player.name} votes: {vote}", "yellow")
+            elif self.names_constrained:
+                # A schema-pinned reply always parses, so no vote means the
+                # call itself failed. Nobody said anything: abstain rather
+                # than invent a ballot.
+                self.log(f"{player.name} abstains (no reply)", "yellow")
+                continue
+            else:
+                # Parsing failed (empty/short reply, e.g. reasoning ate the
+                # token budget). Random fallback so the day still resolves —
+                # but flag it: a defaulted vote is noise, not a real read,
+                # and once decided a whole game. Consumers must be able to
+                # tell it apart from a deliberate ballot.
+                vote = self.rng.choice(valid_targets)
+                votes[player.name] = vote
+                self.log(f"{player.name} votes: {vote} (default)", "yellow")
+
+            self.emit("vote", day=self.day, actor=player.name, target=vote,
+                      **({"defaulted": True} if defaulted else {}))
 
         # Count votes
         vote_counts: Dict[str, int] = {}
@@ -578,18 +910,14 @@ class MafiaGame:
             tally=dict(vote_counts),
         )
 
-        gm_elim = self.gm.narrate_elimination(eliminated.name, eliminated.role.value, vote_counts)
-        if gm_elim:
-            self.log(f"\n📜 {gm_elim}", "magenta")
-        else:
-            self.log(
-                f"\n💀 {eliminated.name} has been eliminated! They were: {eliminated.role.value}",
-                "red",
-            )
+        self._narrate(
+            "elimination", self.gm.narrate_elimination, eliminated.name, eliminated.role.value, vote_counts,
+            fallback=(f"\n💀 {eliminated.name} has been eliminated! They were: {eliminated.role.value}", "red"),
+        )
 
         return eliminated
 
-    def night_phase(self):
+    async def night_phase(self):
         """Run night phase with mafia kill, detective investigation, doctor protection"""
         self.log(f"\n\n🌙 NIGHT {self.day}", "bold")
         self.emit("phase", day=self.day, phase="night")
@@ -598,70 +926,64 @@ class MafiaGame:
         alive_names = [p.name for p in alive]
         mafia = self.get_mafia()
 
-        recent_context = build_day_summary(
-            self.day, alive_names, self.vote_history, self.night_kill_history
-        )
+        recent_context = self.day_summary(alive_names)
 
         mafia_target = None
         detective_target = None
         doctor_target = None
 
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = {}
-            # Mafia chooses target
-            if mafia:
-                future = executor.submit(
-                    self.mafia_conversation_and_choose_target,
-                    mafia,
-                    alive_names,
-                    recent_context,
-                )
-                futures[future] = "mafia"
-
-            # Detective investigates
-            detectives = [p for p in alive if p.role == Role.DETECTIVE]
-            if detectives:
-                detective = detectives[0]
-                # The trusted person counts as already investigated: spending a
-                # night confirming what the detective was told on turn one is
-                # the single most expensive way to waste the buff.
-                known = set(self.detective_investigated)
-                if self.trusted_person:
-                    known.add(self.trusted_person)
-                uninvestigated = [n for n in alive_names if n != detective.name and n not in known]
-                valid = uninvestigated if uninvestigated else [n for n in alive_names if n != detective.name]
-                prompt = f"Choose ONE player to investigate tonight. Pick someone suspicious from today's discussion. Targets: {', '.join(valid)}"
-                future = executor.submit(
-                    self.query_model, detective, prompt, recent_context, min_words=1
+        jobs = []
+        # Mafia chooses target
+        if mafia:
+            jobs.append(("mafia", self.mafia_conversation_and_choose_target(
+                mafia,
+                alive_names,
+                recent_context,
+            )))
+
+        # Detective investigates
+        detectives = [p for p in alive if p.role == Role.DETECTIVE]
+        if detectives:
+            detective = detectives[0]
+            # The trusted person counts as already investigated: spending a
+            # night confirming what the detective was told on turn one is
+            # the single most expensive way to waste the buff.
+            known = set(self.detective_investigated)
+            if self.trusted_person:
+                known.add(self.trusted_person)
+            uninvestigated = [n for n in alive_names if n != detective.name and n not in known]
+            valid = uninvestigated if uninvestigated else [n for n in alive_names if n != detective.name]
+            prompt = f"Choose ONE player to investigate tonight. Pick someone suspicious from today's discussion. Targets: {', '.join(valid)}"
+            jobs.append(("detective", self._ask(
+                detective, prompt, recent_context, min_words=1,
+                **self._name_only(valid),
+            )))
+
+        # Doctor protects
+        doctors = [p for p in alive if p.role == Role.DOCTOR]
+        if doctors:
+            doctor = doctors[0]
+            valid = alive_names
+            last_protected = f" Last night you protected {self.last_doctor_target}." if self.last_doctor_target else ""
+            prompt = f"Choose ONE player to protect tonight.{last_protected} Protecting different players each night is better strategy than always protecting yourself. Think about who spoke up most today or seemed targeted. Targets: {', '.join(valid)}"
+            jobs.append(("doctor", self._ask(
+                doctor, prompt, recent_context, min_words=1,
+                **self._name_only(valid),
+            )))
+
+        # The mafia's back-and-forth is a coroutine of its own, so it no longer
+        # holds a pool slot while the detective and doctor wait behind it
+        async for role, result in self._fan_out(jobs):
+            if role == "mafia":
+                mafia_target = result
+            elif role == "detective":
+                detective_target = self.extract_vote(
+                    result, [n for n in alive_names if n != detectives[0].name]
                 )
-                futures[future] = "detective"
-
-            # Doctor protects
-            doctors = [p for p in alive if p.role == Role.DOCTOR]
-            if doctors:
-                doctor = doctors[0]
-                valid = alive_names
-                last_protected = f" Last night you protected {self.last_doctor_target}." if self.last_doctor_target else ""
-                prompt = f"Choose ONE player to protect tonight.{last_protected} Protecting different players each night is better strategy than always protecting yourself. Think about who spoke up most today or seemed targeted. Targets: {', '.join(valid)}"
-                future = executor.submit(
-                    self.query_model, doctor, prompt, recent_context, min_words=1
-                )
-                futures[future] = "doctor"
-
-            for future in as_completed(futures):
-                role = futures[future]
-                result = future.result()
-
-                if role == "mafia":
-                    mafia_target = result
-                elif role == "detective":
-                    detective_target = self.extract_vote(
-                        result, [n for n in alive_names if n != detectives[0].name]
-                    )
-                elif role == "doctor":
-                    doctor_target = self.extract_vote(result, alive_names)
-                    if doctor_target:
-                        self.last_doctor_target = doctor_target
+            elif role == "doctor":
+                doctor_target = self.extract_vote(result, alive_names)
+                if doctor_target:
+                    self.last_doctor_target = doctor_target
 
         # Post-night processing
         if detective_target:
@@ -700,7 +1022,7 @@ class MafiaGame:
             }
             # Detective's will: their last investigation goes public with the
             # body, so killing the detective no longer buries confirmed info
-            if victim.role == Role.DETECTIVE and self.last_investigation:
+            if self.detective_will and victim.role == Role.DETECTIVE and self.last_investigation:
                 will_target, will_result = self.last_investigation
                 kill_entry["will"] = f"investigated {will_target} — {will_result}"
             self.night_kill_history.append(kill_entry)
@@ -710,11 +1032,10 @@ class MafiaGame:
                 self.emit("detective_will", day=self.day, actor=victim.name,
                           target=self.last_investigation[0],
                           result=self.last_investigation[1])
-            gm_kill = self.gm.narrate_night_kill(victim.name, saved=False)
-            if gm_kill:
-                self.log(f"\n📜 {gm_kill}", "magenta")
-            else:
-                self.log(f"\n💀 {victim.name} was killed during the night! They were: {victim.role.value}", "red")
+            self._narrate(
+                "night", self.gm.narrate_night_kill, victim.name, saved=False,
+                fallback=(f"\n💀 {victim.name} was killed during the night! They were: {victim.role.value}", "red"),
+            )
             if kill_entry.get("will"):
                 self.log(
                     f"📜 {victim.name}'s final notes were found: {kill_entry['will']}",
@@ -728,74 +1049,90 @@ class MafiaGame:
                 "saved": True,
             })
             self.emit("save", day=self.day, target=mafia_target)
-            gm_save = self.gm.narrate_night_kill(mafia_target, saved=True)
-            if gm_save:
-                self.log(f"\n📜 {gm_save}", "magenta")
-            else:
-                self.log(f"\n✨ The doctor's protection saved {doctor_target}!", "green")
+            self._narrate(
+                "night", self.gm.narrate_night_kill, mafia_target, saved=True,
+                fallback=(f"\n✨ The doctor's protection saved {doctor_target}!", "green"),
+            )
         else:
             self.no_kill_nights += 1
             self.emit("night_no_kill", day=self.day)
-            gm_quiet = self.gm.narrate_no_kill()
-            if gm_quiet:
-                self.log(f"\n📜 {gm_quiet}", "magenta")
-            else:
-                self.log(f"\n🌅 No one died during the night.", "green")
+            self._narrate(
+                "night", self.gm.narrate_no_kill,
+                fallback=(f"\n🌅 No one died during the night.", "green"),
+            )
 
     def run(self):
-        """Main game loop"""
-        self.log("🎮 WELCOME TO LLM MAFIA", "bold")
-        self.log(f"Players: {len(self.players)}", "cyan")
-
-        # Assign roles
-        self.assign_roles()
-
-        # Structured event stream for the viewer. Roles only when spectating.
-        self.emit(
-            "game_start",
-            players=[
-                {
-                    "name": p.name,
-                    "seat": i,
-                    "color": seat_color(i),
-                    "model": p.model or self.model,
-                    **({"role": p.role.value} if self.reveal_secrets else {}),
-                }
-                for i, p in enumerate(self.players)
-            ],
-            player_count=len(self.players),
-            provider="claude" if self.use_claude else ("nvidia" if self.use_nvidia else "lm-studio"),
-        )
+        """Main game loop. Every phase is a coroutine on one event loop, and
+        blocking calls share one worker pool for the whole game."""
+        self.scheduler = GameScheduler(self.max_workers)
+        if self.events_path:
+            self.sink = EventSink(self.events_path, self.fsync_every)
+            self.sink.backlog(self.events.to_list(), self.game_log, self.log_public)
+        if self.server:
+            for event in self.events.to_list():
+                self.server.event(event)
+        try:
+            asyncio.run(self._run())
+        finally:
+            self.narration.release()
+            self.scheduler.shutdown()
+            if self.sink:
+                self.sink.close()
+            if self.server:
+                self.server.end()
+
+    async def _run(self):
+        if self.resumed_from is None:
+            self.log("🎮 WELCOME TO LLM MAFIA", "bold")
+            self.log(f"Players: {len(self.players)}", "cyan")
+
+            # Assign roles
+            self.assign_roles()
+
+            # Structured event stream for the viewer. Roles only when spectating.
+            self.emit(
+                "game_start",
+                players=[
+                    {
+                        "name": p.name,
+                        "seat": i,
+                        "color": seat_color(i),
+                        "model": p.model or self.model,
+                        **({"role": p.role.value} if self.reveal_secrets else {}),
+                    }
+                    for i, p in enumerate(self.players)
+                ],
+                player_count=len(self.players),
+                provider=self.provider,
+            )
+        else:
+            # Lines the checkpoint held back behind a narration, and the
+            # narrations it saved unfinished, in their order
+            for item in self._resume_held:
+                if isinstance(item, dict):
+                    self._resume_narration(item)
+                else:
+                    self.log(*item)
 
-        # Game loop
+        # Game loop: day, vote, night, checking for a winner after each
+        # phase and checkpointing while there is none
         max_days = 10
-        while self.day < max_days:
-            # Day phase
-            self.day_phase()
-
-            # Check win before voting
-            winner = self.check_win_condition()
-            if winner:
-                break
-
-            # Voting
-            self.voting_phase()
+        phases = {"day": self.day_phase, "vote": self.voting_phase, "night": self.night_phase}
+        winner = None
+        step = self._next_phase
+        while step or self.day < max_days:
+            phase = checkpoint.PHASES[step]
+            await phases[phase]()
 
-            # Check win after elimination
             winner = self.check_win_condition()
             if winner:
                 break
+            self.save_checkpoint(phase)
 
-            # Night phase
-            self.night_phase()
-
-            # Check win after night
-            winner = self.check_win_condition()
-            if winner:
-                break
-
-            # Garbage collect
-            gc.collect()
+            step = (step + 1) % len(checkpoint.PHASES)
+            if not step and self.collect_between_days:
+                # Garbage collect
+                gc.collect()
 
         # Game over
         self.stamp_resolved_models()
@@ -803,17 +1140,15 @@ class MafiaGame:
         survivors = [p.name for p in self.players if p.alive]
         self.emit("game_over", winner=winner or "timeout", survivors=survivors)
         if winner in ("town", "mafia"):
-            gm_end = self.gm.narrate_game_over(winner, survivors, self.day)
-            if gm_end:
-                self.log(f"\n📜 {gm_end}", "magenta")
+            self._narrate("game_over", self.gm.narrate_game_over, winner, survivors, self.day)
             # Episode packaging for the replay viewer: title/tagline/recap
             # written by the GM, saved top-level in the log by main.py.
             inputs = episode_inputs_from_events(
-                self.events.to_list(),
+                self.events,
                 roles={p.name: p.role.value for p in self.players},
             )
             if inputs:
-                self.episode = self.gm.write_episode(**inputs)
+                self.episode = await self._offload(self.gm.write_episode, **inputs)
                 if self.episode.get("title"):
                     self.log(f"\n🎬 Episode: {self.episode['title']}", "magenta")
         if winner == "town":
@@ -829,6 +1164,10 @@ class MafiaGame:
             status = "💀" if not p.alive else "✅"
             self.log(f"  {status} {p.name}: {p.role.value}", "cyan")
 
+        # Narration still being written lands here, before the stats
+        await self._join_recaps()
+        await self.narration.drain()
+
         # Print stats
         stats = self.compute_stats()
         self.log("\n📊 GAME STATS:", "bold")
@@ -840,9 +1179,170 @@ class MafiaGame:
         self.log("  Vote accuracy:", "cyan")
         for name, ps in stats["players"].items():
             self.log(f"    {name} ({ps.get('role', '?')}): {ps['vote_accuracy']} mafia votes correct", "cyan")
+        if "resumed_from" in stats:
+            r = stats["resumed_from"]
+            self.log(f"  Resumed from a checkpoint after the {r['phase']} phase of day {r['day']}", "cyan")
+        if self.run_stats:
+            print("\n\033[1m⚙️  RUN STATS:\033[0m")
+            for line in self.run_stats_lines(stats):
+                print(f"\033[96m  {line}\033[0m")
+
+        if self.sink:
+            self.sink.end(self.day, stats, self.episode)
+
+        if self._async_client:
+            await self._async_client.close()
+
+    @staticmethod
+    def run_stats_lines(stats: Dict) -> List[str]:
+        """compute_stats()'s infrastructure counters, one line per part, for
+        --run-stats. They are for whoever runs the game, so they are printed
+        and never logged: spectators and the published log don't see them."""
+        lines = []
+        c = stats["concurrency"]
+        lines.append(f"In-flight limit ({c['mode']}): {c['limit']} at the end, peak {c['peak_in_flight']}, {len(c['decisions'])} changes")
+        m = stats["model_swaps"]
+        lines.append(f"Model swaps ({m['mode']} order): {m['swaps']} in {m['calls']} calls across {len(m['runs'])} models, {m['waited_s']}s held for affinity")
+        c, d = stats["context_cache"], stats["summary_cache"]
+        lines.append(f"Caches: shared context rendered {c['misses']}, reused {c['hits']}; day summary built {d['misses']}, reused {d['hits']}")
+        n = stats["narration"]
+        lines.append(f"GM narration: {n['calls']} calls, {n['gm_s']}s of GM time, {n['waited_s']}s of it on the critical path")
+        q = stats["questioning"]
+        lines.append(f"Questioning ({q['mode']}, {q['window']} in flight): {q['seconds']}s")
+        if "scheduler" in stats:
+            w = stats["scheduler"]
+            busiest = ", ".join(
+                f"{kind} {t['count']}x {t['run_s']}s (+{t['wait_s']}s queued)"
+                for kind, t in list(w["tasks"].items())[:3]
+            )
+            lines.append(f"Workers: {w['workers']}, peak {w['peak_in_flight']} in flight / {w['peak_queued']} queued" + (f"; {busiest}" if busiest else ""))
+        if "streaming" in stats:
+            s = stats["streaming"]
+            lines.append(f"Streamed name-only calls: {s['calls']}, {s['stopped_early']} stopped at the name")
+        if stats.get("claude_cli", {}).get("calls"):
+            c = stats["claude_cli"]
+            pool = f", {c['cold_starts']} cold starts, {c['recycled']} stale spares replaced" if "cold_starts" in c else ""
+            lines.append(f"Claude CLI: {c['calls']} calls ({c['pooled']} pooled{pool}), {c['overhead_s']}s startup overhead, {c['mean_overhead_s']}s per call")
+        for name, b in stats.get("rate_limits", {}).items():
+            line = f"Rate limit {name}: {b['calls']} calls, {b['waited_s']}s queued (max {b['max_wait_s']}s), {b['throttled']} server back-offs"
+            if len(b["classes"]) > 1:
+                line += "; by class " + ", ".join(f"{c} {w['waited_s']}s over {w['calls']}" for c, w in b["classes"].items())
+            lines.append(line)
+        if "shared_budget" in stats:
+            b = stats["shared_budget"]
+            lines.append(f"Shared budget: {b['calls']} calls, {b['waited_s']}s waiting on the machine-wide budget")
+        for url, e in stats.get("endpoints", {}).items():
+            lines.append(f"Endpoint {url}: {e['calls']} calls, {e['errors']} errors, {e['ejections']} ejections, {e['backoffs']} back-offs, mean {e['mean_latency_s']}s")
+        if stats.get("cassette", {}).get("mode") == "replay":
+            c = stats["cassette"]
+            lines.append(f"Replay: {c['hits']} exact + {c['loose_hits']} loose hits, {c['misses']} misses, {c['unused']} recorded replies unused")
+        if "event_sink" in stats:
+            e = stats["event_sink"]
+            lines.append(f"Event sink: {e['records']} records ({e['events']} events) to {e['file']}, {e['fsyncs']} fsyncs")
+        if "spectators" in stats:
+            v = stats["spectators"]
+            lines.append(f"Live server on port {v['port']}: {v['messages']} events sent, {v['peak_spectators']} spectators at peak")
+        return lines
+
+    @property
+    def provider(self) -> str:
+        return "claude" if self.use_claude else ("nvidia" if self.use_nvidia else "lm-studio")
+
+    def save_checkpoint(self, phase: str):
+        """Write the game as it stands after `phase` to checkpoint_path."""
+        if not self.checkpoint_path:
+            return
+        checkpoint.save(self.checkpoint_path, self.checkpoint_state(phase))
+        self.last_checkpoint = (self.day, phase)
+
+    def checkpoint_state(self, phase: str) -> Dict:
+        """Everything a later phase reads, as JSON (see checkpoint.py)."""
+        # Recaps that have landed but aren't filed until the next day starts;
+        # one still being written is in the held narrations
+        recaps = {}
+        for day, recap in self._recaps.items():
+            if isinstance(recap, str):
+                recaps[day] = recap
+            elif recap.task.done() and not recap.task.cancelled() and recap.task.exception() is None:
+                recaps[day] = recap.task.result()
+        return {
+            "version": checkpoint.CHECKPOINT_VERSION,
+            "day": self.day,
+            "phase": phase,
+            "provider": self.provider,
+            "players": [
+                {"name": p.name, "role": p.role.value, "alive": p.alive,
+                 "personality": p.personality, "model": p.model}
+                for p in self.players
+            ],
+            "events": self.events.to_list(),
+            "game_log": self.game_log,
+            "public_log": self.public_log,
+            "log_public": self.log_public,
+            "held": self.narration.pending(),
+            "private_notes": self.private_notes,
+            "vote_history": self.vote_history,
+            "night_kill_history": self.night_kill_history,
+            "day_summaries": {str(day): text for day, text in self.day_summaries.items()},
+            "recaps": {str(day): text for day, text in recaps.items()},
+            "last_doctor_target": self.last_doctor_target,
+            "detective_investigated": sorted(self.detective_investigated),
+            "last_investigation": list(self.last_investigation) if self.last_investigation else None,
+            "trusted_person": self.trusted_person,
+            "no_kill_nights": self.no_kill_nights,
+            "seed": self.seed,
+            "random": checkpoint.rng_state(self.rng.getstate()),
+        }
+
+    def resume(self, state: Dict):
+        """Load a checkpoint into a game built with the same backend flags;
+        run() then carries on with the phase after the one it saved."""
+        if state["provider"] != self.provider:
+            raise ValueError(f"checkpoint was played on {state['provider']}, not {self.provider}")
+        self.players = [
+            Player(p["name"], role=Role(p["role"]), alive=p["alive"],
+                   personality=p["personality"], model=p["model"])
+            for p in state["players"]
+        ]
+        self.day = state["day"]
+        self.events = EventLog.from_list(state["events"])
+        self.game_log = state["game_log"]
+        self.public_log = state["public_log"]
+        self.log_public = state["log_public"]
+        self.private_notes = state["private_notes"]
+        self.vote_history = state["vote_history"]
+        self.night_kill_history = state["night_kill_history"]
+        self.day_summaries = {int(day): text for day, text in state["day_summaries"].items()}
+        self.summary_version += 1
+        self._recaps = {int(day): text for day, text in state["recaps"].items()}
+        self.last_doctor_target = state["last_doctor_target"]
+        self.detective_investigated = set(state["detective_investigated"])
+        self.last_investigation = tuple(state["last_investigation"]) if state["last_investigation"] else None
+        self.trusted_person = state["trusted_person"]
+        self.no_kill_nights = state["no_kill_nights"]
+        # Checkpoints from before the game had its own generator saved the
+        # random module's state, which restores into it all the same
+        self.seed = state.get("seed", self.seed)
+        self.rng.setstate(checkpoint.rng_restore(state["random"]))
+        self._resume_held = state["held"]
+        self._next_phase = checkpoint.next_phase(state)
+        self.resumed_from = (self.day, state["phase"])
+
+    # Set in __init__; instances built without it log straight through
+    narration: Optional[NarrationQueue] = None
+    # Set by run() with events_path
+    sink: Optional[EventSink] = None
+    server: Optional[EventServer] = None
 
     def log(self, message: str, style: str = "normal", public: bool = True):
-        """Print and store game events"""
+        """Print and store game events, in game order (a narration still
+        being written holds back the lines after it)."""
+        if self.narration is not None:
+            self.narration.line(message, style, public)
+        else:
+            self._write_log(message, style, public)
+
+    def _write_log(self, message: str, style: str, public: bool):
         colors = {
             "normal": "\033[0m",
             "red": "\033[91m",
@@ -856,14 +1356,21 @@ class MafiaGame:
         if public or self.reveal_secrets:
             print(f"{colors.get(style, '')}{message}\033[0m")
         self.game_log.append(message)
+        self.log_public.append(public)
         if public:
             self.public_log.append(message)
+        if self.sink:
+            self.sink.line(message, public)
 
     def emit(self, type: str, private: bool = False, **fields):
         """Append a structured event. Private events are dropped unless reveal_secrets."""
         if private and not self.reveal_secrets:
             return
-        self.events.emit(type, **fields)
+        event = self.events.emit(type, **fields)
+        if self.sink:
+            self.sink.event(event)
+        if self.server:
+            self.server.event(event)
 
     def stamp_resolved_models(self):
         """Rewrite the game_start seats from the alias we asked the CLI for
@@ -871,13 +1378,16 @@ class MafiaGame:
         is emitted before the map is filled, so this runs at game over."""
         if not self.use_claude:
             return
-        for event in self.events.to_list():
-            if event["type"] != "game_start":
-                continue
+        for event in self.events.of_type("game_start"):
             for seat in event["players"]:
                 resolved = RESOLVED_CLAUDE_MODELS.get(seat["model"])
                 if resolved:
                     seat["model"] = short_model_name(resolved)
+            seq = self.events.events.index(event)
+            if self.sink:
+                self.sink.amend(seq, event)
+            if self.server:
+                self.server.amend(seq, event)
 
     def add_private_note(self, player: Player, note: str):
         """Record something only this player knows (e.g. a detective result).
@@ -892,46 +1402,57 @@ class MafiaGame:
     def render_public_transcript(self, day: int) -> str:
         """The current day's discussion as every player sees it, rendered from
         the public event stream (private events never reach self.events in a
-        normal run). Capped at the last TRANSCRIPT_MAX_LINES."""
-        lines: List[str] = []
-        for e in self.events.to_list():
-            if e.get("day") != day:
-                continue
-            t = e["type"]
-            if t == "statement":
-                lines.append(f"{e['actor']}: {e['text']}")
-            elif t == "question":
-                lines.append(f"{e['actor']} → {e['target']}: {e['text']}")
-            elif t == "answer":
-                lines.append(f"{e['actor']} (to {e['target']}): {e['text']}")
-            elif t == "accusation":
-                lines.append(f"{e['actor']} accuses: {e['text']}")
-            elif t == "vote":
-                lines.append(f"{e['actor']} votes {e['target']}")
-        return "\n".join(lines[-self.TRANSCRIPT_MAX_LINES:])
-
-    def build_context_for_player(self, player: Player, base_context: str) -> str:
-        parts = []
+        normal run). Capped at the last TRANSCRIPT_MAX_LINES. The lines are
+        rendered once, as each event is emitted (EventLog.transcript)."""
+        return "\n".join(self.events.transcript(day)[-self.TRANSCRIPT_MAX_LINES:])
+
+    # Bumped whenever day_summaries changes, so the shared context knows
+    summary_version = 0
+    # One SharedContext at a time: a fan-out reads the same one for every seat
+    _shared_context: Optional[SharedContext] = None
+    context_hits = 0
+    context_misses = 0
+
+    def shared_context(self) -> SharedContext:
+        """The recap and transcript every seat sees right now, rendered once
+        per (day, event count, summary version)."""
+        key = (self.day, len(self.events.to_list()), self.summary_version)
+        with self._context_lock:
+            shared = self._shared_context
+            if shared is not None and shared.key == key:
+                self.context_hits += 1
+                return shared
+            self.context_misses += 1
 
         # Earlier days: compressed GM recaps (the current day is shown live below).
         prior = sorted((d, s) for d, s in self.day_summaries.items() if d < self.day)
-        if prior:
-            summary_block = "\n".join(f"Day {d}: {s}" for d, s in prior)
+        recap = "\n".join(f"Day {d}: {s}" for d, s in prior)
+        shared = SharedContext(key, recap, self.render_public_transcript(self.day))
+        with self._context_lock:
+            self._shared_context = shared
+        return shared
+
+    def day_summary(self, alive_names: List[str]) -> str:
+        """build_day_summary for today, rendered once per phase."""
+        return self.summaries.get(self.day, alive_names, self.vote_history, self.night_kill_history)
+
+    def build_context_for_player(
+        self, player: Player, base_context: str, shared: Optional[SharedContext] = None,
+    ) -> str:
+        parts = []
+        shared = shared or self.shared_context()
+
+        if shared.recap:
             parts.append(
-                "=== EARLIER DAYS (recap) ===\n" + summary_block + "\n=== END RECAP ==="
+                "=== EARLIER DAYS (recap) ===\n" + shared.recap + "\n=== END RECAP ==="
             )
 
         # Today's discussion, public and shared by everyone reasoning right now.
-        transcript = self.render_public_transcript(self.day)
-        if transcript:
+        if shared.transcript:
             # Mark the player's own lines so they don't mistake them for
             # someone else's opinion (HOLMES once recycled an anti-HOLMES
             # statement as his own opening)
-            transcript = re.sub(
-                rf"(?m)^{re.escape(player.name)}\b",
-                f"{player.name} (YOU)",
-                transcript,
-            )
+            transcript = shared.transcript_for(player.name)
             parts.append(
                 "=== TODAY'S DISCUSSION (public — everyone sees this) ===\n"
                 + transcript
@@ -953,94 +1474,15 @@ class MafiaGame:
 
         return "\n\n".join(parts)
 
-    def _is_heading_line(self, line: str) -> bool:
-        l = line.strip()
-        if not l:
-            return True
-        l = re.sub(r"^[^\w]+", "", l).strip().lower()
-        if not l:
-            return True
-        if re.match(r"^(day|night)\s*\d+\s*[-–—]", l):
-            return True
-        if "town meeting" in l and len(l.split()) <= 6:
-            return True
-        if re.match(r"^(discussion|voting)\s*(phase)?$", l) and len(l.split()) <= 3:
-            return True
-        return False
+    # Built on first use and again only when the roster changes (see sanitize.py)
+    _sanitizer: Optional[ResponseSanitizer] = None
 
     def sanitize_response(self, player: Player, text: str) -> str:
-        text = (text or "").strip()
-        if not text:
-            return ""
-
-        # Strip internal reasoning blocks — these must never be visible to other players
-        text = re.sub(r"<thinking>.*?</thinking>", "", text, flags=re.DOTALL | re.IGNORECASE)
-        text = re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL | re.IGNORECASE)
-        # Unterminated think block (truncated mid-reasoning): drop to end of text
-        text = re.sub(r"<think(?:ing)?>.*$", "", text, flags=re.DOTALL | re.IGNORECASE)
-        text = text.strip()
-        if not text:
-            return ""
-
-        # Clean up formatting
-        text = text.replace("\r\n", "\n").replace("\r", "\n")
-        lines = [ln.rstrip() for ln in text.split("\n")]
-
-        # Remove heading lines
-        while lines and self._is_heading_line(lines[0]):
-            lines.pop(0)
-
-        text = "\n".join(lines).strip()
-
-        # Strip prompt-template labels the model echoed ("Discussion: MARSHAL...")
-        text = re.sub(
-            r"(?i)^(?:discussion|statement|answer|accusation|vote|response|reply)\s*:\s*",
-            "",
-            text,
-        ).strip()
-
-        # Remove self-referential prefixes
-        name = re.escape(player.name)
-        prefix_patterns = [
-            rf"(?i)^\s*{name}\s*[:\-–—]\s*",
-            rf"(?i)^\s*{name}\s+(?:says|said|asks|responds|replies)\s*:\s*",
-        ]
-
-        for pat in prefix_patterns:
-            text = re.sub(pat, "", text).strip()
-
-        # Stop at other player names
-        other_names = [p.name for p in self.players if p.name != player.name]
-        if other_names:
-            pat = re.compile(
-                rf"(?im)^\s*(?:{'|'.join(map(re.escape, other_names))})\s*:",
-                re.MULTILINE,
-            )
-            m = pat.search(text)
-            if m:
-                text = text[: m.start()].rstrip()
-
-        # Take first complete paragraph only
-        paragraphs = text.split("\n\n")
-        text = paragraphs[0].strip()
-
-        # Clean up quotes and normalize spacing
-        text = text.strip(" \t\\\"'`")
-        text = " ".join(text.split())
-
-        # KEEP COMPLETE SENTENCES - don't cut off at 3
-        # Honorifics (DR. VANCE, Mr., Mrs., Ms., St.) are not sentence ends
-        sentences = re.split(
-            r"(?<!\bdr\.)(?<!\bmr\.)(?<!\bms\.)(?<!\bst\.)(?<!\bmrs\.)(?<=[.!?])\s+",
-            text,
-            flags=re.IGNORECASE,
-        )
-
-        # Only limit if we have TOO many sentences (>5)
-        if len(sentences) > 5:
-            return " ".join(sentences[:4]).strip()
-
-        return text
+        roster = tuple(p.name for p in self.players)
+        sanitizer = self._sanitizer
+        if sanitizer is None or sanitizer.roster != roster:
+            sanitizer = self._sanitizer = ResponseSanitizer(roster)
+        return sanitizer(player.name, text)
 
     # Enforcement for the "NEVER reveal your role" rule: explicit first-person
     # self-labels only, scoped to the speaker's real role so persona speech
@@ -1064,16 +1506,21 @@ class MafiaGame:
         ),
     }
 
-    def query_model(
+    def _query_steps(
         self,
         player: Player,
         prompt: str,
-        context: str = "",
-        min_words: int = 4,
-        public_speech: bool = False,
-        max_tokens: int = 2048,
-    ) -> str:
-        context = self.build_context_for_player(player, context)
+        context: str,
+        min_words: int,
+        public_speech: bool,
+        max_tokens: int,
+        shared: Optional[SharedContext] = None,
+    ) -> Generator[Tuple[List[Dict], str, int], str, str]:
+        """The query_model conversation without the I/O: yields (messages,
+        model, max_tokens) for each backend call and is sent the raw reply
+        back. query_model and query_model_async drive it, so the retry rules
+        live in one place whichever way the call goes out."""
+        context = self.build_context_for_player(player, context, shared)
 
         system_prompt = f"""{self.universal_prompt}
 
@@ -1094,67 +1541,89 @@ Here is the game history so far:
         ]
 
         seat_model = player.model or self.model
-        try:
-            self.log(f"  [Querying {seat_model}... ]", "cyan", public=False)
-            start_time = time.time()
+        self.log(f"  [Querying {seat_model}... ]", "cyan", public=False)
+        start_time = time.time()
+
+        response_text = yield messages, seat_model, max_tokens
+
+        elapsed = time.time() - start_time
+        tokens = len(response_text.split()) * 1.3
+        tps = tokens / elapsed if elapsed > 0 else 0
+        backend = "Claude" if self.use_claude else ("NVIDIA" if self.use_nvidia else "LM Studio")
+        self.log(
+            f"  [{backend}: {elapsed:.1f}s, ~{tps:.0f} tok/s]",
+            "cyan",
+            public=False,
+        )
 
-            response_text = self._call_backend(
-                messages, model=seat_model, max_tokens=max_tokens
-            )
+        response_text = self.sanitize_response(player, response_text)
 
-            elapsed = time.time() - start_time
-            tokens = len(response_text.split()) * 1.3
-            tps = tokens / elapsed if elapsed > 0 else 0
-            backend = "Claude" if self.use_claude else ("NVIDIA" if self.use_nvidia else "LM Studio")
+        if not response_text or (
+            min_words > 0 and len(response_text.split()) < min_words
+        ):
             self.log(
-                f"  [{backend}: {elapsed:.1f}s, ~{tps:.0f} tok/s]",
-                "cyan",
-                public=False,
+                f"  [empty/short reply from {seat_model} (reasoning may have consumed the budget) — retrying]",
+                "yellow", public=False,
             )
-
+            retry_suffix = (
+                "Reply with a direct answer. No headings."
+                if min_words <= 1
+                else "Provide a concise 2-4 sentence answer. No headings."
+            )
+            retry_messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": f"Current task: {prompt}\n\n{retry_suffix}"},
+            ]
+            response_text = yield retry_messages, seat_model, 2048
             response_text = self.sanitize_response(player, response_text)
 
-            if not response_text or (
-                min_words > 0 and len(response_text.split()) < min_words
-            ):
-                self.log(
-                    f"  [empty/short reply from {seat_model} (reasoning may have consumed the budget) — retrying]",
-                    "yellow", public=False,
-                )
-                retry_suffix = (
-                    "Reply with a direct answer. No headings."
-                    if min_words <= 1
-                    else "Provide a concise 2-4 sentence answer. No headings."
-                )
-                retry_messages = [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"Current task: {prompt}\n\n{retry_suffix}"},
-                ]
-                response_text = self._call_backend(retry_messages, model=seat_model)
-                response_text = self.sanitize_response(player, response_text)
-
-            leak_re = self.ROLE_LEAK_PATTERNS.get(player.role) if public_speech else None
-            if leak_re and response_text and leak_re.search(response_text):
-                self.log(
-                    f"  [role leak by {player.name} — re-querying]", "red", public=False
-                )
-                retry_messages = [
-                    {"role": "system", "content": system_prompt},
-                    {
-                        "role": "user",
-                        "content": f"Current task: {prompt}\n\nIMPORTANT: Your previous reply revealed your secret role. NEVER state your own role. Rewrite your reply without any mention of your role.",
-                    },
-                ]
-                response_text = self.sanitize_response(
-                    player, self._call_backend(retry_messages, model=seat_model)
-                )
-                if not response_text or leak_re.search(response_text):
-                    response_text = f"*{player.name} mumbles something noncommittal*"
+        leak_re = self.ROLE_LEAK_PATTERNS.get(player.role) if public_speech else None
+        if leak_re and response_text and leak_re.search(response_text):
+            self.log(
+                f"  [role leak by {player.name} — re-querying]", "red", public=False
+            )
+            retry_messages = [
+                {"role": "system", "content": system_prompt},
+                {
+                    "role": "user",
+                    "content": f"Current task: {prompt}\n\nIMPORTANT: Your previous reply revealed your secret role. NEVER state your own role. Rewrite your reply without any mention of your role.",
+                },
+            ]
+            response_text = self.sanitize_response(
+                player, (yield retry_messages, seat_model, 2048)
+            )
+            if not response_text or leak_re.search(response_text):
+                response_text = f"*{player.name} mumbles something noncommittal*"
 
-            if not response_text:
-                response_text = f"*{player.name} remains silent*"
-            return response_text
+        if not response_text:
+            response_text = f"*{player.name} remains silent*"
+        return response_text
 
+    def query_model(
+        self,
+        player: Player,
+        prompt: str,
+        context: str = "",
+        min_words: int = 4,
+        public_speech: bool = False,
+        max_tokens: int = 2048,
+        early_stop: Optional[EarlyStop] = None,
+        choices: Optional[List[str]] = None,
+        priority: str = "discussion",
+        shared: Optional[SharedContext] = None,
+    ) -> str:
+        steps = self._query_steps(player, prompt, context, min_words, public_speech, max_tokens, shared)
+        seat_model = player.model or self.model
+        try:
+            messages, model, budget = next(steps)
+            while True:
+                reply = self._call_backend(
+                    messages, model=model, max_tokens=budget,
+                    early_stop=early_stop, choices=choices, priority=priority,
+                )
+                messages, model, budget = steps.send(reply)
+        except StopIteration as done:
+            return done.value
         except BackendUnavailable:
             # The backend is gone, not glitching. Let this reach main.py so the
             # run aborts instead of saving a log full of silent players.
@@ -1163,8 +1632,43 @@ Here is the game history so far:
             self.log(f"  [ERROR querying {seat_model}: {e}]", "red", public=False)
             return f"*{player.name} remains silent*"
 
+    async def query_model_async(
+        self,
+        player: Player,
+        prompt: str,
+        context: str = "",
+        min_words: int = 4,
+        public_speech: bool = False,
+        max_tokens: int = 2048,
+        early_stop: Optional[EarlyStop] = None,
+        choices: Optional[List[str]] = None,
+        priority: str = "discussion",
+        shared: Optional[SharedContext] = None,
+    ) -> str:
+        """query_model for async mode: same conversation, awaited backend."""
+        steps = self._query_steps(player, prompt, context, min_words, public_speech, max_tokens, shared)
+        seat_model = player.model or self.model
+        try:
+            messages, model, budget = next(steps)
+            while True:
+                reply = await self._call_backend_async(
+                    messages, model=model, max_tokens=budget,
+                    early_stop=early_stop, choices=choices, priority=priority,
+                )
+                messages, model, budget = steps.send(reply)
+        except StopIteration as done:
+            return done.value
+        except BackendUnavailable:
+            raise
+        except Exception as e:
+            self.log(f"  [ERROR querying {seat_model}: {e}]", "red", public=False)
+            return f"*{player.name} remains silent*"
+
     def _call_backend(
-        self, messages: List[Dict], model: Optional[str] = None, max_tokens: int = 2048
+        self, messages: List[Dict], model: Optional[str] = None, max_tokens: int = 2048,
+        early_stop: Optional[EarlyStop] = None,
+        choices: Optional[List[str]] = None,
+        priority: str = "discussion",
     ) -> str:
         # Reasoning is on (no /no_think): the budget must fit thinking AND the
         # spoken reply, and the thinking channel must stay private. Retries in
@@ -1173,26 +1677,68 @@ Here is the game history so far:
         # (Claude CLI backend has no max_tokens knob; the cap applies to the
         # OpenAI-compatible backends only.)
         try:
-            response = call_llm(
-                self._lm_client, model or self.model, messages,
-                use_nvidia=self.use_nvidia, schema_key="response",
-                max_tokens=max_tokens, private_reasoning=True,
-                use_claude=self.use_claude,
-                on_retry=lambda wait: self.log(
-                    f"  [429 rate limit — retrying in {wait:.0f}s]", "yellow", public=False
-                ),
-            )
+            with self.affinity.turn(model or self.model):
+                response = call_llm(
+                    self._lm_client, model or self.model, messages,
+                    use_nvidia=self.use_nvidia, schema_key="response",
+                    max_tokens=max_tokens, private_reasoning=True,
+                    use_claude=self.use_claude,
+                    on_retry=self._log_retry,
+                    on_wait=self._log_wait,
+                    slots=self.concurrency,
+                    early_stop=early_stop,
+                    choices=choices,
+                    priority=priority,
+                )
+        except Exception as error:
+            self._count_failure(error)
+            raise
+        self.consecutive_failures = 0
+        return response
+
+    async def _call_backend_async(
+        self, messages: List[Dict], model: Optional[str] = None, max_tokens: int = 2048,
+        early_stop: Optional[EarlyStop] = None,
+        choices: Optional[List[str]] = None,
+        priority: str = "discussion",
+    ) -> str:
+        try:
+            async with self.affinity.turn_async(model or self.model):
+                response = await call_llm_async(
+                    self._async_client, model or self.model, messages,
+                    use_nvidia=self.use_nvidia, schema_key="response",
+                    max_tokens=max_tokens, private_reasoning=True,
+                    use_claude=self.use_claude,
+                    on_retry=self._log_retry,
+                    on_wait=self._log_wait,
+                    slots=self.concurrency,
+                    early_stop=early_stop,
+                    choices=choices,
+                    priority=priority,
+                )
         except Exception as error:
-            self.consecutive_failures += 1
-            if self.consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
-                raise BackendUnavailable(
-                    f"{self.consecutive_failures} backend calls failed in a row; "
-                    f"last error: {error}"
-                ) from error
+            self._count_failure(error)
             raise
         self.consecutive_failures = 0
         return response
 
+    def _log_retry(self, wait: float):
+        self.log(f"  [429 rate limit — retrying in {wait:.0f}s]", "yellow", public=False)
+
+    def _log_concurrency(self, limit: int, reason: str):
+        self.log(f"  [in-flight limit → {limit}: {reason}]", "cyan", public=False)
+
+    def _log_wait(self, waited: float):
+        self.log(f"  [queued {waited:.1f}s for a rate-limit slot]", "cyan", public=False)
+
+    def _count_failure(self, error: Exception):
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
+            raise BackendUnavailable(
+                f"{self.consecutive_failures} backend calls failed in a row; "
+                f"last error: {error}"
+            ) from error
+
     def extract_vote(
         self, response: str, valid_targets: List[str], prefer_first: bool = False
     ) -> Optional[str]:
@@ -1200,22 +1746,7 @@ Here is the game history so far:
         # ("MARSHAL, ... keeps redirecting to SAGE" accuses MARSHAL), so take
         # the first hit; vote replies trail with it, so default stays last.
         response_lower = response.lower()
-        # Aliases: the full name plus each distinctive word, so a bare "SILVA"
-        # hits AMBASSADOR SILVA and "VANCE" hits DR. VANCE (full-name-only
-        # matching once recorded PIP's accusation of SILVA as targeting RICO).
-        # An alias shared by two players identifies neither and is dropped.
-        name_map: Dict[str, str] = {}
-        ambiguous = set()
-        for name in valid_targets:
-            keys = {name.lower()} | {
-                w for w in re.findall(r"[a-z]+", name.lower()) if len(w) >= 3
-            }
-            for key in keys:
-                if name_map.get(key, name) != name:
-                    ambiguous.add(key)
-                name_map[key] = name
-        for key in ambiguous:
-            del name_map[key]
+        matcher = alias_matcher(tuple(valid_targets))
 
         # Explicit vote-intent patterns tried first so "vote X because Y mentions Z" picks X not Z.
         # Vote/go-with must be first-person ("I'm voting X"): discussing someone
@@ -1234,30 +1765,59 @@ Here is the game history so far:
         explicit_hits: List[Tuple[int, str]] = []
         for pat in explicit_patterns:
             for m in re.finditer(pat, response_lower):
-                candidate = m.group(1).strip()
                 # Earliest name in the captured window wins — dict order once
                 # picked RICO out of "go with MARSHAL — ...against RICO's"
-                best = None
-                for key, name in name_map.items():
-                    hit = re.search(rf"\b{re.escape(key)}\b", candidate)
-                    if hit and (best is None or hit.start() < best[0]):
-                        best = (hit.start(), name)
+                best = matcher.first(m.group(1).strip())
                 if best:
-                    explicit_hits.append((m.start(), best[1]))
+                    explicit_hits.append((m.start(), best))
         if explicit_hits:
             explicit_hits.sort(key=lambda x: x[0])
             return explicit_hits[0][1] if prefer_first else explicit_hits[-1][1]
 
         # Fallback: first/last name mentioned anywhere in response
-        all_hits: List[Tuple[int, str]] = []
-        for key, name in name_map.items():
-            for hit in re.finditer(rf"\b{re.escape(key)}\b", response_lower):
-                all_hits.append((hit.start(), name))
+        all_hits = matcher.hits(response_lower)
         if all_hits:
-            all_hits.sort(key=lambda x: x[0])
             return all_hits[0][1] if prefer_first else all_hits[-1][1]
         return None
 
+    def _name_only(self, targets: List[str], no_kill: bool = False) -> Dict[str, Any]:
+        """query_model kwargs for a reply that is just one of `targets` (or
+        NO_KILL): the enum that pins it on LM Studio, the --stream-names cut
+        for the backends that write it freely, and the front of the rate
+        limit queue, since a pick is a decision the phase is waiting on."""
+        return {
+            "choices": list(targets) + (["NO_KILL"] if no_kill else []),
+            "early_stop": self._name_stop(targets, no_kill=no_kill),
+            "priority": "decision",
+        }
+
+    def _fallback_pick(self, targets: List[str]) -> Optional[str]:
+        # Only a failed call leaves a constrained pick empty; don't make one up
+        return None if self.names_constrained else self.rng.choice(targets)
+
+    def _name_stop(self, valid_targets: List[str], no_kill: bool = False) -> Optional[EarlyStop]:
+        """--stream-names: an early_stop for a reply that only has to name one
+        of `valid_targets` (or NO_KILL, with `no_kill`). Once the finished
+        sentences so far name exactly one target, they are the reply; the
+        rest would only be the reasoning behind it. Two names, or a sentence
+        still being written, and the stream runs on."""
+        if not self.stream_names:
+            return None
+        matcher = alias_matcher(tuple(valid_targets))
+
+        def early_stop(text: str) -> Optional[str]:
+            end = max(text.rfind(mark) for mark in ".!?\n")
+            if end < 0:
+                return None
+            said = text[: end + 1]
+            lowered = said.lower()
+            named = {name for _, name in matcher.hits(lowered)}
+            if len(named) == 1 or (no_kill and not named and NO_KILL_RE.search(lowered)):
+                return said.strip()
+            return None
+
+        return early_stop
+
     def parse_mafia_choice(
         self,
         response: str,
@@ -1268,14 +1828,11 @@ Here is the game history so far:
         target = self.extract_vote(response, valid_targets)
         if target:
             return target
-        rl = response.strip().lower()
-        if re.search(
-            r"\b(?:no[ _]?kill|nokill|skip|pass|nobody|no one|none|don'?t kill)\b", rl
-        ):
+        if NO_KILL_RE.search(response.strip().lower()):
             return "no_kill"
         return None
 
-    def mafia_conversation_and_choose_target(
+    async def mafia_conversation_and_choose_target(
         self, mafia: List[Player], alive_names: List[str], context: str
     ) -> Optional[str]:
         if not mafia:
@@ -1290,7 +1847,10 @@ Here is the game history so far:
             m = mafia[0]
             prompt = f"It's night. You are Mafia.\nChoose EXACTLY ONE of these targets: {', '.join(valid_targets)}\nOr choose NO_KILL.\nReply with ONLY the target name or NO_KILL."
             for attempt in range(3):
-                resp = self.query_model(m, prompt, context, min_words=1, max_tokens=512)
+                resp = await self._ask(
+                    m, prompt, context, min_words=1, max_tokens=512,
+                    **self._name_only(valid_targets, no_kill=True),
+                )
                 self.log(f"   (night reply: {resp[:120]})", "red", public=False)
                 choice = self.parse_mafia_choice(resp, valid_targets)
                 if choice:
@@ -1298,43 +1858,57 @@ Here is the game history so far:
                         self.log("🌙 Mafia chose NO_KILL tonight", "red", public=False)
                         return None
                     return choice
-            return random.choice(valid_targets)
+            return self._fallback_pick(valid_targets)
 
         self.log("\n🤫 MAFIA WHISPER CHANNEL (private)", "red", public=False)
         chat: List[str] = []
         rounds = 2
 
+        async def whisper(m: Player, prompt: str) -> Union[str, Exception]:
+            chat_context = (
+                context
+                + "\n\nPrivate mafia chat so far:\n"
+                + ("\n".join(chat) if chat else "(no messages yet)")
+                + ""
+            )
+            try:
+                return await self._ask(m, prompt, chat_context)
+            except BackendUnavailable:
+                raise
+            except Exception as e:
+                return e
+
         for r in range(rounds):
             self.log(f"   (round {r + 1}/{rounds})", "red", public=False)
+            if r == 0:
+                prompt = f"Mafia coordination: Suggest ONE target from this list: {', '.join(valid_targets)}. One sentence reason. START with the target's name."
+            else:
+                prompt = f"Mafia coordination: Based on the discussion, confirm or change your target. Choose from: {', '.join(valid_targets)}. Reply with name only or one sentence."
+            # Round 1 is written blind, so every suggestion goes out at once;
+            # the confirmation round reads the chat as it grows unless
+            # --parallel-mafia-confirm. Either way the chat is written up in
+            # seat order once the replies are in.
+            fan_out = r == 0 or self.parallel_mafia_confirm
+            replies = {}
+            if fan_out:
+                jobs = [(m, whisper(m, prompt)) for m in mafia]
+                replies = {m.name: response async for m, response in self._fan_out(jobs)}
             round_choices: List[Optional[str]] = []
             for m in mafia:
-                chat_context = (
-                    context
-                    + "\n\nPrivate mafia chat so far:\n"
-                    + ("\n".join(chat) if chat else "(no messages yet)")
-                    + ""
-                )
-                if r == 0:
-                    prompt = f"Mafia coordination: Suggest ONE target from this list: {', '.join(valid_targets)}. One sentence reason. START with the target's name."
+                response = replies[m.name] if fan_out else await whisper(m, prompt)
+                if isinstance(response, Exception):
+                    self.log(f"   {m.name}: [error: {response}]", "red", public=False)
+                    round_choices.append(None)
+                elif response and "remains silent" not in response:
+                    chat.append(f"{m.name}: {response}")
+                    self.log(f"   {m.name}: {response}", "red", public=False)
+                    self.emit("mafia_chat", private=True, day=self.day,
+                              actor=m.name, text=response)
+                    round_choices.append(
+                        self.extract_vote(response, valid_targets, prefer_first=True)
+                    )
                 else:
-                    prompt = f"Mafia coordination: Based on the discussion, confirm or change your target. Choose from: {', '.join(valid_targets)}. Reply with name only or one sentence."
-                try:
-                    response = self.query_model(m, prompt, chat_context)
-                    if response and "remains silent" not in response:
-                        chat.append(f"{m.name}: {response}")
-                        self.log(f"   {m.name}: {response}", "red", public=False)
-                        self.emit("mafia_chat", private=True, day=self.day,
-                                  actor=m.name, text=response)
-                        round_choices.append(
-                            self.extract_vote(response, valid_targets, prefer_first=True)
-                        )
-                    else:
-                        self.log(f"   {m.name}: [no response]", "red", public=False)
-                        round_choices.append(None)
-                except BackendUnavailable:
-                    raise
-                except Exception as e:
-                    self.log(f"   {m.name}: [error: {e}]", "red", public=False)
+                    self.log(f"   {m.name}: [no response]", "red", public=False)
                     round_choices.append(None)
 
             # Unanimous after round 1: skip the confirmation round and the
@@ -1351,20 +1925,26 @@ Here is the game history so far:
                 )
                 return round_choices[0]
 
-        # Final decision
+        # Final decision: ballots are blind, so they go out together
         final_prompt = f"Final mafia vote. Choose ONE target from: {', '.join(valid_targets)}. Reply with the name ONLY."
+        jobs = [
+            (m, self._ask(
+                m, final_prompt, "\n".join(chat), min_words=1, max_tokens=512,
+                **self._name_only(valid_targets),
+            ))
+            for m in mafia
+        ]
+        ballots = {m.name: response async for m, response in self._fan_out(jobs)}
         final_votes: Dict[str, int] = {}
         for m in mafia:
-            response = self.query_model(
-                m, final_prompt, "\n".join(chat), min_words=1, max_tokens=512
-            )
+            response = ballots[m.name]
             self.log(f"   ({m.name} final night vote: {response[:120]})", "red", public=False)
             voted_for = self.extract_vote(response, valid_targets)
             if voted_for:
                 final_votes[voted_for] = final_votes.get(voted_for, 0) + 1
 
         if not final_votes:
-            return random.choice(valid_targets)
+            return self._fallback_pick(valid_targets)
 
         return max(final_votes, key=final_votes.get)
 
@@ -1403,11 +1983,46 @@ Here is the game history so far:
 
         kills = [k for k in self.night_kill_history if not k["saved"]]
         saves = [k for k in self.night_kill_history if k["saved"]]
-        return {
+        stats = {
             "days": self.day,
             "players": player_stats,
             "detective": detective_stats,
             "night_kills": len(kills),
             "successful_saves": len(saves),
             "no_kill_nights": self.no_kill_nights,
+            "seed": self.seed,
+        }
+        if self.use_claude:
+            stats["claude_cli"] = claude_overhead_summary()
+        stats["concurrency"] = self.concurrency.stats()
+        stats["model_swaps"] = self.affinity.stats()
+        stats["context_cache"] = {"hits": self.context_hits, "misses": self.context_misses}
+        stats["summary_cache"] = self.summaries.stats()
+        stats["narration"] = self.narration.stats()
+        if self.scheduler:
+            stats["scheduler"] = self.scheduler.stats()
+        if self.sink:
+            stats["event_sink"] = self.sink.stats()
+        if self.server:
+            stats["spectators"] = self.server.stats()
+        if self.resumed_from:
+            stats["resumed_from"] = {"day": self.resumed_from[0], "phase": self.resumed_from[1]}
+        stats["questioning"] = {
+            "mode": self.questioning,
+            "window": self.question_window,
+            "seconds": round(self.questioning_s, 1),
         }
+        if self.stream_names:
+            stats["streaming"] = stream_summary()
+        limits = {name: b for name, b in RATE_LIMITS.stats().items() if b["calls"]}
+        if limits:
+            stats["rate_limits"] = limits
+        shared = shared_budget_stats()
+        if shared:
+            stats["shared_budget"] = shared
+        if self.endpoint_pool:
+            stats["endpoints"] = self.endpoint_pool.stats()
+        cassette = cassette_stats()
+        if cassette:
+            stats["cassette"] = cassette
+        return stats
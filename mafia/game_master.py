@@ -1,32 +1,59 @@
+import asyncio
+import functools
 import json
 import random
 import re
 import subprocess
 import threading
 import time
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Callable, Dict, List, Optional
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
-# ponytail: one global min-spacing for all NVIDIA calls (players + GM share the
-# free-tier rate limit). ~1.5s ≈ 40 req/min; raise if you still see 429s.
-NVIDIA_MIN_INTERVAL = 1.5
-_nvidia_throttle = threading.Lock()
-_nvidia_last_call = [0.0]
+from mafia.cassette import Cassette
+from mafia.claude_pool import ClaudePool, PartialReply
+from mafia.concurrency import ConcurrencyLimit
+from mafia.events import EventLog
+from mafia.ratelimit import Limit, RateScheduler, retry_after
+from mafia.sharedlimit import SharedBudget, default_state_path, estimate_tokens
 
+# ponytail: NVIDIA's free tier allows ~40 req/min per key, and players and GM
+# share it, so the bucket is per endpoint, not per model. Lower it (or add a
+# per-model limit) with --rate-limit if you still see 429s.
+RATE_LIMITS = RateScheduler({("nvidia", None): Limit(per_minute=40, burst=3)})
 
-def nvidia_pace():
-    with _nvidia_throttle:
-        wait = NVIDIA_MIN_INTERVAL - (time.time() - _nvidia_last_call[0])
-        if wait > 0:
-            time.sleep(wait)
-        _nvidia_last_call[0] = time.time()
+# Set by use_shared_budget(); None means this process only answers to RATE_LIMITS.
+SHARED_BUDGET: Optional[SharedBudget] = None
+
+
+def use_shared_budget(endpoint: str, requests: Limit, tokens_per_minute: Optional[int] = None) -> SharedBudget:
+    """Draw every later call from the machine-wide budget for `endpoint`
+    (see sharedlimit.py); all games passing the same numbers share it."""
+    global SHARED_BUDGET
+    SHARED_BUDGET = SharedBudget(default_state_path(endpoint), requests, tokens_per_minute)
+    return SHARED_BUDGET
+
+
+def shared_budget_stats() -> Optional[Dict]:
+    return SHARED_BUDGET.stats() if SHARED_BUDGET else None
+
+
+def backend_endpoint(use_nvidia: bool, use_claude: bool = False) -> str:
+    """Rate-limit bucket name for a backend."""
+    return "claude" if use_claude else ("nvidia" if use_nvidia else "lm-studio")
 
 _SYSTEM_PROMPT = """You are the Game Master of a Mafia party game. You narrate key moments with dramatic flair — eliminations, night kills, day openings, and the final outcome. You are impartial and theatrical. Keep every narration to 2-3 sentences. Never reveal hidden roles."""
 
-def _schema(key: str) -> dict:
-    """Strict single-string-field JSON schema, keyed by `key`."""
+@functools.lru_cache(maxsize=256)
+def _schema(key: str, choices: Optional[Tuple[str, ...]] = None) -> dict:
+    """Strict single-string-field JSON schema, keyed by `key`. With `choices`
+    the field is an enum of them, so constrained decoding can only produce
+    one of the names. Cached per target tuple: a game asks the same few
+    lists over and over. The dict is shared, so never mutate it."""
+    field = {"type": "string", "enum": list(choices)} if choices else {"type": "string"}
     return {
         "type": "json_schema",
         "json_schema": {
@@ -34,7 +61,7 @@ def _schema(key: str) -> dict:
             "strict": True,
             "schema": {
                 "type": "object",
-                "properties": {key: {"type": "string"}},
+                "properties": {key: field},
                 "required": [key],
                 "additionalProperties": False,
             },
@@ -48,11 +75,52 @@ def _schema(key: str) -> dict:
 # played. call_claude fills this in; MafiaGame stamps it into the log.
 RESOLVED_CLAUDE_MODELS: Dict[str, str] = {}
 
+# Per-call CLI overhead: wall time minus the API time the CLI reports itself
+# (duration_api_ms), i.e. process startup, auth and piping. call_claude fills
+# it so a game can show what --claude-pool saves.
+CLAUDE_CALL_OVERHEAD: List[Dict] = []
 
-def call_claude(model: str, messages: List[Dict]) -> str:
-    """One `claude -p` subprocess call, billed to the Claude subscription.
-    Fully isolated: no tools, no settings/CLAUDE.md/hooks, no MCP — a pure
-    text generator. Raises on nonzero exit; callers decide whether to swallow."""
+# Set by use_claude_pool(); None means one `claude -p` process per call.
+CLAUDE_POOL: Optional[ClaudePool] = None
+
+# Set by use_cassette(); records or replays every call_llm/call_claude reply.
+CASSETTE: Optional[Cassette] = None
+
+# Given the spoken text of a reply so far, the reply to keep if it has already
+# said enough, else None. Name-only calls pass one under --stream-names.
+EarlyStop = Callable[[str], Optional[str]]
+
+# One entry per streamed call: True when early_stop cut it short.
+STREAMED_CALLS: List[bool] = []
+
+
+def stream_summary() -> Dict:
+    return {"calls": len(STREAMED_CALLS), "stopped_early": sum(STREAMED_CALLS)}
+
+
+def use_cassette(cassette: Optional[Cassette]) -> Optional[Cassette]:
+    global CASSETTE
+    CASSETTE = cassette
+    return CASSETTE
+
+
+def cassette_stats() -> Optional[Dict]:
+    return CASSETTE.stats() if CASSETTE else None
+
+
+def _replayed(model: str, messages: List[Dict], max_tokens: Optional[int]) -> Optional[str]:
+    if CASSETTE is not None and CASSETTE.replaying:
+        return CASSETTE.play(model, messages, max_tokens)
+    return None
+
+
+def _taped(model: str, messages: List[Dict], max_tokens: Optional[int], reply: str) -> str:
+    if CASSETTE is not None and not CASSETTE.replaying:
+        CASSETTE.record(model, messages, max_tokens, reply)
+    return reply
+
+
+def _claude_command(model: str, messages: List[Dict], stream: bool = False) -> List[str]:
     # haiku sometimes replied with just a header like "**Discussion:**",
     # tripping the empty/short retry — ban markdown outright
     system = messages[0]["content"] + (
@@ -62,34 +130,208 @@ def call_claude(model: str, messages: List[Dict]) -> str:
     user = messages[-1]["content"]
     # ponytail: temperature/max_tokens have no CLI equivalent — prompts
     # already ask for short replies, good enough for the experiment
+    return [
+        "claude", "-p", user,
+        "--model", model,
+        "--system-prompt", system,
+        "--tools", "",
+        "--setting-sources", "",
+        "--strict-mcp-config",
+        # json (rather than plain text) so the reply arrives with the name
+        # of the build that answered, under "modelUsage"; stream-json with
+        # partial messages when the reply is read as it is written
+        *(
+            ["--output-format", "stream-json", "--verbose", "--include-partial-messages"]
+            if stream else ["--output-format", "json"]
+        ),
+    ]
+
+
+def _claude_reply(model: str, payload: Dict) -> str:
+    # One call uses one model, so modelUsage holds a single key.
+    for resolved_name in payload.get("modelUsage", {}):
+        RESOLVED_CLAUDE_MODELS[model] = resolved_name
+    return payload.get("result", "").strip()
+
+
+def _record_overhead(model: str, started: float, payload: Dict, pooled: bool):
+    api_ms = payload.get("duration_api_ms")
+    if api_ms is None:
+        return
+    wall = time.time() - started
+    CLAUDE_CALL_OVERHEAD.append({
+        "model": model,
+        "pooled": pooled,
+        "wall_s": round(wall, 3),
+        "overhead_s": round(max(0.0, wall - api_ms / 1000), 3),
+    })
+
+
+def claude_overhead_summary() -> Dict:
+    """What the CLI cost on top of the model's own API time, across calls."""
+    calls = list(CLAUDE_CALL_OVERHEAD)
+    if not calls:
+        return {"calls": 0}
+    total = sum(c["overhead_s"] for c in calls)
+    return {
+        "calls": len(calls),
+        "pooled": sum(1 for c in calls if c["pooled"]),
+        "overhead_s": round(total, 1),
+        "mean_overhead_s": round(total / len(calls), 2),
+        # Whether the warm spares hit: a cold start waited on a fresh process
+        **(CLAUDE_POOL.stats() if CLAUDE_POOL else {}),
+    }
+
+
+def use_claude_pool(spares: int) -> ClaudePool:
+    """Route every later call_claude through warm workers (see claude_pool.py)."""
+    global CLAUDE_POOL
+    CLAUDE_POOL = ClaudePool(spares=spares)
+    return CLAUDE_POOL
+
+
+def _pooled_reply(model: str, payload: Dict) -> str:
+    if payload.get("is_error"):
+        raise RuntimeError(payload.get("result") or "claude worker returned an error")
+    return _claude_reply(model, payload)
+
+
+def call_claude(model: str, messages: List[Dict], early_stop: Optional[EarlyStop] = None) -> str:
+    """One `claude -p` subprocess call, billed to the Claude subscription.
+    Fully isolated: no tools, no settings/CLAUDE.md/hooks, no MCP — a pure
+    text generator. Raises on nonzero exit; callers decide whether to swallow.
+    With `early_stop` the reply is streamed and the process killed once it
+    has said enough."""
+    replayed = _replayed(model, messages, None)
+    if replayed is not None:
+        return replayed
+    return _taped(model, messages, None, _run_claude(model, messages, early_stop))
+
+
+def _streamed_reply(model: str, started: float, reply: PartialReply, pooled: bool) -> str:
+    STREAMED_CALLS.append(reply.kept is not None)
+    payload = reply.payload()
+    _record_overhead(model, started, payload, pooled=pooled)
+    return _pooled_reply(model, payload)
+
+
+def _run_claude(model: str, messages: List[Dict], early_stop: Optional[EarlyStop] = None) -> str:
+    started = time.time()
+    if CLAUDE_POOL is not None:
+        payload = CLAUDE_POOL.call(model, messages, early_stop=early_stop)
+        if early_stop:
+            STREAMED_CALLS.append(bool(payload.get("stopped_early")))
+        _record_overhead(model, started, payload, pooled=True)
+        return _pooled_reply(model, payload)
+    if early_stop:
+        return _stream_claude(model, messages, early_stop, started)
+
     result = subprocess.run(
-        [
-            "claude", "-p", user,
-            "--model", model,
-            "--system-prompt", system,
-            "--tools", "",
-            "--setting-sources", "",
-            "--strict-mcp-config",
-            # json (rather than plain text) so the reply arrives with the name
-            # of the build that answered, under "modelUsage"
-            "--output-format", "json",
-        ],
+        _claude_command(model, messages),
         capture_output=True, text=True, timeout=180,
     )
     if result.returncode != 0:
         raise RuntimeError(result.stderr.strip() or f"claude exited {result.returncode}")
-
     try:
         payload = json.loads(result.stdout)
     except json.JSONDecodeError:
         # A game is expensive to re-run, so don't lose a reply over a parsing
         # hiccup — take the raw text and skip the model name this time.
         return result.stdout.strip()
+    _record_overhead(model, started, payload, pooled=False)
+    return _claude_reply(model, payload)
+
+
+def _stream_claude(model: str, messages: List[Dict], early_stop: EarlyStop, started: float) -> str:
+    proc = subprocess.Popen(
+        _claude_command(model, messages, stream=True),
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+    )
+    timer = threading.Timer(180, proc.kill)
+    timer.start()
+    reply = PartialReply(early_stop)
+    try:
+        for raw in proc.stdout:
+            if reply.feed(raw):
+                break
+    finally:
+        timer.cancel()
+        if reply.kept is not None:
+            proc.kill()
+        stderr = proc.communicate()[1]
+    if reply.kept is None and reply.result is None:
+        raise RuntimeError(stderr.strip() or f"claude exited {proc.returncode}")
+    return _streamed_reply(model, started, reply, pooled=False)
 
-    # One call uses one model, so modelUsage holds a single key.
-    for resolved_name in payload.get("modelUsage", {}):
-        RESOLVED_CLAUDE_MODELS[model] = resolved_name
-    return payload.get("result", "").strip()
+
+async def call_claude_async(model: str, messages: List[Dict], early_stop: Optional[EarlyStop] = None) -> str:
+    """call_claude on the event loop: the CLI runs as an asyncio subprocess, so
+    a seat waiting on it holds no thread."""
+    replayed = _replayed(model, messages, None)
+    if replayed is not None:
+        return replayed
+    return _taped(model, messages, None, await _run_claude_async(model, messages, early_stop))
+
+
+async def _run_claude_async(model: str, messages: List[Dict], early_stop: Optional[EarlyStop] = None) -> str:
+    started = time.time()
+    if CLAUDE_POOL is not None:
+        # ponytail: pooled workers are plain Popen pipes; reading one costs a
+        # thread for the call's duration
+        payload = await asyncio.to_thread(CLAUDE_POOL.call, model, messages, early_stop=early_stop)
+        if early_stop:
+            STREAMED_CALLS.append(bool(payload.get("stopped_early")))
+        _record_overhead(model, started, payload, pooled=True)
+        return _pooled_reply(model, payload)
+    if early_stop:
+        return await _stream_claude_async(model, messages, early_stop, started)
+
+    proc = await asyncio.create_subprocess_exec(
+        *_claude_command(model, messages),
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=180)
+    except (asyncio.TimeoutError, asyncio.CancelledError):
+        proc.kill()
+        await proc.wait()
+        raise
+    if proc.returncode != 0:
+        raise RuntimeError(stderr.decode().strip() or f"claude exited {proc.returncode}")
+    try:
+        payload = json.loads(stdout.decode())
+    except json.JSONDecodeError:
+        return stdout.decode().strip()
+    _record_overhead(model, started, payload, pooled=False)
+    return _claude_reply(model, payload)
+
+
+async def _stream_claude_async(model: str, messages: List[Dict], early_stop: EarlyStop, started: float) -> str:
+    proc = await asyncio.create_subprocess_exec(
+        *_claude_command(model, messages, stream=True),
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+        limit=2**20,  # the init line lists every tool and can outgrow 64k
+    )
+    reply = PartialReply(early_stop)
+
+    async def read():
+        while True:
+            raw = await proc.stdout.readline()
+            if not raw or reply.feed(raw.decode()):
+                return
+
+    try:
+        await asyncio.wait_for(read(), timeout=180)
+    except (asyncio.TimeoutError, asyncio.CancelledError):
+        proc.kill()
+        await proc.wait()
+        raise
+    if reply.kept is not None:
+        proc.kill()
+    stderr = (await proc.communicate())[1]
+    if reply.kept is None and reply.result is None:
+        raise RuntimeError(stderr.decode().strip() or f"claude exited {proc.returncode}")
+    return _streamed_reply(model, started, reply, pooled=False)
 
 
 def resolve_claude_model(alias: str) -> str:
@@ -106,6 +348,204 @@ def resolve_claude_model(alias: str) -> str:
     return RESOLVED_CLAUDE_MODELS.get(alias, alias)
 
 
+def _completion_kwargs(
+    model: str, messages: List[Dict], use_nvidia: bool, schema_key: str,
+    temperature: float, max_tokens: int, choices: Optional[Sequence[str]] = None,
+) -> Dict:
+    kwargs: Dict = dict(model=model, messages=messages, temperature=temperature, max_tokens=max_tokens)
+    if not use_nvidia:
+        kwargs["response_format"] = _schema(schema_key, tuple(choices) if choices else None)
+    return kwargs
+
+
+def _reply_text(response, use_nvidia: bool, schema_key: str, private_reasoning: bool) -> str:
+    msg = response.choices[0].message
+    return _unwrap(msg.content, getattr(msg, "reasoning_content", None), use_nvidia, schema_key, private_reasoning)
+
+
+def _unwrap(
+    content: Optional[str], reasoning: Optional[str], use_nvidia: bool, schema_key: str,
+    private_reasoning: bool,
+) -> str:
+    content = (content or "").strip()
+    reasoning = (reasoning or "").strip()
+    # private_reasoning: the model's thinking channel is a secret
+    # scratchpad (mafia scheming, role knowledge) — NEVER emit it,
+    # even when content is empty
+    raw = content if (content or private_reasoning) else reasoning
+    if not use_nvidia:
+        try:
+            return json.loads(raw).get(schema_key, raw)
+        except (json.JSONDecodeError, AttributeError):
+            return raw
+    return raw
+
+
+_SCHEMA_OPEN = re.compile(r'^\s*\{\s*"[^"]*"\s*:\s*"')
+
+
+def _spoken_so_far(content: str, use_nvidia: bool) -> str:
+    """The reply text inside a half-streamed `{"<key>": "...` (all of it for
+    NVIDIA, which has no schema)."""
+    if use_nvidia:
+        return content
+    opened = _SCHEMA_OPEN.match(content)
+    if not opened:
+        return ""
+    body = content[opened.end():]
+    try:
+        return json.decoder.scanstring(body, 0)[0]  # the string is closed
+    except json.JSONDecodeError:
+        pass
+    # Still open: close it, first dropping a half-sent escape like `\u00`
+    for cut in range(len(body), max(-1, len(body) - 7), -1):
+        try:
+            return json.loads('"' + body[:cut] + '"')
+        except json.JSONDecodeError:
+            continue
+    return ""
+
+
+def _stream_kwargs(kwargs: Dict) -> Dict:
+    # Usage arrives in a last chunk of its own, for _settle
+    return {**kwargs, "stream": True, "stream_options": {"include_usage": True}}
+
+
+def _read_chunk(chunk, content: List[str], reasoning: List[str]) -> bool:
+    """Collect one stream chunk; True if it carried spoken text."""
+    if not chunk.choices:
+        return False
+    delta = chunk.choices[0].delta
+    if getattr(delta, "reasoning_content", None):
+        reasoning.append(delta.reasoning_content)
+    if delta.content:
+        content.append(delta.content)
+        return True
+    return False
+
+
+def _stream_reply(
+    content: List[str], reasoning: List[str], kept: Optional[str], usage,
+    use_nvidia: bool, schema_key: str, private_reasoning: bool,
+):
+    """(reply, response for _settle) once a stream ends or is cut short."""
+    STREAMED_CALLS.append(kept is not None)
+    if kept is not None:
+        return kept, SimpleNamespace(usage=None)  # never reported: the estimate stands
+    reply = _unwrap("".join(content), "".join(reasoning), use_nvidia, schema_key, private_reasoning)
+    return reply, SimpleNamespace(usage=usage)
+
+
+def _read_stream(stream, early_stop: EarlyStop, use_nvidia: bool, schema_key: str, private_reasoning: bool):
+    content: List[str] = []
+    reasoning: List[str] = []
+    kept, usage = None, None
+    try:
+        for chunk in stream:
+            usage = getattr(chunk, "usage", None) or usage
+            # Only the spoken channel decides; the reasoning is never parsed
+            if _read_chunk(chunk, content, reasoning):
+                kept = early_stop(_spoken_so_far("".join(content), use_nvidia))
+                if kept is not None:
+                    break
+    finally:
+        # Closing the response mid-stream is what stops the server generating
+        stream.close()
+    return _stream_reply(content, reasoning, kept, usage, use_nvidia, schema_key, private_reasoning)
+
+
+async def _read_stream_async(stream, early_stop: EarlyStop, use_nvidia: bool, schema_key: str, private_reasoning: bool):
+    content: List[str] = []
+    reasoning: List[str] = []
+    kept, usage = None, None
+    try:
+        async for chunk in stream:
+            usage = getattr(chunk, "usage", None) or usage
+            if _read_chunk(chunk, content, reasoning):
+                kept = early_stop(_spoken_so_far("".join(content), use_nvidia))
+                if kept is not None:
+                    break
+    finally:
+        await stream.close()
+    return _stream_reply(content, reasoning, kept, usage, use_nvidia, schema_key, private_reasoning)
+
+
+def _backoff(error: Exception, attempt: int) -> Optional[float]:
+    """Seconds to wait before retrying `error`, or None to give up."""
+    # 429 = rate limit, 5xx = gateway flake (504s seen when reasoning
+    # runs long) — both are transient, both get the backoff
+    if re.search(r"\b(429|5\d\d)\b", str(error)) and attempt < 4:
+        asked = retry_after(error)
+        if asked is not None:
+            return asked + random.uniform(0, 1)
+        return 2 ** attempt * 5 + random.uniform(0, 5)  # jitter desyncs workers
+    return None
+
+
+def _hold_bucket(error: Exception, endpoint: str, model: str):
+    # The server named a wait: everyone queued on this bucket sits it out, not
+    # just the call that got the 429
+    asked = retry_after(error)
+    if asked is not None:
+        RATE_LIMITS.throttle(endpoint, model, asked)
+
+
+def _report_wait(waited: float, on_wait: Optional[Callable[[float], None]]):
+    if on_wait and waited > 0.05:
+        on_wait(waited)
+
+
+def _admit(
+    endpoint: str, model: str, messages: List[Dict], max_tokens: int,
+    on_wait: Optional[Callable[[float], None]], priority: str = "discussion",
+) -> int:
+    """Wait for this process's bucket, then the machine-wide one if enabled.
+    Returns the shared-budget token estimate to settle (0 when not shared)."""
+    start = time.monotonic()
+    RATE_LIMITS.acquire(endpoint, model, priority)
+    cost = SHARED_BUDGET.acquire(messages, max_tokens) if SHARED_BUDGET else 0
+    _report_wait(time.monotonic() - start, on_wait)
+    return cost
+
+
+async def _admit_async(
+    endpoint: str, model: str, messages: List[Dict], max_tokens: int,
+    on_wait: Optional[Callable[[float], None]], priority: str = "discussion",
+) -> int:
+    start = time.monotonic()
+    await RATE_LIMITS.acquire_async(endpoint, model, priority)
+    cost = await SHARED_BUDGET.acquire_async(messages, max_tokens) if SHARED_BUDGET else 0
+    _report_wait(time.monotonic() - start, on_wait)
+    return cost
+
+
+def _in_flight(slots: Optional[ConcurrencyLimit], size: int):
+    return slots.slot(size) if slots else nullcontext()
+
+
+def _in_flight_async(slots: Optional[ConcurrencyLimit], size: int):
+    return slots.slot_async(size) if slots else nullcontext()
+
+
+def _settle(cost: int, response):
+    # A failed request spent no tokens; a finished one spent what it reports
+    if not cost or SHARED_BUDGET is None:
+        return
+    if response is None:
+        actual = 0
+    else:
+        actual = getattr(getattr(response, "usage", None), "total_tokens", None)
+    if isinstance(actual, int):
+        SHARED_BUDGET.settle(cost, actual)
+
+
+def _settle_text(cost: int, messages: List[Dict], reply: str):
+    # The CLI's reply comes back without usage: settle on what was sent and
+    # what came back, counted the way the estimate was
+    if cost and SHARED_BUDGET is not None:
+        SHARED_BUDGET.settle(cost, estimate_tokens(messages, len(reply) // 4))
+
+
 def call_llm(
     client: OpenAI,
     model: str,
@@ -117,45 +557,126 @@ def call_llm(
     on_retry: Optional[Callable[[float], None]] = None,
     private_reasoning: bool = False,
     use_claude: bool = False,
+    on_wait: Optional[Callable[[float], None]] = None,
+    slots: Optional[ConcurrencyLimit] = None,
+    early_stop: Optional[EarlyStop] = None,
+    choices: Optional[Sequence[str]] = None,
+    priority: str = "discussion",
 ) -> str:
     """One chat completion with 429 backoff. NVIDIA gets no response_format
     (unsupported) and the raw text back; everyone else gets a strict
-    single-field JSON schema, unwrapped by `schema_key`. Raises on exhaustion
-    or non-429 errors — callers decide whether to swallow."""
+    single-field JSON schema, unwrapped by `schema_key`, whose field is
+    limited to `choices` when given (the CLI has no schema, so Claude
+    ignores them). Raises on exhaustion
+    or non-429 errors — callers decide whether to swallow. `on_wait` hears how
+    long the call queued for a RATE_LIMITS token, when it had to. `slots`, if
+    given, is held around each request actually sent. With `early_stop` the
+    reply is streamed and the request dropped as soon as early_stop keeps
+    what has been said. `priority` is the call's class in the RATE_LIMITS
+    queue (see ratelimit.py). Under --replay the reply comes off the cassette
+    instead."""
+    # The CLI has no max_tokens knob, so it isn't part of a Claude request
+    replayed = _replayed(model, messages, None if use_claude else max_tokens)
+    if replayed is not None:
+        return replayed
+    endpoint = backend_endpoint(use_nvidia, use_claude)
     if use_claude:
-        return call_claude(model, messages)
-    kwargs: Dict = dict(model=model, messages=messages, temperature=temperature, max_tokens=max_tokens)
-    if not use_nvidia:
-        kwargs["response_format"] = _schema(schema_key)
+        cost = _admit(endpoint, model, messages, max_tokens, on_wait, priority)
+        try:
+            with _in_flight(slots, max_tokens):
+                reply = call_claude(model, messages, early_stop)
+        except Exception:
+            _settle(cost, None)
+            raise
+        _settle_text(cost, messages, reply)
+        return reply
+    kwargs = _completion_kwargs(model, messages, use_nvidia, schema_key, temperature, max_tokens, choices)
 
     for attempt in range(5):
+        cost = 0
         try:
-            if use_nvidia:
-                nvidia_pace()
-            response = client.chat.completions.create(**kwargs)
-            msg = response.choices[0].message
-            content = (msg.content or "").strip()
-            reasoning = (getattr(msg, "reasoning_content", None) or "").strip()
-            # private_reasoning: the model's thinking channel is a secret
-            # scratchpad (mafia scheming, role knowledge) — NEVER emit it,
-            # even when content is empty
-            raw = content if (content or private_reasoning) else reasoning
-            if not use_nvidia:
-                try:
-                    return json.loads(raw).get(schema_key, raw)
-                except (json.JSONDecodeError, AttributeError):
-                    return raw
-            return raw
+            cost = _admit(endpoint, model, messages, max_tokens, on_wait, priority)
+            with _in_flight(slots, max_tokens):
+                if early_stop:
+                    stream = client.chat.completions.create(**_stream_kwargs(kwargs))
+                    reply, response = _read_stream(stream, early_stop, use_nvidia, schema_key, private_reasoning)
+                else:
+                    response = client.chat.completions.create(**kwargs)
+                    reply = _reply_text(response, use_nvidia, schema_key, private_reasoning)
+        except Exception as e:
+            _settle(cost, None)
+            wait = _backoff(e, attempt)
+            if wait is None:
+                raise
+            _hold_bucket(e, endpoint, model)
+            if on_retry:
+                on_retry(wait)
+            time.sleep(wait)
+        else:
+            _settle(cost, response)
+            return _taped(model, messages, max_tokens, reply)
+    return ""
+
+
+async def call_llm_async(
+    client: Optional[AsyncOpenAI],
+    model: str,
+    messages: List[Dict],
+    use_nvidia: bool,
+    schema_key: str,
+    temperature: float = 0.7,
+    max_tokens: int = 512,
+    on_retry: Optional[Callable[[float], None]] = None,
+    private_reasoning: bool = False,
+    use_claude: bool = False,
+    on_wait: Optional[Callable[[float], None]] = None,
+    slots: Optional[ConcurrencyLimit] = None,
+    early_stop: Optional[EarlyStop] = None,
+    choices: Optional[Sequence[str]] = None,
+    priority: str = "discussion",
+) -> str:
+    """call_llm for the event loop. `slots` caps requests actually in flight;
+    a call sleeping off a 429 gives its slot back, so one throttled seat no
+    longer holds a worker the others could use."""
+    replayed = _replayed(model, messages, None if use_claude else max_tokens)
+    if replayed is not None:
+        return replayed
+    endpoint = backend_endpoint(use_nvidia, use_claude)
+    if use_claude:
+        cost = await _admit_async(endpoint, model, messages, max_tokens, on_wait, priority)
+        try:
+            async with _in_flight_async(slots, max_tokens):
+                reply = await call_claude_async(model, messages, early_stop)
+        except Exception:
+            _settle(cost, None)
+            raise
+        _settle_text(cost, messages, reply)
+        return reply
+    kwargs = _completion_kwargs(model, messages, use_nvidia, schema_key, temperature, max_tokens, choices)
+
+    for attempt in range(5):
+        cost = 0
+        try:
+            cost = await _admit_async(endpoint, model, messages, max_tokens, on_wait, priority)
+            async with _in_flight_async(slots, max_tokens):
+                if early_stop:
+                    stream = await client.chat.completions.create(**_stream_kwargs(kwargs))
+                    reply, response = await _read_stream_async(stream, early_stop, use_nvidia, schema_key, private_reasoning)
+                else:
+                    response = await client.chat.completions.create(**kwargs)
+                    reply = _reply_text(response, use_nvidia, schema_key, private_reasoning)
         except Exception as e:
-            # 429 = rate limit, 5xx = gateway flake (504s seen when reasoning
-            # runs long) — both are transient, both get the backoff
-            if re.search(r"\b(429|5\d\d)\b", str(e)) and attempt < 4:
-                wait = 2 ** attempt * 5 + random.uniform(0, 5)  # jitter desyncs workers
-                if on_retry:
-                    on_retry(wait)
-                time.sleep(wait)
-            else:
+            _settle(cost, None)
+            wait = _backoff(e, attempt)
+            if wait is None:
                 raise
+            _hold_bucket(e, endpoint, model)
+            if on_retry:
+                on_retry(wait)
+            await asyncio.sleep(wait)
+        else:
+            _settle(cost, response)
+            return _taped(model, messages, max_tokens, reply)
     return ""
 
 
@@ -173,33 +694,26 @@ def published_titles() -> List[str]:
         return []
 
 
-def episode_inputs_from_events(events: List[Dict], roles: Optional[Dict[str, str]] = None) -> Optional[Dict]:
-    """Derive write_episode kwargs from a finished game's event list.
+def episode_inputs_from_events(
+    events: Union[EventLog, List[Dict]], roles: Optional[Dict[str, str]] = None,
+) -> Optional[Dict]:
+    """Derive write_episode kwargs from a finished game's events: the live
+    EventLog, or a saved log's list (indexed here in one pass).
     Shared by the live game and tools/publish_game.py (backfilling old logs).
     `roles` maps name -> role; pass it whenever known, because a game run without
     --reveal-secrets hides roles in the events, and without it the recap can only
     see dead players' roles and guesses survivors are mafia.
     Returns None when the log isn't a completed town/mafia game."""
-    start = next((e for e in events if e["type"] == "game_start"), None)
-    over = next((e for e in events if e["type"] == "game_over"), None)
+    log = events if isinstance(events, EventLog) else EventLog.from_list(events)
+    start = log.first("game_start")
+    over = log.first("game_over")
     if not start or not over or over.get("winner") not in ("town", "mafia"):
         return None
     roles = roles or {p["name"]: p["role"] for p in start["players"] if p.get("role")}
     cast = [f"{p['name']} ({roles.get(p['name'], '?')})" for p in start["players"]]
     mafia = [name for name, role in roles.items() if role == "Mafia"]
-    days = 1
-    timeline = []
-    for e in events:
-        days = max(days, e.get("day") or 1)
-        if e["type"] == "elimination":
-            timeline.append(f"Day {e['day']}: the town voted out {e['target']} — they were {e.get('role', '?')}.")
-        elif e["type"] == "night_kill" and not e.get("saved"):
-            timeline.append(f"Night {e['day']}: the mafia killed {e['target']} — they were {e.get('role', '?')}.")
-        elif e["type"] == "save" or (e["type"] == "night_kill" and e.get("saved")):
-            timeline.append(f"Night {e['day']}: the mafia struck, but the Doctor saved {e['target']}.")
-        elif e["type"] == "night_no_kill":
-            timeline.append(f"Night {e['day']}: nobody died.")
-    timeline.append(f"The {over['winner']} won. Survivors: {', '.join(over['survivors'])}.")
+    days = max(1, log.last_day)
+    timeline = log.timeline + [f"The {over['winner']} won. Survivors: {', '.join(over['survivors'])}."]
     return {"winner": over["winner"], "days": days, "cast": cast, "timeline": timeline, "mafia": mafia}
 
 
@@ -211,7 +725,7 @@ class GameMaster:
         self._use_claude = use_claude
         self._enabled = enabled
 
-    def _call(self, prompt: str, max_tokens: int = 150) -> str:
+    def _call(self, prompt: str, max_tokens: int = 150, priority: str = "narration") -> str:
         if not self._enabled:
             return ""
         messages = [
@@ -223,7 +737,7 @@ class GameMaster:
                 self._client, self._model, messages,
                 use_nvidia=self._use_nvidia, schema_key="narration",
                 temperature=0.9, max_tokens=max_tokens,
-                use_claude=self._use_claude,
+                use_claude=self._use_claude, priority=priority,
             )
         except Exception:
             return ""  # narration is optional flavor — never crash the game over it
@@ -325,11 +839,11 @@ class GameMaster:
                 "\nAlready-used titles — do not resemble any of them in wording or "
                 "pattern: " + "; ".join(used)
             )
-        title = self._call(title_prompt + "\n\n" + base, max_tokens=150)
+        title = self._call(title_prompt + "\n\n" + base, max_tokens=150, priority="packaging")
         tagline = self._call(
             "Write ONE teaser sentence for this game, shown before anyone watches it. "
             "STRICTLY spoiler-free: do not reveal who wins, who dies, or anyone's role.\n\n" + base,
-            max_tokens=200,
+            max_tokens=200, priority="packaging",
         )
         # The recap is the one prompt allowed to name roles, so spell out who the mafia
         # actually were — otherwise the model guesses from the survivor list and mislabels
@@ -342,7 +856,7 @@ class GameMaster:
             "Write a 3-5 sentence dramatic recap of this game, shown AFTER viewers finish "
             "watching. Spoilers welcome: name the mafia, the turning point, and how it ended.\n"
             + roster + "\n" + base,
-            max_tokens=300,
+            max_tokens=300, priority="packaging",
         )
         episode = {"title": title, "tagline": tagline, "recap": recap}
         return episode if any(episode.values()) else {}
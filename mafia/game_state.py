@@ -2,7 +2,7 @@
 Builds structured day-phase summaries for player context.
 Replaces raw public_log slicing with digestible fact summaries.
 """
-from typing import Dict, List, Optional
+from typing import Dict, Hashable, List, Optional
 
 
 def build_day_summary(
@@ -56,3 +56,80 @@ def build_day_summary(
         lines.append("(No deaths yet — this is the start of the game)")
 
     return "\n".join(lines)
+
+
+class DaySummaryCache:
+    """build_day_summary, memoized. vote_history and night_kill_history only
+    grow, and only at phase boundaries, so their lengths stand in for their
+    contents; an append empties the cache."""
+
+    def __init__(self):
+        self._version: Optional[tuple] = None
+        self._entries: Dict[tuple, str] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self,
+        day: int,
+        alive_names: List[str],
+        vote_history: List[Dict],
+        night_kill_history: List[Dict],
+        max_events: int = 8,
+    ) -> str:
+        version = (len(vote_history), len(night_kill_history))
+        if version != self._version:
+            self._version = version
+            self._entries.clear()
+        key = (day, tuple(alive_names), max_events)
+        summary = self._entries.get(key)
+        if summary is not None:
+            self.hits += 1
+            return summary
+        self.misses += 1
+        summary = build_day_summary(day, alive_names, vote_history, night_kill_history, max_events)
+        self._entries[key] = summary
+        return summary
+
+    def stats(self) -> Dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+def _is_word_char(c: str) -> bool:
+    # What re's \w matches in a str pattern
+    return c.isalnum() or c == "_"
+
+
+def _starts_with_name(line: str, name: str) -> bool:
+    """re.match(rf"{re.escape(name)}\b", line), without the regex."""
+    if not name or not line.startswith(name):
+        return False
+    after = line[len(name):len(name) + 1]
+    return _is_word_char(name[-1]) != (bool(after) and _is_word_char(after))
+
+
+class SharedContext:
+    """The part of a player's context that is the same for every seat at one
+    moment of the game: the recap of earlier days and today's transcript,
+    rendered once. transcript_for() lays one seat's (YOU) marks over it."""
+
+    def __init__(self, key: Hashable, recap: str, transcript: str):
+        self.key = key
+        self.recap = recap
+        self.transcript = transcript
+        self._lines = transcript.split("\n")
+        self._own: Dict[str, List[int]] = {}
+
+    def transcript_for(self, name: str) -> str:
+        """The transcript with `name` marked "(YOU)" at the start of every
+        line it begins, i.e. re.sub(rf"(?m)^{name}\b", f"{name} (YOU)")."""
+        own = self._own.get(name)
+        if own is None:
+            own = [i for i, line in enumerate(self._lines) if _starts_with_name(line, name)]
+            self._own[name] = own
+        if not own:
+            return self.transcript
+        lines = list(self._lines)
+        for i in own:
+            lines[i] = f"{name} (YOU)" + lines[i][len(name):]
+        return "\n".join(lines)
@@ -0,0 +1,183 @@
+"""
+Spectators for a game in progress.
+
+The viewer's /api/log re-reads game_log.json on every request, and that file
+only exists once the game is over. `main.py --serve PORT` starts this next to
+the game instead: a small HTTP server on localhost that pushes each event to
+any number of spectators over Server-Sent Events as soon as it is emitted.
+
+    GET /events            text/event-stream: every event so far, then each new one
+    GET /events?since=N    the same, starting at event N
+    GET /log               the events so far as JSON, in game_log.json's shape
+
+Every message carries its event's number as the SSE id, so a browser that
+loses the connection reconnects with Last-Event-ID and carries on right after
+the last event it saw. An `amend` message rewrites an event already sent (the
+game_start seats once the models resolve), and `end` closes the stream when
+the game is over.
+
+The server only ever sees what MafiaGame.emit lets through: private events
+(the mafia's chat, night actions, investigations) reach it only with
+--reveal-secrets, exactly as they reach the log.
+"""
+import json
+import threading
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs, urlparse
+
+
+class EventServer:
+    """Fan-out of one game's events to SSE streams. event(), amend() and
+    end() are called from the game; each stream runs on its own thread."""
+
+    # A comment line this often keeps proxies from timing out an idle stream
+    # and tells us when a spectator has gone
+    HEARTBEAT = 15.0
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self._events: List[Dict] = []
+        self._amends: List[int] = []
+        self._cond = threading.Condition()
+        self._done = False
+        self._streams = 0
+        self.peak_spectators = 0
+        self.messages = 0
+        self._httpd = ThreadingHTTPServer((host, port), partial(_Handler, self))
+        self._httpd.daemon_threads = True
+        self.url = f"http://{host}:{self._httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def start(self) -> "EventServer":
+        self._thread.start()
+        return self
+
+    def event(self, event: Dict):
+        with self._cond:
+            self._events.append(event)
+            self._cond.notify_all()
+
+    def amend(self, seq: int, event: Dict):
+        with self._cond:
+            self._events[seq] = event
+            self._amends.append(seq)
+            self._cond.notify_all()
+
+    def end(self):
+        with self._cond:
+            self._done = True
+            self._cond.notify_all()
+
+    def close(self, linger: float = 2.0):
+        """End the game's streams, give spectators up to `linger` seconds to
+        read the rest, then stop serving."""
+        self.end()
+        with self._cond:
+            self._cond.wait_for(lambda: self._streams == 0, timeout=linger)
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                "port": self._httpd.server_address[1],
+                "events": len(self._events),
+                "messages": self.messages,
+                "peak_spectators": self.peak_spectators,
+            }
+
+    def snapshot(self) -> Dict:
+        with self._cond:
+            return {"events": list(self._events), "live": not self._done}
+
+    def stream(self, since: int, write) -> None:
+        """Send events from `since` on through write(bytes) until the game
+        ends or the spectator goes."""
+        with self._cond:
+            self._streams += 1
+            self.peak_spectators = max(self.peak_spectators, self._streams)
+        sent, amended = max(0, since), 0
+        try:
+            while True:
+                with self._cond:
+                    self._cond.wait_for(
+                        lambda: len(self._events) > sent or len(self._amends) > amended or self._done,
+                        timeout=self.HEARTBEAT,
+                    )
+                    # Rewrites of events this spectator already has
+                    amends = [(s, self._events[s]) for s in self._amends[amended:] if s < sent]
+                    amended = len(self._amends)
+                    batch = self._events[sent:]
+                    done = self._done
+                chunks = [
+                    f"event: amend\ndata: {json.dumps({'seq': s, 'event': e}, ensure_ascii=False)}\n\n"
+                    for s, e in amends
+                ]
+                chunks += [
+                    f"id: {sent + i}\ndata: {json.dumps(e, ensure_ascii=False)}\n\n"
+                    for i, e in enumerate(batch)
+                ]
+                sent += len(batch)
+                if done:
+                    chunks.append("event: end\ndata: {}\n\n")
+                elif not chunks:
+                    chunks.append(": keepalive\n\n")
+                write("".join(chunks).encode("utf-8"))
+                with self._cond:
+                    self.messages += len(amends) + len(batch)
+                if done:
+                    return
+        except (BrokenPipeError, ConnectionResetError):
+            return  # the spectator closed the tab
+        finally:
+            with self._cond:
+                self._streams -= 1
+                self._cond.notify_all()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def __init__(self, server: EventServer, *args, **kwargs):
+        self.live = server
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/events":
+            self._stream(url)
+        elif url.path == "/log":
+            body = json.dumps(self.live.snapshot(), ensure_ascii=False).encode("utf-8")
+            self.send_response(200)
+            self._headers("application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self.send_error(404)
+
+    def _stream(self, url):
+        # A reconnecting browser says where it was; a fresh one may ask with ?since=
+        try:
+            last = self.headers.get("Last-Event-ID")
+            since = int(last) + 1 if last else int(parse_qs(url.query).get("since", ["0"])[0])
+        except ValueError:
+            self.send_error(400, "since / Last-Event-ID must be an event number")
+            return
+        self.send_response(200)
+        self._headers("text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        def write(data: bytes):
+            self.wfile.write(data)
+            self.wfile.flush()
+
+        self.live.stream(since, write)
+
+    def _headers(self, content_type: str):
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        # The viewer runs on its own port
+        self.send_header("Access-Control-Allow-Origin", "*")
+
+    def log_message(self, format, *args):
+        pass  # the game owns the console
@@ -0,0 +1,144 @@
+"""
+Game Master narration, off the critical path.
+
+Every GM line (the day's opening, an elimination, a night kill, the day's
+recap) used to be awaited where it was logged, so the players sat idle while
+the narrator wrote flavor text. Almost none of it is read by anyone but the
+console: only the day recap feeds a later prompt, and only from the next day
+on.
+
+NarrationQueue runs each narration as a background task and hands back a
+Narration to join where the text is actually needed. The console still
+reads in game order: a narration holds its place in the log, and the lines
+logged after it are held back until it lands. The stats split GM time into
+what ran alongside the players and what the game still had to wait for.
+
+A narration can carry a spec, the GM call as plain data, so that one still
+being written when a checkpoint is taken can be made again on resume (see
+pending()).
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple, Union
+
+# (message, style, public), as MafiaGame.log takes them
+Line = Tuple[str, str, bool]
+
+
+class Narration:
+    """One GM call in flight. join() waits for its text."""
+
+    def __init__(self, label: str, task: "asyncio.Future[str]", render: Callable[[str], List[Line]],
+                 spec: Optional[Dict] = None):
+        self.label = label
+        self.task = task
+        self.render = render
+        self.spec = spec
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+        self.waited = 0.0
+
+    async def join(self) -> str:
+        if not self.task.done():
+            queued = time.monotonic()
+            await asyncio.shield(self.task)
+            self.waited += time.monotonic() - queued
+        return self.task.result()
+
+
+class NarrationQueue:
+    """Background GM calls plus the console order they were logged in.
+    Lines may come from worker threads; narrations finish on the loop."""
+
+    def __init__(self, write: Callable[[str, str, bool], None]):
+        self._write = write
+        self._lock = threading.Lock()
+        self._held: Deque[Union[Line, Narration]] = deque()
+        self._all: List[Narration] = []
+
+    def line(self, message: str, style: str, public: bool):
+        with self._lock:
+            if self._held:
+                self._held.append((message, style, public))
+                return
+            self._write(message, style, public)
+
+    def submit(self, label: str, call: Awaitable[str], render: Callable[[str], List[Line]],
+               spec: Optional[Dict] = None) -> Narration:
+        """Start `call` now; `render` turns its text into the log lines that
+        go where the call was made."""
+        narration = Narration(label, asyncio.ensure_future(call), render, spec)
+        self._all.append(narration)
+        with self._lock:
+            self._held.append(narration)
+        narration.task.add_done_callback(lambda _: self._landed(narration))
+        return narration
+
+    def _landed(self, narration: Narration):
+        narration.finished = time.monotonic()
+        self._flush()
+
+    def _flush(self, force: bool = False):
+        with self._lock:
+            while self._held:
+                head = self._held[0]
+                if isinstance(head, Narration):
+                    if not head.task.done():
+                        if not force:
+                            return
+                    elif not head.task.cancelled() and head.task.exception() is None:
+                        for line in head.render(head.task.result()):
+                            self._write(*line)
+                else:
+                    self._write(*head)
+                self._held.popleft()
+
+    async def drain(self):
+        """Wait for every narration still running and write out the log."""
+        for narration in list(self._all):
+            await narration.join()
+        self._flush()
+
+    def release(self):
+        """Write out whatever is held, dropping narrations that never landed
+        (the game is ending on an error)."""
+        self._flush(force=True)
+
+    def pending(self) -> List[Union[List, Dict]]:
+        """What is still held back, as JSON for a checkpoint: a line as
+        [message, style, public], a narration that has landed as its lines,
+        and one still being written as its spec."""
+        with self._lock:
+            held: List[Union[List, Dict]] = []
+            for item in self._held:
+                if not isinstance(item, Narration):
+                    held.append(list(item))
+                elif not item.task.done():
+                    held.append(item.spec)
+                elif not item.task.cancelled() and item.task.exception() is None:
+                    held.extend(list(line) for line in item.render(item.task.result()))
+            return held
+
+    def stats(self) -> Dict:
+        """GM seconds, and how many of them the game spent waiting."""
+        done = [n for n in self._all if n.finished is not None]
+        by_label: Dict[str, Dict] = {}
+        for n in done:
+            entry = by_label.setdefault(n.label, {"calls": 0, "gm_s": 0.0, "waited_s": 0.0})
+            entry["calls"] += 1
+            entry["gm_s"] += n.finished - n.started
+            entry["waited_s"] += n.waited
+        gm_s = sum(e["gm_s"] for e in by_label.values())
+        waited_s = sum(e["waited_s"] for e in by_label.values())
+        return {
+            "calls": len(done),
+            "gm_s": round(gm_s, 1),
+            "waited_s": round(waited_s, 1),
+            "off_critical_path_s": round(gm_s - waited_s, 1),
+            "by_label": {
+                label: {k: round(v, 1) if isinstance(v, float) else v for k, v in e.items()}
+                for label, e in by_label.items()
+            },
+        }
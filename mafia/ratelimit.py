@@ -0,0 +1,272 @@
+"""
+Client-side rate limiting for the model backends.
+
+Each endpoint ("nvidia", "lm-studio", "claude"), or one model on it, can carry
+a token bucket: `per_minute` requests on average, up to `burst` back to back.
+A call that finds no token joins that bucket's queue and blocks on its own
+wake-up; a timer hands tokens out in arrival order as they refill. Nobody
+sleeps holding a lock, and a thread and a coroutine can wait in the same queue
+(async games still narrate from executor threads).
+
+A 429 that says how long to back off (Retry-After, x-ratelimit-reset-*) blocks
+the whole bucket, so the calls queued behind it wait too instead of each
+finding the limit out for itself.
+
+Every call carries a priority class. When a bucket has a queue, the best class
+goes first: a vote or a night action ("decision") before table talk
+("discussion"), and both before the GM's flavor text ("narration") and the
+end-of-game episode blurbs ("packaging"). Arrival order holds within a class.
+A call climbs one class for every AGE_EVERY seconds it has waited, so narration
+under a busy limit is late, never starved.
+"""
+import asyncio
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+# Best first
+PRIORITIES = ("decision", "discussion", "narration", "packaging")
+_RANK = {name: rank for rank, name in enumerate(PRIORITIES)}
+# Seconds of queueing that lift a call one class
+AGE_EVERY = 15.0
+
+
+@dataclass
+class Limit:
+    per_minute: float
+    burst: int = 1
+
+
+def parse_limit(spec: str) -> Tuple[Optional[str], Limit]:
+    """`[MODEL=]PER_MIN[:BURST]`, e.g. "40:3" or "qwen/qwen3.5-9b=20"."""
+    model, _, rate = spec.rpartition("=")
+    per_minute, _, burst = rate.partition(":")
+    try:
+        limit = Limit(float(per_minute), int(burst) if burst else 1)
+    except ValueError:
+        raise ValueError(f"bad rate limit {spec!r}, expected [MODEL=]PER_MIN[:BURST]")
+    if limit.per_minute <= 0 or limit.burst < 1:
+        raise ValueError(f"bad rate limit {spec!r}, rate and burst must be positive")
+    return model or None, limit
+
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def _duration(value: str) -> Optional[float]:
+    """Go-style durations as sent in x-ratelimit-reset-*: "1s", "6m0s", "20ms"."""
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(n) * _DURATION_UNITS[unit] for n, unit in parts)
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Seconds the server asked us to back off for, if the error says so."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    if headers.get("retry-after-ms"):
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    resets = [
+        _duration(headers.get(f"x-ratelimit-reset-{kind}", ""))
+        for kind in ("requests", "tokens")
+        if headers.get(f"x-ratelimit-remaining-{kind}") == "0"
+    ]
+    resets = [r for r in resets if r is not None]
+    return max(resets) if resets else None
+
+
+class _Ticket:
+    __slots__ = ("enqueued", "wake", "waited", "priority")
+
+    def __init__(self, wake: Callable[[], None], priority: str):
+        if priority not in _RANK:
+            raise ValueError(f"unknown priority {priority!r}, expected one of {PRIORITIES}")
+        self.enqueued = time.monotonic()
+        self.wake = wake
+        self.waited = 0.0
+        self.priority = priority
+
+    def rank(self, now: float) -> Tuple[int, float]:
+        return _RANK[self.priority] - int((now - self.enqueued) / AGE_EVERY), self.enqueued
+
+
+class _Bucket:
+    def __init__(self, limit: Limit):
+        self.limit = limit
+        self.tokens = float(limit.burst)
+        self.stamp = time.monotonic()
+        self.blocked_until = 0.0
+        self.queues: Dict[str, Deque[_Ticket]] = {name: deque() for name in PRIORITIES}
+        self.timer: Optional[threading.Timer] = None
+        self.timer_at = 0.0
+        self.calls = 0
+        self.waited = 0.0
+        self.max_wait = 0.0
+        self.throttled = 0
+        # class -> [calls, seconds queued, longest wait]
+        self.by_class: Dict[str, list] = {}
+
+    def queued(self) -> bool:
+        return any(self.queues.values())
+
+    def next_ticket(self, now: float) -> _Ticket:
+        """The head of the best class, counting what each has aged."""
+        head = min((q[0] for q in self.queues.values() if q), key=lambda t: t.rank(now))
+        return self.queues[head.priority].popleft()
+
+    def ready_at(self, now: float) -> float:
+        rate = self.limit.per_minute / 60
+        self.tokens = min(self.limit.burst, self.tokens + (now - self.stamp) * rate)
+        self.stamp = now
+        start = now if self.tokens >= 1 else now + (1 - self.tokens) / rate
+        return max(start, self.blocked_until)
+
+
+class RateScheduler:
+    """Token buckets per (endpoint, model). A model's own limit wins over its
+    endpoint's; an endpoint with neither is not limited at all."""
+
+    def __init__(self, limits: Optional[Dict[Tuple[str, Optional[str]], Limit]] = None):
+        self._lock = threading.Lock()
+        self._buckets: Dict[Tuple[str, Optional[str]], _Bucket] = {}
+        for (endpoint, model), limit in (limits or {}).items():
+            self.configure(endpoint, limit, model)
+
+    def configure(self, endpoint: str, limit: Limit, model: Optional[str] = None):
+        with self._lock:
+            self._buckets[(endpoint, model)] = _Bucket(limit)
+
+    def _bucket(self, endpoint: str, model: Optional[str]) -> Optional[_Bucket]:
+        return self._buckets.get((endpoint, model)) or self._buckets.get((endpoint, None))
+
+    def acquire(self, endpoint: str, model: Optional[str] = None, priority: str = "discussion") -> float:
+        """Block until the call may go out; returns the seconds spent queued."""
+        bucket = self._bucket(endpoint, model)
+        if bucket is None:
+            return 0.0
+        granted = threading.Event()
+        ticket = _Ticket(granted.set, priority)
+        with self._lock:
+            bucket.queues[priority].append(ticket)
+            self._dispatch(bucket)
+        granted.wait()
+        return ticket.waited
+
+    async def acquire_async(self, endpoint: str, model: Optional[str] = None, priority: str = "discussion") -> float:
+        bucket = self._bucket(endpoint, model)
+        if bucket is None:
+            return 0.0
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(None))
+
+        ticket = _Ticket(wake, priority)
+        with self._lock:
+            bucket.queues[priority].append(ticket)
+            self._dispatch(bucket)
+        try:
+            await granted
+        except asyncio.CancelledError:
+            with self._lock:
+                if ticket in bucket.queues[priority]:
+                    bucket.queues[priority].remove(ticket)
+                else:
+                    # Granted before the cancel landed: the call never goes out,
+                    # so its token goes back to whoever is queued next
+                    bucket.tokens = min(bucket.limit.burst, bucket.tokens + 1)
+                    bucket.calls -= 1
+                    bucket.by_class[priority][0] -= 1
+                    self._dispatch(bucket)
+            raise
+        return ticket.waited
+
+    def throttle(self, endpoint: str, model: Optional[str], seconds: float):
+        """The server said "not for `seconds`": hold the bucket that long."""
+        bucket = self._bucket(endpoint, model)
+        if bucket is None:
+            return
+        with self._lock:
+            bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + seconds)
+            bucket.throttled += 1
+
+    def _dispatch(self, bucket: _Bucket):
+        # Caller holds self._lock
+        now = time.monotonic()
+        while bucket.queued():
+            start = bucket.ready_at(now)
+            if start > now:
+                self._wake_later(bucket, start)
+                return
+            bucket.tokens -= 1
+            ticket = bucket.next_ticket(now)
+            ticket.waited = now - ticket.enqueued
+            bucket.calls += 1
+            bucket.waited += ticket.waited
+            bucket.max_wait = max(bucket.max_wait, ticket.waited)
+            entry = bucket.by_class.setdefault(ticket.priority, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += ticket.waited
+            entry[2] = max(entry[2], ticket.waited)
+            ticket.wake()
+
+    def _wake_later(self, bucket: _Bucket, at: float):
+        if bucket.timer is not None and bucket.timer_at <= at:
+            return
+        if bucket.timer is not None:
+            bucket.timer.cancel()
+        bucket.timer = threading.Timer(max(0.0, at - time.monotonic()), self._tick, (bucket,))
+        bucket.timer.daemon = True
+        bucket.timer_at = at
+        bucket.timer.start()
+
+    def _tick(self, bucket: _Bucket):
+        with self._lock:
+            bucket.timer = None
+            self._dispatch(bucket)
+
+    def stats(self) -> Dict:
+        """Per-bucket totals: calls let through and the time they spent queued,
+        overall and per priority class."""
+        with self._lock:
+            return {
+                endpoint + (f"/{model}" if model else ""): {
+                    "per_minute": b.limit.per_minute,
+                    "burst": b.limit.burst,
+                    "calls": b.calls,
+                    "waited_s": round(b.waited, 1),
+                    "max_wait_s": round(b.max_wait, 1),
+                    "throttled": b.throttled,
+                    "classes": {
+                        name: {"calls": n, "waited_s": round(waited, 1), "max_wait_s": round(longest, 1)}
+                        for name in PRIORITIES
+                        for n, waited, longest in [b.by_class.get(name, (0, 0.0, 0.0))]
+                        if n
+                    },
+                }
+                for (endpoint, model), b in self._buckets.items()
+            }
@@ -0,0 +1,127 @@
+"""
+Turns a model's raw reply into the line a seat actually says.
+
+Every reply goes through the same cleanup: drop think blocks and headings,
+echoed prompt labels and the speaker's own "NAME:" prefix, stop where the
+model starts writing another seat's lines, keep the first paragraph, and
+clip a ramble to four sentences. The patterns that don't depend on who is
+speaking are compiled here once; the ones that do (the speaker's prefix, the
+other seats' names) are compiled per seat on first use and kept until the
+roster changes.
+
+    python tools/bench_sanitize.py    # throughput over the published games
+"""
+import re
+from typing import Dict, Optional, Pattern, Tuple
+
+_THINK_BLOCKS = [
+    re.compile(r"<thinking>.*?</thinking>", re.DOTALL | re.IGNORECASE),
+    re.compile(r"<think>.*?</think>", re.DOTALL | re.IGNORECASE),
+    # Unterminated think block (truncated mid-reasoning): drop to end of text
+    re.compile(r"<think(?:ing)?>.*$", re.DOTALL | re.IGNORECASE),
+]
+# Prompt-template labels the model echoed ("Discussion: MARSHAL...")
+_TEMPLATE_LABEL = re.compile(
+    r"(?i)^(?:discussion|statement|answer|accusation|vote|response|reply)\s*:\s*"
+)
+# Honorifics (DR. VANCE, Mr., Mrs., Ms., St.) are not sentence ends
+_SENTENCE_END = re.compile(
+    r"(?<!\bdr\.)(?<!\bmr\.)(?<!\bms\.)(?<!\bst\.)(?<!\bmrs\.)(?<=[.!?])\s+",
+    re.IGNORECASE,
+)
+_LEADING_PUNCT = re.compile(r"^[^\w]+")
+_DAY_HEADING = re.compile(r"^(day|night)\s*\d+\s*[-–—]")
+_PHASE_HEADING = re.compile(r"^(discussion|voting)\s*(phase)?$")
+
+
+def is_heading_line(line: str) -> bool:
+    """A blank line or a heading the model put above its reply ("Day 2 — ...",
+    "TOWN MEETING", "Discussion phase")."""
+    l = line.strip()
+    if not l:
+        return True
+    l = _LEADING_PUNCT.sub("", l).strip().lower()
+    if not l:
+        return True
+    if _DAY_HEADING.match(l):
+        return True
+    if "town meeting" in l and len(l.split()) <= 6:
+        return True
+    if _PHASE_HEADING.match(l) and len(l.split()) <= 3:
+        return True
+    return False
+
+
+class ResponseSanitizer:
+    """sanitize_response for one roster. Callable: sanitizer(name, text)."""
+
+    def __init__(self, roster: Tuple[str, ...]):
+        self.roster = roster
+        # speaker -> (own-prefix patterns, other seats' "NAME:" pattern)
+        self._seats: Dict[str, Tuple[Tuple[Pattern, ...], Optional[Pattern]]] = {}
+
+    def _seat(self, speaker: str) -> Tuple[Tuple[Pattern, ...], Optional[Pattern]]:
+        seat = self._seats.get(speaker)
+        if seat is None:
+            name = re.escape(speaker)
+            prefixes = (
+                re.compile(rf"(?i)^\s*{name}\s*[:\-–—]\s*"),
+                re.compile(rf"(?i)^\s*{name}\s+(?:says|said|asks|responds|replies)\s*:\s*"),
+            )
+            other_names = [n for n in self.roster if n != speaker]
+            others = re.compile(
+                rf"(?im)^\s*(?:{'|'.join(map(re.escape, other_names))})\s*:"
+            ) if other_names else None
+            seat = self._seats[speaker] = (prefixes, others)
+        return seat
+
+    def __call__(self, speaker: str, text: str) -> str:
+        text = (text or "").strip()
+        if not text:
+            return ""
+
+        # Strip internal reasoning blocks — these must never be visible to other players
+        for pattern in _THINK_BLOCKS:
+            text = pattern.sub("", text)
+        text = text.strip()
+        if not text:
+            return ""
+
+        # Clean up formatting
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+        lines = [ln.rstrip() for ln in text.split("\n")]
+
+        # Remove heading lines
+        while lines and is_heading_line(lines[0]):
+            lines.pop(0)
+
+        text = "\n".join(lines).strip()
+        text = _TEMPLATE_LABEL.sub("", text).strip()
+
+        # Remove self-referential prefixes
+        prefixes, others = self._seat(speaker)
+        for pattern in prefixes:
+            text = pattern.sub("", text).strip()
+
+        # Stop at other player names
+        if others:
+            m = others.search(text)
+            if m:
+                text = text[: m.start()].rstrip()
+
+        # Take first complete paragraph only
+        paragraphs = text.split("\n\n")
+        text = paragraphs[0].strip()
+
+        # Clean up quotes and normalize spacing
+        text = text.strip(" \t\\\"'`")
+        text = " ".join(text.split())
+
+        # KEEP COMPLETE SENTENCES - don't cut off at 3
+        sentences = _SENTENCE_END.split(text)
+
+        # Only limit if we have TOO many sentences (>5)
+        if len(sentences) > 5:
+            return " ".join(sentences[:4]).strip()
+
+        return text
@@ -0,0 +1,122 @@
+"""
+Where a game's wall clock goes.
+
+MafiaGame owns one GameScheduler for the whole game. Blocking work (a sync
+player query, a GM narration, the episode blurbs) goes to its worker threads
+through run(); in --async mode the player queries are coroutines and go
+through track() instead, so both modes are measured the same way.
+
+For every kind of task (named after the function) the scheduler records how
+many ran, how long they sat queued before a worker picked them up, and how
+long they ran. It also keeps the queue depth and in-flight count as they
+change, with their peaks. The queue is bounded: past `max_queue` tasks
+waiting for a worker, the next submitter waits for room instead of piling
+more onto the pool.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class _Kind:
+    __slots__ = ("count", "wait", "run", "max_wait")
+
+    def __init__(self):
+        self.count = 0
+        self.wait = 0.0
+        self.run = 0.0
+        self.max_wait = 0.0
+
+
+class GameScheduler:
+    """One worker pool per game, plus the numbers behind it. run() and
+    track() are called from the game's event loop."""
+
+    def __init__(self, workers: int, max_queue: Optional[int] = None):
+        self.workers = workers
+        self.max_queue = max_queue if max_queue is not None else 4 * workers
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._lock = threading.Lock()
+        self._room: Optional[asyncio.Semaphore] = None
+        self._kinds: Dict[str, _Kind] = {}
+        self.queued = 0
+        self.in_flight = 0
+        self.peak_queued = 0
+        self.peak_in_flight = 0
+        self.started = time.monotonic()
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """fn(*args, **kwargs) on a worker thread."""
+        if self._room is None:
+            self._room = asyncio.Semaphore(self.workers + self.max_queue)
+        kind = getattr(fn, "__name__", "task")
+        submitted = time.monotonic()
+        async with self._room:
+            with self._lock:
+                self.queued += 1
+                self.peak_queued = max(self.peak_queued, self.queued)
+
+            def timed():
+                began = time.monotonic()
+                with self._lock:
+                    self.queued -= 1
+                    self._enter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self._leave(kind, began - submitted, time.monotonic() - began)
+
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, timed)
+
+    async def track(self, kind: str, work: Awaitable) -> Any:
+        """Await a coroutine that does its own I/O, counting it in flight."""
+        began = time.monotonic()
+        with self._lock:
+            self._enter()
+        try:
+            return await work
+        finally:
+            self._leave(kind, 0.0, time.monotonic() - began)
+
+    def _enter(self):
+        # Caller holds self._lock
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _leave(self, kind: str, waited: float, ran: float):
+        with self._lock:
+            self.in_flight -= 1
+            entry = self._kinds.setdefault(kind, _Kind())
+            entry.count += 1
+            entry.wait += waited
+            entry.run += ran
+            entry.max_wait = max(entry.max_wait, waited)
+
+    def shutdown(self):
+        self._pool.shutdown(cancel_futures=True)
+
+    def stats(self) -> Dict:
+        """Pool size, queue/in-flight now and at peak, and per task kind the
+        count, seconds queued and seconds running."""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queued": self.queued,
+                "in_flight": self.in_flight,
+                "peak_queued": self.peak_queued,
+                "peak_in_flight": self.peak_in_flight,
+                "wall_s": round(time.monotonic() - self.started, 1),
+                "tasks": {
+                    kind: {
+                        "count": k.count,
+                        "wait_s": round(k.wait, 2),
+                        "run_s": round(k.run, 2),
+                        "max_wait_s": round(k.max_wait, 2),
+                    }
+                    for kind, k in sorted(self._kinds.items(), key=lambda item: -item[1].run)
+                },
+            }
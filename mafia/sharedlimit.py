@@ -0,0 +1,231 @@
+"""
+One requests/min + tokens/min envelope shared by every game on this machine.
+
+RATE_LIMITS (ratelimit.py) only sees its own process, so three `main.py` runs
+against one NVIDIA key each believe they own the whole free tier and 429 each
+other. A SharedBudget keeps its two buckets in a JSON file under an fcntl
+lock instead. Every process on the box that points at the same file draws
+from the same tokens; the lock is held only for the read-modify-write, and a
+caller that can't go yet sleeps with the file unlocked and polls again.
+
+Fairness is between games, not calls. A process registers while it has calls
+waiting, and the next request goes to the waiting game that has been served
+least lately (a count that halves every minute, ties to the longest waiter).
+A game with eight seats in flight can't crowd out one with two. A game that
+dies mid-wait is dropped the next time anyone looks (its PID is gone).
+
+Token use is estimated before the call (prompt chars / 4 + max_tokens, the
+worst case) and settled against the response's reported usage afterwards, so
+a short reply gives back what it didn't spend.
+"""
+import asyncio
+import fcntl
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from mafia.ratelimit import Limit
+
+# How often a waiting caller re-reads the file when it is another game's turn
+POLL_INTERVAL = 0.05
+# Served counts halve over this many seconds, so old traffic stops counting
+FAIRNESS_HALF_LIFE = 60.0
+
+
+def default_state_path(endpoint: str) -> Path:
+    return Path(tempfile.gettempdir()) / f"llm-mafia-{endpoint}-budget.json"
+
+
+def estimate_tokens(messages: List[Dict], max_tokens: int) -> int:
+    return sum(len(m.get("content") or "") for m in messages) // 4 + max_tokens
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SharedBudget:
+    def __init__(self, path: Path, requests: Limit, tokens_per_minute: Optional[int] = None):
+        self.path = Path(path)
+        self.requests = requests
+        self.tokens_per_minute = tokens_per_minute
+        self.pid = str(os.getpid())
+        self._local = threading.Lock()  # flock is per open file, not per thread
+        self.calls = 0
+        self.waited = 0.0
+        self.estimated_tokens = 0
+        self.settled_tokens = 0
+
+    @contextmanager
+    def _state(self) -> Iterator[Dict]:
+        with self._local, open(self.path, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                try:
+                    state = json.loads(f.read() or "{}")
+                except ValueError:
+                    state = {}  # torn by a crash mid-write; start the envelope over
+                yield state
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(state))
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _refill(self, state: Dict, now: float):
+        buckets = [("requests", self.requests.per_minute, self.requests.burst)]
+        if self.tokens_per_minute:
+            buckets.append(("tokens", self.tokens_per_minute, self.tokens_per_minute))
+        for name, per_minute, capacity in buckets:
+            bucket = state.setdefault(name, {"level": capacity, "stamp": now})
+            elapsed = max(0.0, now - bucket["stamp"])
+            bucket["level"] = min(capacity, bucket["level"] + elapsed * per_minute / 60)
+            bucket["stamp"] = now
+
+        games = state.setdefault("games", {})
+        for pid in [p for p in games if not _alive(int(p))]:
+            del games[pid]
+        for game in games.values():
+            game["served"] *= 0.5 ** (max(0.0, now - game["stamp"]) / FAIRNESS_HALF_LIFE)
+            game["stamp"] = now
+
+    def _try_take(self, cost: int, first: bool) -> Optional[float]:
+        """Take a request if it is this game's turn and the buckets allow;
+        None when taken, else roughly how long to wait before asking again."""
+        with self._state() as state:
+            now = time.time()
+            self._refill(state, now)
+            games = state["games"]
+            me = games.setdefault(self.pid, {"served": 0.0, "waiting": 0, "since": now, "stamp": now})
+            if first:
+                if not me["waiting"]:
+                    me["since"] = now
+                me["waiting"] += 1
+
+            waiting = [g for g in games.values() if g["waiting"] > 0]
+            turn = min(waiting, key=lambda g: (g["served"], g["since"]))
+            if turn is not me:
+                return POLL_INTERVAL
+
+            requests = state["requests"]
+            shortfall = max(0.0, 1 - requests["level"]) * 60 / self.requests.per_minute
+            if self.tokens_per_minute:
+                tokens = state["tokens"]
+                need = min(cost, self.tokens_per_minute)
+                shortfall = max(shortfall, max(0.0, need - tokens["level"]) * 60 / self.tokens_per_minute)
+            if shortfall > 0:
+                return shortfall
+
+            requests["level"] -= 1
+            if self.tokens_per_minute:
+                state["tokens"]["level"] -= cost
+            me["served"] += 1
+            me["waiting"] -= 1
+            return None
+
+    def _give_up(self):
+        """A waiter that was cancelled must not stay registered as waiting."""
+        with self._state() as state:
+            me = state.get("games", {}).get(self.pid)
+            if me and me["waiting"] > 0:
+                me["waiting"] -= 1
+
+    def _undo(self, cost: int, granted: bool):
+        """Clean up after a cancelled acquire_async, in a worker thread: hand
+        back a request it was granted but will never send, or else withdraw
+        it from the waiting list."""
+        if not granted:
+            self._give_up()
+            return
+        with self._state() as state:
+            self._refill(state, time.time())
+            requests = state["requests"]
+            requests["level"] = min(self.requests.burst, requests["level"] + 1)
+            if self.tokens_per_minute:
+                tokens = state["tokens"]
+                tokens["level"] = min(self.tokens_per_minute, tokens["level"] + cost)
+            me = state["games"].get(self.pid)
+            if me:
+                me["served"] = max(0.0, me["served"] - 1)
+
+    def _granted(self, cost: int, waited: float):
+        self.calls += 1
+        self.waited += waited
+        self.estimated_tokens += cost
+
+    def acquire(self, messages: List[Dict], max_tokens: int) -> int:
+        """Block until this game may send; returns the token estimate to settle."""
+        cost = estimate_tokens(messages, max_tokens)
+        start = time.monotonic()
+        first = True
+        try:
+            while (wait := self._try_take(cost, first)) is not None:
+                first = False
+                time.sleep(wait)
+        except BaseException:
+            if not first:
+                self._give_up()
+            raise
+        self._granted(cost, time.monotonic() - start)
+        return cost
+
+    async def acquire_async(self, messages: List[Dict], max_tokens: int) -> int:
+        """acquire() for the event loop. Each look at the file runs in a worker
+        thread, so another game holding the lock stalls this call, not every
+        coroutine in the game."""
+        cost = estimate_tokens(messages, max_tokens)
+        start = time.monotonic()
+        first = True
+        loop = asyncio.get_running_loop()
+        take = None
+        try:
+            while True:
+                # Shielded: a cancel must not lose track of a take that lands anyway
+                take = asyncio.ensure_future(asyncio.to_thread(self._try_take, cost, first))
+                if (wait := await asyncio.shield(take)) is None:
+                    break
+                first = False
+                await asyncio.sleep(wait)
+        except BaseException:
+            if take is not None and not take.done():
+                take.add_done_callback(lambda t: t.cancelled() or t.exception() or loop.run_in_executor(
+                    None, self._undo, cost, t.result() is None))
+            elif not first:
+                loop.run_in_executor(None, self._undo, cost, False)
+            raise
+        self._granted(cost, time.monotonic() - start)
+        return cost
+
+    def settle(self, estimated: int, actual: int):
+        """Return (or charge) the difference between the guess and the usage."""
+        self.settled_tokens += actual
+        if not self.tokens_per_minute or estimated == actual:
+            return
+        with self._state() as state:
+            self._refill(state, time.time())
+            tokens = state["tokens"]
+            tokens["level"] = min(self.tokens_per_minute, tokens["level"] + estimated - actual)
+
+    def stats(self) -> Dict:
+        return {
+            "file": self.path.name,
+            "per_minute": self.requests.per_minute,
+            "tokens_per_minute": self.tokens_per_minute,
+            "calls": self.calls,
+            "waited_s": round(self.waited, 1),
+            "estimated_tokens": self.estimated_tokens,
+            "settled_tokens": self.settled_tokens,
+        }
@@ -0,0 +1,276 @@
+"""
+Games without models, for measuring the rules.
+
+Whether a house rule helps the town is a question about win rates, and a win
+rate needs hundreds of games: far more than the quota will pay for with real
+players. A SimulatedGame is the real MafiaGame — the same phases, roles, vote
+counting, night resolution and house rules — with every seat played by a
+scripted policy instead of a model. Nothing is printed, there is no GM, and
+events go into the log unvalidated, so a game takes milliseconds and
+play_many() runs thousands a minute across a process pool.
+
+A policy makes the five decisions that move the game (accuse, vote, kill,
+investigate, protect), each from the list of legal targets; everything else a
+seat is asked to say gets a filler line. The defaults are deliberately plain:
+
+    Policy           uniform over the legal targets
+    TownPolicy       acts on what is public (a detective's will), otherwise
+                     accuses on a noisy read and votes with the accusations
+    DetectivePolicy  TownPolicy plus its own investigations and trusted person
+    DoctorPolicy     TownPolicy, never protects the same seat twice running
+    MafiaPolicy      one agreed kill a night; by day rides the bandwagon
+                     unless it is on a partner
+
+Swap any role's policy with `policies={Role.MAFIA: MyPolicy}`. Absolute win
+rates say more about the policies than about the game; the difference a rule
+makes between two otherwise identical runs is what to read.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Type
+
+from mafia.game import MafiaGame
+from mafia.player import Player, Role
+
+# What each prompt in game.py asks for, by a phrase only that prompt has.
+# decision_kind() refuses a prompt it does not know, so a reworded prompt
+# fails tools/test_simulate.py instead of quietly becoming filler.
+PROMPT_KINDS = (
+    ("Who should be eliminated TODAY", "accuse"),
+    ("Vote to eliminate ONE player", "vote"),
+    ("It's night. You are Mafia", "kill"),
+    ("Mafia coordination", "kill"),
+    ("Final mafia vote", "kill"),
+    ("Choose ONE player to investigate", "investigate"),
+    ("Choose ONE player to protect", "protect"),
+    ("This is Day 1.", "statement"),
+    ("who among the ALIVE players is most suspicious", "statement"),
+    ("just asked you:", "answer"),
+    ("Ask ", "question"),
+    ("Challenge ", "question"),
+    ("Confront ", "question"),
+)
+SPEECH = {"statement", "question", "answer"}
+
+
+def decision_kind(prompt: str) -> str:
+    for phrase, kind in PROMPT_KINDS:
+        if phrase in prompt:
+            return kind
+    raise ValueError(f"no scripted decision for prompt: {prompt[:80]!r}")
+
+
+def bandwagon(game: MafiaGame, targets: List[str]) -> Optional[str]:
+    """The target accused most today, ties broken at random; None before
+    anyone has accused one of them."""
+    counts: Dict[str, int] = {}
+    for event in game.events.of_day(game.day):
+        if event["type"] == "accusation" and event.get("target") in targets:
+            counts[event["target"]] = counts.get(event["target"], 0) + 1
+    if not counts:
+        return None
+    top = max(counts.values())
+    return game.rng.choice([name for name, count in counts.items() if count == top])
+
+
+class Policy:
+    """One role's play. Each decision gets the legal targets and returns one
+    of them, drawing any chance from game.rng so the seed replays the game.
+    This one picks uniformly at random."""
+
+    def speak(self, game: MafiaGame, player: Player, kind: str) -> str:
+        return "I have nothing to add yet."
+
+    def accuse(self, game: MafiaGame, player: Player, targets: List[str]) -> str:
+        return game.rng.choice(targets)
+
+    def vote(self, game: MafiaGame, player: Player, targets: List[str]) -> str:
+        return game.rng.choice(targets)
+
+    def kill(self, game: MafiaGame, player: Player, targets: List[str]) -> str:
+        return game.rng.choice(targets)
+
+    def investigate(self, game: MafiaGame, player: Player, targets: List[str]) -> str:
+        return game.rng.choice(targets)
+
+    def protect(self, game: MafiaGame, player: Player, targets: List[str]) -> str:
+        return game.rng.choice(targets)
+
+
+class TownPolicy(Policy):
+    """A town seat: goes after anyone known to be mafia, leaves anyone known
+    to be town alone, and otherwise votes with the day's accusations.
+
+    Real players read the discussion; a script cannot, so `read` stands in
+    for it: the chance an accusation lands on a wolf on its own merits.
+    Without it every town lynch is a lottery and the town almost never wins,
+    which leaves no room to see a rule help it."""
+
+    # Puts lynch accuracy near the published library's (about 40%)
+    read = 0.35
+
+    def known(self, game: MafiaGame, player: Player) -> Dict[str, str]:
+        """name -> "MAFIA" / "INNOCENT", from what this seat has been told."""
+        return {e["target"]: e["result"] for e in game.events.of_type("detective_will")}
+
+    def suspects(self, game: MafiaGame, player: Player, targets: List[str]) -> List[str]:
+        known = self.known(game, player)
+        guilty = [t for t in targets if known.get(t) == "MAFIA"]
+        return guilty or [t for t in targets if t not in known] or targets
+
+    def accuse(self, game: MafiaGame, player: Player, targets: List[str]) -> str:
+        suspects = self.suspects(game, player, targets)
+        wolves = [p.name for p in game.get_mafia() if p.name in suspects]
+        if wolves and game.rng.random() < self.read:
+            return game.rng.choice(wolves)
+        return game.rng.choice(suspects)
+
+    def vote(self, game: MafiaGame, player: Player, targets: List[str]) -> str:
+        suspects = self.suspects(game, player, targets)
+        return bandwagon(game, suspects) or game.rng.choice(suspects)
+
+
+class DetectivePolicy(TownPolicy):
+    def known(self, game: MafiaGame, player: Player) -> Dict[str, str]:
+        known = super().known(game, player)
+        roles = {p.name: p.role for p in game.players}
+        for name in game.detective_investigated:
+            known[name] = "MAFIA" if roles[name] == Role.MAFIA else "INNOCENT"
+        if game.trusted_person:
+            known[game.trusted_person] = "INNOCENT"
+        return known
+
+
+class DoctorPolicy(TownPolicy):
+    def protect(self, game: MafiaGame, player: Player, targets: List[str]) -> str:
+        return game.rng.choice([t for t in targets if t != game.last_doctor_target] or targets)
+
+
+class MafiaPolicy(Policy):
+    """Every member names the same kill, so the night is settled in round
+    one; by day votes with the town unless the town is after a partner."""
+
+    def __init__(self):
+        self.night: Optional[int] = None
+        self.target: Optional[str] = None
+
+    def kill(self, game: MafiaGame, player: Player, targets: List[str]) -> str:
+        if self.night != game.day or self.target not in targets:
+            self.night, self.target = game.day, game.rng.choice(targets)
+        return self.target
+
+    def vote(self, game: MafiaGame, player: Player, targets: List[str]) -> str:
+        partners = {p.name for p in game.get_mafia()}
+        town = [t for t in targets if t not in partners] or targets
+        return bandwagon(game, town) or game.rng.choice(town)
+
+
+DEFAULT_POLICIES: Dict[Role, Type[Policy]] = {
+    Role.VILLAGER: TownPolicy,
+    Role.DETECTIVE: DetectivePolicy,
+    Role.DOCTOR: DoctorPolicy,
+    Role.MAFIA: MafiaPolicy,
+}
+
+# For --policy ROLE=NAME (tools/simulate.py)
+POLICIES: Dict[str, Type[Policy]] = {
+    "random": Policy,
+    "town": TownPolicy,
+    "detective": DetectivePolicy,
+    "doctor": DoctorPolicy,
+    "mafia": MafiaPolicy,
+}
+
+
+class SimulatedGame(MafiaGame):
+    """MafiaGame with scripted seats, no console, no GM, no backend."""
+
+    collect_between_days = False
+
+    def __init__(
+        self,
+        player_count: int = 8,
+        mafia_count: int = 2,
+        policies: Optional[Dict[Role, Type[Policy]]] = None,
+        detective_will: bool = True,
+        trusted_person: bool = True,
+        seed: Optional[int] = None,
+    ):
+        super().__init__(player_count=player_count, mafia_count=mafia_count,
+                         max_workers=1, gm_enabled=False, seed=seed)
+        self.detective_will = detective_will
+        self.trusted_person_rule = trusted_person
+        self.policies = {role: cls() for role, cls in {**DEFAULT_POLICIES, **(policies or {})}.items()}
+
+    def _connect(self, model_override, lm_studio_url, nvidia_api_key, use_async):
+        self._lm_client = self._async_client = self.endpoint_pool = None
+        self.model = model_override or "scripted"
+
+    def log(self, message: str, style: str = "normal", public: bool = True):
+        pass
+
+    def emit(self, type: str, private: bool = False, **fields):
+        if private and not self.reveal_secrets:
+            return
+        self.events._append({"type": type, **fields})
+
+    def _narrate(self, label: str, fn, *args, fallback=None, **kwargs) -> str:
+        return ""  # an empty recap, which _join_recaps skips
+
+    async def _offload(self, fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+
+    async def _ask(self, player: Player, prompt: str, context: str = "", **kwargs) -> str:
+        kind = decision_kind(prompt)
+        policy = self.policies[player.role]
+        if kind in SPEECH:
+            return policy.speak(self, player, kind)
+        alive = [p.name for p in self.get_alive_players()]
+        if kind == "accuse":
+            targets = self.probe_candidates(player, alive)
+        elif kind == "kill":
+            mafia = {p.name for p in self.get_mafia()}
+            targets = [name for name in alive if name not in mafia]
+        else:
+            targets = list(kwargs["choices"])
+        return getattr(policy, kind)(self, player, targets)
+
+
+def play(
+    seed: int,
+    player_count: int = 8,
+    mafia_count: int = 2,
+    detective_will: bool = True,
+    trusted_person: bool = True,
+    policies: Optional[Dict[Role, Type[Policy]]] = None,
+) -> Dict:
+    """One seeded game, returned in game_log.json's shape (events and stats)
+    plus the seed and the rules it was played under."""
+    game = SimulatedGame(player_count, mafia_count, policies, detective_will, trusted_person, seed)
+    game.run()
+    return {
+        "events": game.events.to_list(),
+        "day": game.day,
+        "stats": game.compute_stats(),
+        "seed": seed,
+        "rules": {"detective_will": detective_will, "trusted_person": trusted_person},
+    }
+
+
+def _play(kwargs: Dict) -> Dict:
+    return play(**kwargs)
+
+
+def play_many(games: Iterable[Dict], workers: Optional[int] = None) -> Iterator[Dict]:
+    """play(**game) for each game, across `workers` processes (default one
+    per CPU; 1 plays them here). Logs come back in the order given."""
+    games = list(games)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        yield from map(_play, games)
+        return
+    # A game is too short to ship alone: a few chunks per worker keeps the
+    # pool busy without the pickling dominating
+    chunk = max(1, len(games) // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_play, games, chunksize=chunk)
@@ -1,9 +1,14 @@
 import argparse
 import json
 import os
+import random
 from dotenv import load_dotenv
 from mafia.game import BackendUnavailable, MafiaGame, LM_STUDIO_URL, DEFAULT_MODEL, DEFAULT_NVIDIA_MODEL, DEFAULT_CLAUDE_MODEL, DEFAULT_GM_MODEL, CLAUDE_SEAT_MODELS, short_model_name
-from mafia.game_master import resolve_claude_model
+from mafia import checkpoint, eventsink
+from mafia.cassette import Cassette
+from mafia.liveserver import EventServer
+from mafia.game_master import RATE_LIMITS, backend_endpoint, resolve_claude_model, use_cassette, use_claude_pool, use_shared_budget
+from mafia.ratelimit import parse_limit
 
 load_dotenv()
 
@@ -23,9 +28,9 @@ if __name__ == "__main__":
     )
     parser.add_argument(
         "--lm-studio-url",
-        type=str,
-        default=LM_STUDIO_URL,
-        help=f"LM Studio base URL (default: {LM_STUDIO_URL})",
+        type=lambda v: [url.strip() for url in v.split(",") if url.strip()],
+        default=[LM_STUDIO_URL],
+        help=f"LM Studio base URL, or several comma-separated to spread seats across servers (default: {LM_STUDIO_URL})",
     )
     parser.add_argument(
         "--nvidia",
@@ -43,6 +48,13 @@ if __name__ == "__main__":
         action="store_true",
         help=f"Use the claude CLI (subscription-billed) instead of LM Studio (default model: {DEFAULT_CLAUDE_MODEL})",
     )
+    parser.add_argument(
+        "--claude-pool",
+        type=int,
+        default=0,
+        metavar="N",
+        help="With --claude, keep N warm CLI processes per model so calls skip startup (default: off)",
+    )
     parser.add_argument(
         "--gm-model",
         type=str,
@@ -65,13 +77,129 @@ if __name__ == "__main__":
     )
     parser.add_argument(
         "--max-workers",
+        type=lambda v: None if v == "auto" else int(v),
+        default=None,
+        metavar="N|auto",
+        help="Model requests in flight; auto (default) starts at 2 and adapts to the backend",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        action="append",
+        default=[],
+        metavar="[MODEL=]PER_MIN[:BURST]",
+        help="Cap requests per minute on the chosen backend, or on one model; repeatable (default: 40:3 for NVIDIA, none otherwise)",
+    )
+    parser.add_argument(
+        "--shared-limit",
+        type=str,
+        default=None,
+        metavar="PER_MIN[:BURST]",
+        help="Share one requests/min budget with every other game on this machine using the same backend (file-locked)",
+    )
+    parser.add_argument(
+        "--shared-tokens",
+        type=int,
+        default=None,
+        metavar="PER_MIN",
+        help="With --shared-limit, also share a tokens/min budget",
+    )
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Run model calls as coroutines on one event loop instead of worker threads",
+    )
+    parser.add_argument(
+        "--model-affinity",
+        action="store_true",
+        help="Run same-model requests back to back so a local server swaps models less",
+    )
+    parser.add_argument(
+        "--stream-names",
+        action="store_true",
+        help="Stream votes and night picks and stop each reply once it has named its target",
+    )
+    parser.add_argument(
+        "--questioning",
+        choices=["sequential", "pipelined"],
+        default="sequential",
+        help="Questioning rounds: one exchange at a time, or several between different seats at once",
+    )
+    parser.add_argument(
+        "--question-window",
         type=int,
         default=4,
-        help="Maximum number of parallel workers for model queries",
+        metavar="N",
+        help="With --questioning pipelined, how many exchanges may be in flight (1 = sequential). Above 1 an answerer sees its question in the prompt only, not yet in the transcript",
+    )
+    parser.add_argument(
+        "--parallel-mafia-confirm",
+        action="store_true",
+        help="Ask every mafia member for their night confirmation at once (each sees only round 1)",
+    )
+    parser.add_argument(
+        "--record",
+        type=str,
+        default=None,
+        metavar="CASSETTE",
+        help="Save every model request and reply to this .jsonl, for --replay",
+    )
+    parser.add_argument(
+        "--replay",
+        type=str,
+        default=None,
+        metavar="CASSETTE",
+        help="Serve model replies from a --record cassette, no network (pass the same backend flags)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Seed every random decision in the game (roles, speaking order, fallback picks). Default: a fresh one, printed at the start",
+    )
+    parser.add_argument(
+        "--run-stats",
+        action="store_true",
+        help="Print the infrastructure counters (caches, queues, rate limits, endpoints...) after the game",
     )
     parser.add_argument(
         "--output", type=str, default="game_log.json", help="Output file for game log"
     )
+    parser.add_argument(
+        "--checkpoint",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Where to save the game after every phase (default: next to --output, as <name>.checkpoint.json)",
+    )
+    parser.add_argument(
+        "--events",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Stream every event and log line here as the game runs, for tailing (default: next to --output, as <name>.events.jsonl)",
+    )
+    parser.add_argument(
+        "--fsync-every",
+        type=int,
+        default=0,
+        metavar="N",
+        help="fsync the event stream every N records (default: 0, flush only and leave the disk to the OS)",
+    )
+    parser.add_argument(
+        "--serve",
+        type=int,
+        default=None,
+        metavar="PORT",
+        help="Stream the game's events to spectators at http://127.0.0.1:PORT/events (Server-Sent Events)",
+    )
+    parser.add_argument(
+        "--resume",
+        type=str,
+        default=None,
+        metavar="CHECKPOINT",
+        help="Continue an aborted game from its checkpoint (pass the same backend flags)",
+    )
 
     args = parser.parse_args()
 
@@ -79,64 +207,139 @@ if __name__ == "__main__":
         print("❌ --claude and --nvidia are mutually exclusive")
         raise SystemExit(1)
 
+    if args.record and args.replay:
+        print("❌ --record and --replay are mutually exclusive")
+        raise SystemExit(1)
+    seed = args.seed
+    if args.record:
+        # The seed rides in the cassette, so a replay plays the same game
+        if seed is None:
+            seed = random.randrange(2**32)
+        use_cassette(Cassette.record_to(args.record, seed))
+    elif args.replay:
+        try:
+            cassette = use_cassette(Cassette.load(args.replay))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"❌ Can't read cassette {args.replay}: {e}")
+            raise SystemExit(1)
+        if cassette.seed is not None:
+            if seed is not None and seed != cassette.seed:
+                print(f"❌ --seed {seed}, but {args.replay} was recorded with seed {cassette.seed}")
+                raise SystemExit(1)
+            seed = cassette.seed
+
     nvidia_key = None
     if args.nvidia:
         nvidia_key = args.nvidia_key or os.environ.get("NVIDIA_API_KEY")
+        if not nvidia_key and args.replay:
+            nvidia_key = "replay"  # never sent: every reply comes off the cassette
         if not nvidia_key:
             print("❌ --nvidia requires an API key via --nvidia-key or NVIDIA_API_KEY env var")
             raise SystemExit(1)
 
+    endpoint = backend_endpoint(args.nvidia, args.claude)
+    for spec in args.rate_limit:
+        try:
+            limit_model, limit = parse_limit(spec)
+        except ValueError as e:
+            print(f"❌ {e}")
+            raise SystemExit(1)
+        RATE_LIMITS.configure(endpoint, limit, limit_model)
+    if args.shared_limit:
+        try:
+            limit_model, limit = parse_limit(args.shared_limit)
+        except ValueError as e:
+            print(f"❌ {e}")
+            raise SystemExit(1)
+        if limit_model:
+            print("❌ --shared-limit is per backend, not per model")
+            raise SystemExit(1)
+        use_shared_budget(endpoint, limit, args.shared_tokens)
+    elif args.shared_tokens:
+        print("❌ --shared-tokens needs --shared-limit")
+        raise SystemExit(1)
+
+    server = None
+    if args.serve is not None:
+        try:
+            server = EventServer(port=args.serve).start()
+        except OSError as e:
+            print(f"❌ Can't serve on port {args.serve}: {e}")
+            raise SystemExit(1)
+
     print("🎭 INITIALIZING LLM MAFIA GAME...\n")
+    pool = None
+    workers = args.max_workers or "auto"
     if args.claude:
         model = args.model  # None → seats cycle haiku/sonnet/opus, GM on sonnet
-        max_workers = args.max_workers
         # Aliases move when a new model ships, so ask the CLI which builds are
         # actually about to play. This also pre-fills the map the log is
         # stamped from, covering any seat that never gets a turn.
         aliases = [model] if model else CLAUDE_SEAT_MODELS
+        if args.claude_pool > 0:
+            pool = use_claude_pool(args.claude_pool)
+            for alias in aliases:
+                pool.warm(alias)
         seat_desc = ", ".join(short_model_name(resolve_claude_model(a)) for a in aliases)
-        print(f"🔌 Backend: Claude CLI  |  Model: {seat_desc}  |  Workers: {max_workers}\n")
+        print(f"🔌 Backend: Claude CLI  |  Model: {seat_desc}  |  Workers: {workers}\n")
     elif args.nvidia:
         model = args.model or DEFAULT_NVIDIA_MODEL
-        max_workers = args.max_workers if args.max_workers != 4 else 2
-        print(f"🔌 Backend: NVIDIA NIM  |  Model: {model}  |  Workers: {max_workers}\n")
+        print(f"🔌 Backend: NVIDIA NIM  |  Model: {model}  |  Workers: {workers}\n")
     else:
         model = args.model or DEFAULT_MODEL
-        max_workers = args.max_workers
-        print(f"🔌 Backend: LM Studio ({args.lm_studio_url})  |  Model: {model}\n")
+        print(f"🔌 Backend: LM Studio ({', '.join(args.lm_studio_url)})  |  Model: {model}\n")
 
     game = MafiaGame(
         reveal_secrets=args.reveal_secrets,
         player_count=args.player_count,
         mafia_count=args.mafia,
-        max_workers=max_workers,
+        max_workers=args.max_workers,
         model_override=model,
         lm_studio_url=args.lm_studio_url,
         nvidia_api_key=nvidia_key,
         gm_model=args.gm_model,
         gm_enabled=not args.no_gm,
         use_claude=args.claude,
+        use_async=args.use_async,
+        model_affinity=args.model_affinity,
+        stream_names=args.stream_names,
+        questioning=args.questioning,
+        question_window=args.question_window,
+        parallel_mafia_confirm=args.parallel_mafia_confirm,
+        checkpoint_path=args.checkpoint or args.resume or str(checkpoint.default_path(args.output)),
+        events_path=args.events or str(eventsink.default_path(args.output)),
+        fsync_every=args.fsync_every,
+        server=server,
+        seed=seed,
+        run_stats=args.run_stats,
     )
+    if args.resume:
+        try:
+            game.resume(checkpoint.load(args.resume))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"❌ Can't resume from {args.resume}: {e}")
+            raise SystemExit(1)
+        day, phase = game.resumed_from
+        print(f"♻️  Resuming after the {phase} phase of day {day}\n")
+    print(f"🎲 Seed: {game.seed}\n")
+    if server:
+        print(f"📡 Spectators: {server.url}/events  (viewer: /watch?live={server.url})\n")
+    if game.endpoint_pool and not args.replay:
+        for url, error in game.endpoint_pool.health_check().items():
+            print(f"   {'✅' if error is None else '⚠️ '} {url}" + (f"  (ejected: {error})" if error else ""))
+        print()
 
     try:
         game.run()
 
-        stats = game.compute_stats()
+        # The event stream, folded into the one log file the viewer and tools read
         os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
         with open(args.output, "w") as f:
-            json.dump(
-                {
-                    "events": game.events.to_list(),
-                    "game_log": game.game_log,
-                    "public_log": game.public_log,
-                    "day": game.day,
-                    "stats": stats,
-                    "episode": game.episode,
-                },
-                f,
-                indent=2,
-            )
+            json.dump(eventsink.compact(game.sink.path), f, indent=2)
+        os.remove(game.sink.path)
         print(f"\n📝 Game log saved to {args.output}")
+        if (game.last_checkpoint or game.resumed_from) and os.path.exists(game.checkpoint_path):
+            os.remove(game.checkpoint_path)  # finished; nothing left to resume
 
     except KeyboardInterrupt:
         print("\n\n⚠️  Game interrupted by user")
@@ -144,10 +347,21 @@ if __name__ == "__main__":
     except BackendUnavailable as e:
         # No log is written: a game that lost its backend has silent players
         # and no winner. Exit 2 so a batch runner can tell "quota/network gone"
-        # apart from an ordinary crash and wait instead of retrying.
+        # apart from an ordinary crash and wait instead of retrying. The last
+        # phase it completed is in the checkpoint.
         print(f"\n🚫 Backend unavailable: {e}")
-        print("   Game discarded (no log written).")
+        if game.last_checkpoint or game.resumed_from:
+            print(f"   No log written. Continue later with --resume {game.checkpoint_path}")
+        else:
+            print("   Game discarded (no log written).")
         raise SystemExit(2)
     except Exception as e:
         print(f"\n❌ Game crashed: {e}")
+        if game.sink:
+            print(f"   Everything up to the crash is in {game.sink.path}")
         raise SystemExit(1)
+    finally:
+        if pool:
+            pool.close()
+        if server:
+            server.close()
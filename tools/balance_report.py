@@ -31,8 +31,12 @@ def log_paths(logs_dir):
 def read_game(path):
     """Pull the few numbers we care about out of one log, or None if the game
     never finished (no game_over event)."""
-    log = json.loads(path.read_text())
+    return game_record(json.loads(path.read_text()), path.stem)
 
+
+def game_record(log, name):
+    """read_game for a log already in memory (tools/simulate.py hands these
+    over without writing them out)."""
     # Hand-edited logs carry this flag. Their winner was decided by us, not by
     # the players, so counting them would skew the win rate.
     if log.get("exclude_from_stats"):
@@ -63,7 +67,7 @@ def read_game(path):
     detective = log.get("stats", {}).get("detective") or {}
 
     return {
-        "name": path.stem,
+        "name": name,
         "winner": winner,
         "mafia_count": mafia_count,
         "lynches": lynches,
@@ -114,7 +118,7 @@ def percent(part, whole):
 def print_table(title, groups):
     """groups is a list of (label, [games])."""
     print(f"\n{title}")
-    print(f"{'split':<22} {'n':>3}  {'town win':>14}  {'lynch acc':>14}  {'day-1 acc':>14}")
+    print(f"{'split':<22} {'n':>5}  {'town win':>14}  {'lynch acc':>14}  {'day-1 acc':>14}")
     for label, games in groups:
         if not games:
             continue
@@ -122,7 +126,7 @@ def print_table(title, groups):
         town = f"{row['town_wins']}/{row['games']} {percent(row['town_wins'], row['games'])}"
         lynch = f"{row['lynches_correct']}/{row['lynches_total']} {percent(row['lynches_correct'], row['lynches_total'])}"
         day_one = f"{row['day_one_correct']}/{row['day_one_total']} {percent(row['day_one_correct'], row['day_one_total'])}"
-        print(f"{label:<22} {row['games']:>3}  {town:>14}  {lynch:>14}  {day_one:>14}")
+        print(f"{label:<22} {row['games']:>5}  {town:>14}  {lynch:>14}  {day_one:>14}")
 
 
 def day_one_split(games):
@@ -160,11 +164,18 @@ def main():
     if not games:
         raise SystemExit(f"No finished games in {logs_dir}")
 
+    report(games, f"{len(games)} finished game(s) in {args.logs}")
+    print()
+
+
+def report(games, title):
+    """The three tables: by wolf count, by the day-1 lynch, and the trusted
+    person within 3-mafia games."""
     two_mafia = [g for g in games if g["mafia_count"] == 2]
     three_mafia = [g for g in games if g["mafia_count"] >= 3]
 
     print_table(
-        f"{len(games)} finished game(s) in {args.logs}",
+        title,
         [("2 mafia", two_mafia), ("3 mafia", three_mafia), ("all", games)],
     )
 
@@ -185,7 +196,6 @@ def main():
             ("v2 (day-1 filtered)", buffed_v2),
         ],
     )
-    print()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,128 @@
+"""Throughput of sanitize_response over every line spoken in the published games.
+
+Usage:
+    python tools/bench_sanitize.py
+    python tools/bench_sanitize.py --logs runs --rounds 5
+
+Each spoken line (statements, questions, answers, accusations, mafia chat) is
+fed through twice: as published, and dressed the way raw replies arrive, with
+a heading, the speaker's own "NAME:" prefix and a think block in front. Both
+the ResponseSanitizer a game now keeps and the per-call pipeline it replaced
+(every pattern built inside the call) run over the same replies, and must
+return the same text for each.
+"""
+
+import argparse
+import json
+import pathlib
+import re
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from mafia.sanitize import ResponseSanitizer, is_heading_line  # noqa: E402
+
+
+def per_call(roster, speaker, text):
+    """sanitize_response before the sanitizer kept its patterns."""
+    text = (text or "").strip()
+    if not text:
+        return ""
+    text = re.sub(r"<thinking>.*?</thinking>", "", text, flags=re.DOTALL | re.IGNORECASE)
+    text = re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL | re.IGNORECASE)
+    text = re.sub(r"<think(?:ing)?>.*$", "", text, flags=re.DOTALL | re.IGNORECASE)
+    text = text.strip()
+    if not text:
+        return ""
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    lines = [ln.rstrip() for ln in text.split("\n")]
+    while lines and is_heading_line(lines[0]):
+        lines.pop(0)
+    text = "\n".join(lines).strip()
+    text = re.sub(
+        r"(?i)^(?:discussion|statement|answer|accusation|vote|response|reply)\s*:\s*", "", text
+    ).strip()
+    name = re.escape(speaker)
+    for pat in [
+        rf"(?i)^\s*{name}\s*[:\-–—]\s*",
+        rf"(?i)^\s*{name}\s+(?:says|said|asks|responds|replies)\s*:\s*",
+    ]:
+        text = re.sub(pat, "", text).strip()
+    other_names = [n for n in roster if n != speaker]
+    if other_names:
+        pat = re.compile(rf"(?im)^\s*(?:{'|'.join(map(re.escape, other_names))})\s*:", re.MULTILINE)
+        m = pat.search(text)
+        if m:
+            text = text[: m.start()].rstrip()
+    text = text.split("\n\n")[0].strip()
+    text = text.strip(" \t\\\"'`")
+    text = " ".join(text.split())
+    sentences = re.split(
+        r"(?<!\bdr\.)(?<!\bmr\.)(?<!\bms\.)(?<!\bst\.)(?<!\bmrs\.)(?<=[.!?])\s+",
+        text,
+        flags=re.IGNORECASE,
+    )
+    if len(sentences) > 5:
+        return " ".join(sentences[:4]).strip()
+    return text
+
+
+def load_replies(logs_dir):
+    games = []
+    for path in sorted(logs_dir.glob("*.json")):
+        events = json.loads(path.read_text()).get("events", [])
+        start = next((e for e in events if e["type"] == "game_start"), None)
+        if not start:
+            continue
+        roster = tuple(p["name"] for p in start["players"])
+        replies = []
+        for e in events:
+            if e.get("text") and e.get("actor") in roster:
+                replies.append((e["actor"], e["text"]))
+                replies.append((e["actor"], f"**Day {e.get('day', 1)} — Discussion**\n\n"
+                                            f"{e['actor']}: <think>who do I trust?</think>{e['text']}"))
+        games.append((roster, replies))
+    return games
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logs", default=str(ROOT / "viewer/public/logs"), help="directory of game logs")
+    parser.add_argument("--rounds", type=int, default=3, help="passes over the logs per pipeline")
+    args = parser.parse_args()
+
+    games = load_replies(pathlib.Path(args.logs))
+    total = sum(len(replies) for _, replies in games)
+    if not total:
+        sys.exit(f"no spoken lines under {args.logs}")
+
+    for roster, replies in games:
+        sanitizer = ResponseSanitizer(roster)
+        for speaker, text in replies:
+            assert sanitizer(speaker, text) == per_call(roster, speaker, text), (speaker, text[:80])
+
+    timings = {}
+    for label in ("per-call", "sanitizer"):
+        started = time.perf_counter()
+        for _ in range(args.rounds):
+            for roster, replies in games:
+                if label == "sanitizer":
+                    clean = ResponseSanitizer(roster)  # one per game, as MafiaGame keeps it
+                    for speaker, text in replies:
+                        clean(speaker, text)
+                else:
+                    for speaker, text in replies:
+                        per_call(roster, speaker, text)
+        timings[label] = time.perf_counter() - started
+
+    print(f"{len(games)} games, {total} replies, {args.rounds} rounds; outputs identical")
+    for label, seconds in timings.items():
+        rate = total * args.rounds / seconds
+        print(f"  {label:<10} {seconds:6.2f}s  {rate:9.0f} replies/s")
+    print(f"  speedup    {timings['per-call'] / timings['sanitizer']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
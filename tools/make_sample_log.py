@@ -14,6 +14,8 @@ import pathlib
 import random
 import re
 import sys
+import time
+from types import SimpleNamespace
 
 ROOT = pathlib.Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT))
@@ -37,7 +39,7 @@ LINES = [
 
 
 def fake_query(game):
-    def _q(player, prompt, context="", min_words=4, public_speech=False, max_tokens=2048):
+    def _q(player, prompt, context="", min_words=4, public_speech=False, max_tokens=2048, early_stop=None, choices=None, priority="discussion", shared=None):
         others = [p.name for p in game.get_alive_players() if p.name != player.name]
         if not others:
             return "I have nothing left to say."
@@ -48,12 +50,63 @@ def fake_query(game):
     return _q
 
 
+# The tools/test_*.py games go one layer down, through the real call_llm, so
+# they drive a stand-in OpenAI client instead of replacing query_model.
+
+def fake_client(reply):
+    """An OpenAI client whose chat.completions.create(**kwargs) answers with
+    reply(kwargs) as the message content."""
+    def create(**kwargs):
+        message = SimpleNamespace(content=reply(kwargs), reasoning_content=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def accusation(name):
+    """A reply that names `name` first, so votes and night picks resolve."""
+    return json.dumps({"response": f"{name}. I keep coming back to {name} today."})
+
+
+def accusing_client(game, rng=random, delay=0.0, sent=None):
+    """fake_client accusing an alive player drawn from `rng`, after `delay`
+    seconds; each request's messages are appended to `sent` if given."""
+    def reply(kwargs):
+        if sent is not None:
+            sent.append("\n".join(m["content"] for m in kwargs["messages"]))
+        time.sleep(delay)
+        return accusation(rng.choice([p.name for p in game.get_alive_players()]))
+
+    return fake_client(reply)
+
+
+def gm_stub(delay=0.0):
+    """A GM call that takes `delay` seconds and says which prompt it had."""
+    def call(prompt, max_tokens=150, priority="narration"):
+        time.sleep(delay)
+        kind = "RECAP" if prompt.startswith("Summarize Day") else "NARRATION"
+        return f"{kind} {prompt.split('.')[0]}"
+
+    return call
+
+
+def scripted_game(rng=random, gm_delay=None, sent=None, **kwargs):
+    """MafiaGame(**kwargs) played through accusing_client; with gm_delay, the
+    GM is gm_stub(gm_delay) instead of the real backend."""
+    game = MafiaGame(**kwargs)
+    game._lm_client = accusing_client(game, rng, sent=sent)
+    if gm_delay is not None:
+        game.gm._call = gm_stub(gm_delay)
+    return game
+
+
 def run_game(reveal_secrets=True, seed=23):
     random.seed(seed)
     game = MafiaGame(
         reveal_secrets=reveal_secrets,
         player_count=8,        # 8 => mafia + detective + doctor all present
         gm_enabled=False,      # no narrator network calls
+        seed=seed,
     )
     game.query_model = fake_query(game)
     game.run()
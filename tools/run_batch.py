@@ -13,6 +13,10 @@ spending it, so this checks the OAuth usage endpoint between games, measures
 what one game actually costs, and sleeps until the window resets when there is
 not enough headroom for another. If the endpoint will not answer, it runs
 anyway and relies on mafia/game.py aborting a game whose backend has gone.
+
+A game aborted that way is not started over: once there is quota again it is
+resumed from the checkpoint it left after its last completed phase (see
+mafia/checkpoint.py), into the same log file.
 """
 
 import argparse
@@ -26,6 +30,7 @@ from pathlib import Path
 REPO_ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(REPO_ROOT))
 
+from mafia.checkpoint import default_path as checkpoint_path
 from tools.claude_usage import read_usage
 
 RUNS_DIR = REPO_ROOT / "runs"
@@ -109,8 +114,9 @@ def smells_wrong(log_path):
     return reasons
 
 
-def run_one_game(log_path, args):
-    """Play one game in a subprocess. Returns its exit code."""
+def run_one_game(log_path, args, resume=False):
+    """Play one game in a subprocess, or with resume carry on the one that
+    left a checkpoint for log_path. Returns its exit code."""
     command = [
         sys.executable, str(REPO_ROOT / "main.py"),
         "--claude",
@@ -118,8 +124,14 @@ def run_one_game(log_path, args):
         "--player-count", str(args.player_count),
         "--output", str(log_path),
     ]
+    if resume:
+        command += ["--resume", str(checkpoint_path(log_path))]
     if args.reveal_secrets:
         command.append("--reveal-secrets")
+    if args.shared_limit:
+        # Runners started side by side then split one budget instead of each
+        # spending the whole of it
+        command += ["--shared-limit", args.shared_limit]
     return subprocess.run(command, cwd=REPO_ROOT).returncode
 
 
@@ -142,6 +154,10 @@ def main():
         "--max-wait-hours", type=float, default=12.0,
         help="Give up if total sleeping would exceed this (default: 12)",
     )
+    parser.add_argument(
+        "--shared-limit", metavar="PER_MIN[:BURST]", default=None,
+        help="Passed to every game: share one requests/min budget with other runners on this machine",
+    )
     args = parser.parse_args()
 
     # Redirected to a file, Python block-buffers, so the runner's own banners
@@ -155,6 +171,8 @@ def main():
     last_cost = None
     finished = []
     aborted = []
+    # Log path of a game the backend dropped, to resume before starting another
+    interrupted = None
 
     while len(finished) < args.games:
         usage = read_usage()
@@ -182,11 +200,17 @@ def main():
 
         game_number = len(finished) + len(aborted) + 1
         where = "" if utilization is None else f"  |  window {utilization:.0f}% used"
-        print(f"\n{'=' * 60}\n▶️  Game {game_number} "
-              f"({len(finished)}/{args.games} finished){where}\n{'=' * 60}")
+        if interrupted:
+            log_path, resuming = interrupted, True
+            print(f"\n{'=' * 60}\n♻️  Game {game_number} resumed "
+                  f"({len(finished)}/{args.games} finished){where}\n{'=' * 60}")
+        else:
+            log_path, resuming = log_path_for_now(), False
+            print(f"\n{'=' * 60}\n▶️  Game {game_number} "
+                  f"({len(finished)}/{args.games} finished){where}\n{'=' * 60}")
 
-        log_path = log_path_for_now()
-        exit_code = run_one_game(log_path, args)
+        exit_code = run_one_game(log_path, args, resume=resuming)
+        interrupted = None
 
         after = read_usage()
         if usage and after and after["utilization"] > utilization:
@@ -194,9 +218,15 @@ def main():
             print(f"💸 That game used {last_cost:.1f}% of the 5-hour window.")
 
         if exit_code == EXIT_BACKEND_UNAVAILABLE:
-            aborted.append(log_path.name)
-            print("⚠️  Backend went away mid-game — nothing saved.")
+            if checkpoint_path(log_path).exists():
+                interrupted = log_path
+                print("⚠️  Backend went away mid-game — it resumes from its last phase.")
+            else:
+                aborted.append(log_path.name)
+                print("⚠️  Backend went away mid-game — nothing saved.")
             if not args.wait:
+                if interrupted:
+                    print(f"   Resume it yourself:  python main.py --claude --resume {checkpoint_path(log_path)}")
                 break
             # The quota reading is what decides whether to wait; loop back and
             # let should_start_game read it fresh.
@@ -0,0 +1,98 @@
+"""Pre-screen a rule change on scripted games before spending quota on it.
+
+Usage:
+    python tools/simulate.py                              # 2000 games, 2 and 3 mafia
+    python tools/simulate.py --games 10000 --will both    # what the detective's will is worth
+    python tools/simulate.py --mafia 3 --trusted both     # the trusted person, on vs off
+    python tools/simulate.py --policy mafia=random        # a dumber mafia
+
+Plays seeded games of the real engine with every seat scripted (see
+mafia/simulate.py) across a process pool, and prints the same tables as
+balance_report.py. The games are played round-robin over every combination of
+--mafia, --will and --trusted, so the rows being compared differ only in the
+rule. Read the difference between rows, not the absolute win rates: those
+measure the scripted policies as much as the game.
+"""
+
+import argparse
+import itertools
+import os
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from balance_report import game_record, print_table, report  # noqa: E402
+from mafia.player import Role  # noqa: E402
+from mafia.simulate import POLICIES, play_many  # noqa: E402
+
+SWITCH = {"on": [True], "off": [False], "both": [True, False]}
+
+
+def parse_policy(value):
+    role, _, name = value.partition("=")
+    roles = {r.name.lower(): r for r in Role}
+    if role.lower() not in roles or name not in POLICIES:
+        raise argparse.ArgumentTypeError(
+            f"expected ROLE=POLICY with ROLE in {sorted(roles)} and POLICY in {sorted(POLICIES)}"
+        )
+    return roles[role.lower()], POLICIES[name]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Win rates over scripted games")
+    parser.add_argument("--games", type=int, default=2000, help="How many games to play (default 2000)")
+    parser.add_argument("--players", type=int, default=8, help="Seats per game (default 8)")
+    parser.add_argument("--mafia", type=int, nargs="+", default=[2, 3], help="Mafia counts to play (default 2 3)")
+    parser.add_argument("--will", choices=SWITCH, default="on", help="The detective's will (default on)")
+    parser.add_argument(
+        "--trusted", choices=SWITCH, default="both",
+        help="The trusted person, 3-mafia games only (default both)",
+    )
+    parser.add_argument(
+        "--policy", type=parse_policy, action="append", default=[], metavar="ROLE=POLICY",
+        help=f"Play a role with another policy ({', '.join(POLICIES)}); repeatable",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first game; game i plays seed+i")
+    parser.add_argument("--workers", type=int, default=None, help="Processes (default one per CPU)")
+    args = parser.parse_args()
+
+    # The trusted person never applies below 3 mafia, so there is nothing to switch
+    setups = [
+        (mafia, will, trusted)
+        for mafia, will in itertools.product(args.mafia, SWITCH[args.will])
+        for trusted in (SWITCH[args.trusted] if mafia >= 3 else [True])
+    ]
+    policies = dict(args.policy)
+    games = []
+    for i in range(args.games):
+        mafia, will, trusted = setups[i % len(setups)]
+        games.append({
+            "seed": args.seed + i, "player_count": args.players, "mafia_count": mafia,
+            "detective_will": will, "trusted_person": trusted, "policies": policies,
+        })
+
+    started = time.monotonic()
+    records = []
+    for log in play_many(games, args.workers):
+        record = game_record(log, f"seed-{log['seed']}")
+        record["detective_will"] = log["rules"]["detective_will"]
+        records.append(record)
+    elapsed = time.monotonic() - started
+
+    workers = args.workers or os.cpu_count() or 1
+    print(f"{len(records)} games in {elapsed:.1f}s ({60 * len(records) / elapsed:.0f}/min on {workers} worker(s))")
+    report(records, f"{len(records)} simulated game(s), {args.players} players")
+    if args.will == "both":
+        print_table(
+            "Detective's will",
+            [("on", [r for r in records if r["detective_will"]]),
+             ("off", [r for r in records if not r["detective_will"]])],
+        )
+    print()
+
+
+if __name__ == "__main__":
+    main()
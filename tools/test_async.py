@@ -0,0 +1,136 @@
+"""Checks for the --async engine: a full game on one event loop, and the
+in-flight cap that a 429 backoff must not hold.
+
+No network: the AsyncOpenAI client is swapped for a stub that answers with a
+random alive player's name.
+
+    python tools/test_async.py
+"""
+import asyncio
+import json
+import os
+import pathlib
+import random
+import sys
+import tempfile
+from types import SimpleNamespace
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+import mafia.game_master as game_master  # noqa: E402
+from mafia.concurrency import ConcurrencyLimit  # noqa: E402
+from mafia.game import MafiaGame  # noqa: E402
+
+
+class StubCompletions:
+    """Quacks like AsyncOpenAI().chat.completions; tracks peak concurrency."""
+
+    def __init__(self, reply, fail_first=0):
+        self.reply = reply
+        self.fail_first = fail_first
+        self.calls = 0
+        self.in_flight = 0
+        self.peak = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        if self.calls <= self.fail_first:
+            raise RuntimeError("Error code: 429 - rate limited")
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            content = json.dumps({"response": self.reply()})
+            message = SimpleNamespace(content=content, reasoning_content=None)
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+        finally:
+            self.in_flight -= 1
+
+
+def stub_client(completions):
+    return SimpleNamespace(chat=SimpleNamespace(completions=completions), close=_noop)
+
+
+async def _noop():
+    return None
+
+
+def test_full_game():
+    random.seed(7)
+    game = MafiaGame(player_count=8, gm_enabled=False, use_async=True, max_workers=3)
+
+    def reply():
+        name = random.choice([p.name for p in game.get_alive_players()])
+        return f"I have watched {name} closely all day. My vote is {name}."
+
+    completions = StubCompletions(reply)
+    game._async_client = stub_client(completions)
+    game.run()
+
+    events = game.events.to_list()
+    assert events[0]["type"] == "game_start" and events[-1]["type"] == "game_over", events[-1]
+    assert completions.calls > 20, completions.calls
+    assert completions.peak <= 3, f"{completions.peak} requests in flight, cap is 3"
+    print(f"async game OK ({completions.calls} calls, peak {completions.peak} in flight)")
+
+
+def test_backoff_frees_slot():
+    """A call sleeping off a 429 must not hold the only slot."""
+    original_backoff = game_master._backoff
+    game_master._backoff = lambda error, attempt: 0.2 if attempt == 0 else None
+    try:
+        completions = StubCompletions(lambda: "RICO", fail_first=1)
+        client = stub_client(completions)
+
+        async def two_calls():
+            slots = ConcurrencyLimit.fixed(1)
+            loop = asyncio.get_running_loop()
+            finished = {}
+
+            async def call(tag):
+                await game_master.call_llm_async(
+                    client, "m", [{"role": "user", "content": "x"}],
+                    use_nvidia=False, schema_key="response", slots=slots,
+                )
+                finished[tag] = loop.time()
+
+            start = loop.time()
+            await asyncio.gather(call("throttled"), call("other"))
+            return finished["other"] - start, finished["throttled"] - start
+
+        other, throttled = asyncio.run(two_calls())
+        assert other < 0.15, f"second call waited {other:.2f}s behind a sleeping retry"
+        assert throttled >= 0.2, throttled
+    finally:
+        game_master._backoff = original_backoff
+    print("backoff releases its slot OK")
+
+
+def test_claude_subprocess():
+    """call_claude_async parses the CLI's json the way call_claude does. A
+    stand-in `claude` on PATH keeps this free."""
+    with tempfile.TemporaryDirectory() as tmp:
+        fake = pathlib.Path(tmp) / "claude"
+        fake.write_text(
+            "#!/bin/sh\n"
+            "echo '{\"result\": \" ready \", \"modelUsage\": {\"claude-haiku-9\": {}}}'\n"
+        )
+        fake.chmod(0o755)
+        original_path = os.environ["PATH"]
+        os.environ["PATH"] = f"{tmp}{os.pathsep}{original_path}"
+        try:
+            reply = asyncio.run(game_master.call_claude_async(
+                "haiku-test", [{"role": "system", "content": "s"}, {"role": "user", "content": "u"}],
+            ))
+        finally:
+            os.environ["PATH"] = original_path
+    assert reply == "ready", reply
+    assert game_master.RESOLVED_CLAUDE_MODELS.pop("haiku-test") == "claude-haiku-9"
+    print("claude subprocess OK")
+
+
+if __name__ == "__main__":
+    test_full_game()
+    test_backoff_frees_slot()
+    test_claude_subprocess()
+    print("ok")
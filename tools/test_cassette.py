@@ -0,0 +1,106 @@
+"""Checks for --record / --replay (mafia/cassette.py): a recorded game replays
+event for event with the network gone, and a request whose game history
+drifted still finds its reply by seat and task.
+
+    python tools/test_cassette.py
+"""
+import asyncio
+import pathlib
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+import mafia.game_master as game_master  # noqa: E402
+from mafia.cassette import Cassette, CassetteMiss  # noqa: E402
+from mafia.game import MafiaGame  # noqa: E402
+from make_sample_log import accusing_client, fake_client  # noqa: E402
+
+
+def scripted_client(game):
+    """Answers with an alive player's name from its own RNG, so recording
+    draws nothing from the game's random stream that replay wouldn't."""
+    return accusing_client(game, random.Random(5))
+
+
+def offline_client():
+    def reply(kwargs):
+        raise AssertionError("replay went to the network")
+
+    return fake_client(reply)
+
+
+def play(seed, client_for):
+    random.seed(seed)
+    # One worker: fan-outs finish in submission order, so both runs take the
+    # same path. (Whether a seat's context already holds the previous seat's
+    # line still races the event loop; the loose key absorbs that.)
+    game = MafiaGame(player_count=8, gm_enabled=False, max_workers=1)
+    game._lm_client = client_for(game)
+    game.run()
+    return game
+
+
+def test_game_replays():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = pathlib.Path(tmp) / "game.jsonl"
+        try:
+            game_master.use_cassette(Cassette.record_to(path, seed=11))
+            recorded = play(11, scripted_client)
+            cassette = game_master.use_cassette(Cassette.load(path))
+            replayed = play(cassette.seed, lambda game: offline_client())
+        finally:
+            game_master.use_cassette(None)
+    assert replayed.events.to_list() == recorded.events.to_list()
+    stats = cassette.stats()
+    assert stats["misses"] == 0 and stats["unused"] == 0, stats
+    assert stats["hits"] > 20, stats
+    print(f"game replays OK ({stats['hits']} replies)")
+
+
+def test_loose_match():
+    system = "You are RICO.\n\n### CURRENT GAME STATE\n{}"
+    with tempfile.TemporaryDirectory() as tmp:
+        path = pathlib.Path(tmp) / "c.jsonl"
+        recorder = Cassette.record_to(path, seed=1)
+        for reply, history in (("first", "day 1"), ("second", "day 1")):
+            messages = [{"role": "system", "content": system.format(history)}, {"role": "user", "content": "Vote."}]
+            recorder.record("m", messages, 48, reply)
+        cassette = Cassette.load(path)
+
+    drifted = [{"role": "system", "content": system.format("day 1, other order")}, {"role": "user", "content": "Vote."}]
+    assert cassette.play("m", drifted, 48) == "first"
+    exact = [{"role": "system", "content": system.format("day 1")}, {"role": "user", "content": "Vote."}]
+    assert cassette.play("m", exact, 48) == "second"  # "first" is spent
+    try:
+        cassette.play("m", exact, 48)
+    except CassetteMiss:
+        pass
+    else:
+        raise AssertionError("a spent cassette served a reply twice")
+    assert cassette.stats()["loose_hits"] == 1 and cassette.stats()["misses"] == 1
+    print("loose match OK")
+
+
+def test_async_replay():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = pathlib.Path(tmp) / "c.jsonl"
+        messages = [{"role": "user", "content": "Say ready."}]
+        Cassette.record_to(path, seed=1).record("haiku", messages, None, "ready")
+        game_master.use_cassette(Cassette.load(path))
+        try:
+            reply = asyncio.run(game_master.call_llm_async(
+                None, "haiku", messages, use_nvidia=False, schema_key="response", use_claude=True,
+            ))
+        finally:
+            game_master.use_cassette(None)
+    assert reply == "ready", reply
+    print("async claude replay OK")
+
+
+if __name__ == "__main__":
+    test_game_replays()
+    test_loose_match()
+    test_async_replay()
+    print("ok")
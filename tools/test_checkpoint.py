@@ -0,0 +1,118 @@
+"""Checks for phase checkpoints (mafia/checkpoint.py): a checkpoint is written
+after every phase, a game resumed from one carries on from the next phase
+with the same history, RNG state and unfinished GM narration, and a game whose
+backend dies mid-phase can be finished from the checkpoint it left.
+
+    python tools/test_checkpoint.py
+"""
+import json
+import pathlib
+import random
+import sys
+import tempfile
+from collections import Counter
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from mafia import checkpoint  # noqa: E402
+from mafia.game import BackendUnavailable  # noqa: E402
+from make_sample_log import scripted_game  # noqa: E402
+
+
+def new_game(path, fail_after=None):
+    # The GM is slow enough to still be writing at the phase's end
+    game = scripted_game(gm_delay=0.2, player_count=7, max_workers=4, checkpoint_path=str(path))
+    completions = game._lm_client.chat.completions
+    answer = completions.create
+    calls = Counter()
+
+    def create(**kwargs):
+        calls["n"] += 1
+        if fail_after is not None and calls["n"] > fail_after:
+            raise RuntimeError("usage limit reached")
+        return answer(**kwargs)
+
+    completions.create = create
+    return game
+
+
+def checkpoints(path):
+    """Play a game, keeping every checkpoint it writes."""
+    random.seed(5)
+    game = new_game(path)
+    states = []
+    take = game.checkpoint_state
+
+    def keep(phase):
+        state = take(phase)
+        states.append(json.loads(json.dumps(state)))
+        return state
+
+    game.checkpoint_state = keep
+    game.run()
+    return game, states
+
+
+def test_checkpoint_every_phase(tmp):
+    game, states = checkpoints(tmp / "a.json")
+    phases = [(s["day"], s["phase"]) for s in states]
+    expected = [(day, phase) for day in range(1, game.day + 1) for phase in checkpoint.PHASES]
+    assert phases == expected[:len(phases)] and len(phases) >= 3, phases
+    # The day's recap was still being written when the day ended
+    held = {item["label"]: item for item in states[0]["held"] if isinstance(item, dict)}
+    assert held["day_summary"]["args"][0] == 1, held
+    assert states[0]["day_summaries"] == {}
+    print(f"checkpoint OK ({len(states)} phases, day 1 recap saved unfinished)")
+    return states
+
+
+def test_resume(tmp, states):
+    for state in states[:3]:
+        resumed = new_game(tmp / "b.json")  # a fresh seed: the checkpoint's decides the rest
+        resumed.resume(state)
+        assert resumed.rng.getstate() == checkpoint.rng_restore(state["random"])
+        assert resumed.seed == state["seed"]
+        resumed.run()
+        events = resumed.events.to_list()
+        assert events[:len(state["events"])] == state["events"]
+        assert resumed.public_log[:len(state["public_log"])] == state["public_log"]
+        assert [e["type"] for e in events].count("game_start") == 1 and events[-1]["type"] == "game_over"
+        phases = Counter((e["day"], e["phase"]) for e in events if e["type"] == "phase")
+        assert max(phases.values()) == 1, phases  # no phase played twice
+        # The recap the checkpoint held unfinished was written again
+        assert resumed.day_summaries[1].startswith("RECAP Summarize Day 1"), resumed.day_summaries
+        assert resumed.compute_stats()["resumed_from"] == {"day": state["day"], "phase": state["phase"]}
+    print("resume OK (after day, vote and night of day 1)")
+
+
+def test_backend_dies_mid_game(tmp):
+    random.seed(6)
+    path = tmp / "c.json"
+    game = new_game(path, fail_after=60)
+    try:
+        game.run()
+    except BackendUnavailable:
+        pass
+    else:
+        raise AssertionError("backend never died")
+    day, phase = game.last_checkpoint
+    state = checkpoint.load(path)
+    assert (state["day"], state["phase"]) == (day, phase)
+
+    resumed = new_game(path)
+    resumed.resume(state)
+    resumed.run()
+    events = resumed.events.to_list()
+    assert events[-1]["type"] == "game_over"
+    phases = Counter((e["day"], e["phase"]) for e in events if e["type"] == "phase")
+    assert max(phases.values()) == 1, phases
+    print(f"backend died after the {phase} of day {day}, resumed to day {resumed.day} OK")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = pathlib.Path(tmp)
+        states = test_checkpoint_every_phase(tmp)
+        test_resume(tmp, states)
+        test_backend_dies_mid_game(tmp)
+    print("ok")
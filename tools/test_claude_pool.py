@@ -0,0 +1,163 @@
+"""Checks for --claude-pool: warm workers answer once and are replaced, a dead
+spare is skipped, a spare that writes a lot to stderr while idle doesn't
+hang, topping up never blocks a call taking a spare, and call_claude records
+the CLI's startup overhead and the spares' hits.
+
+A stand-in `claude` on PATH speaks just enough stream-json (init line, one
+result per request), so this costs no tokens.
+
+    python tools/test_claude_pool.py
+"""
+import os
+import pathlib
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+import mafia.game_master as game_master  # noqa: E402
+import mafia.claude_pool as claude_pool  # noqa: E402
+from mafia.claude_pool import ClaudePool  # noqa: E402
+
+FAKE_CLAUDE = """#!{python}
+import json, os, sys
+sys.stderr.write("x" * int(os.environ.get("FAKE_CLAUDE_STDERR", "0")))
+sys.stderr.flush()
+if os.environ.get("FAKE_CLAUDE_FAIL"):
+    sys.exit(os.environ["FAKE_CLAUDE_FAIL"])
+print(json.dumps({{"type": "system", "subtype": "init"}}), flush=True)
+for line in sys.stdin:
+    prompt = json.loads(line)["message"]["content"]
+    print(json.dumps({{
+        "type": "result", "is_error": False, "duration_api_ms": 50,
+        "result": " pid=%d %s " % (os.getpid(), prompt.splitlines()[-1]),
+        "modelUsage": {{"claude-haiku-9": {{}}}},
+    }}), flush=True)
+"""
+
+MESSAGES = [{"role": "system", "content": "sys"}, {"role": "user", "content": "who?"}]
+
+
+def with_fake_claude(test):
+    with tempfile.TemporaryDirectory() as tmp:
+        fake = pathlib.Path(tmp) / "claude"
+        fake.write_text(FAKE_CLAUDE.format(python=sys.executable))
+        fake.chmod(0o755)
+        original_path = os.environ["PATH"]
+        os.environ["PATH"] = f"{tmp}{os.pathsep}{original_path}"
+        try:
+            test()
+        finally:
+            os.environ["PATH"] = original_path
+
+
+def test_single_use_workers():
+    pool = ClaudePool(spares=1)
+    try:
+        pool.warm("haiku-test")
+        first = pool.call("haiku-test", MESSAGES)
+        second = pool.call("haiku-test", MESSAGES)
+    finally:
+        pool.close()
+    assert first["result"].strip().endswith("who?"), first
+    # a fresh process per request: no seat ever shares a session
+    assert first["result"].split()[0] != second["result"].split()[0], (first, second)
+    assert pool.cold_starts == 0, pool.cold_starts
+    print("single-use workers OK")
+
+
+def test_dead_spare_recycled():
+    pool = ClaudePool(spares=1)
+    try:
+        pool.warm("haiku-test")
+        pool._idle["haiku-test"][0].kill()
+        reply = pool.call("haiku-test", MESSAGES)
+    finally:
+        pool.close()
+    assert reply["result"].strip().endswith("who?"), reply
+    assert pool.recycled == 1 and pool.cold_starts == 1, (pool.recycled, pool.cold_starts)
+    print("dead spare recycled OK")
+
+
+def test_chatty_stderr():
+    os.environ["FAKE_CLAUDE_STDERR"] = str(1 << 20)  # far past a pipe's buffer
+    pool = ClaudePool(spares=1)
+    try:
+        pool.warm("haiku-test")
+        reply = pool.call("haiku-test", MESSAGES, timeout=20)
+    finally:
+        pool.close()
+        del os.environ["FAKE_CLAUDE_STDERR"]
+    assert reply["result"].strip().endswith("who?"), reply
+
+    os.environ["FAKE_CLAUDE_FAIL"] = "not logged in"
+    pool = ClaudePool(spares=1)
+    try:
+        pool.call("haiku-test", MESSAGES, timeout=20)
+        raise AssertionError("a worker that died must raise")
+    except RuntimeError as error:
+        assert "not logged in" in str(error), error
+    finally:
+        pool.close()
+        del os.environ["FAKE_CLAUDE_FAIL"]
+    print("chatty stderr OK (a spare's stderr never blocks it; a failure still reports it)")
+
+
+def test_warm_spawns_unlocked():
+    pool = ClaudePool(spares=2)
+    pool.warm("haiku-test")
+    started = threading.Event()
+    real_worker = claude_pool.ClaudeWorker
+
+    def slow_worker(alias):
+        started.set()
+        time.sleep(1.0)  # a CLI that is slow to start
+        return real_worker(alias)
+
+    claude_pool.ClaudeWorker = slow_worker
+    try:
+        taken = pool._take("haiku-test")
+        topping_up = threading.Thread(target=pool.warm, args=("haiku-test",))
+        topping_up.start()
+        assert started.wait(5)
+        begun = time.time()
+        second = pool._take("haiku-test")
+        waited = time.time() - begun
+        topping_up.join()
+        # the spare spawned meanwhile still lands in the idle list
+        assert len(pool._idle["haiku-test"]) == 1, pool._idle
+    finally:
+        claude_pool.ClaudeWorker = real_worker
+        taken.kill()
+        second.kill()
+        pool.close()
+    assert waited < 0.5, f"take() waited {waited:.2f}s on a spawn"
+    assert pool.cold_starts == 0, pool.cold_starts
+    print("warm spawns outside the lock OK")
+
+
+def test_call_claude_pooled():
+    game_master.CLAUDE_CALL_OVERHEAD.clear()
+    pool = game_master.use_claude_pool(1)
+    try:
+        reply = game_master.call_claude("haiku-test", MESSAGES)
+        summary = game_master.claude_overhead_summary()
+    finally:
+        pool.close()
+        game_master.CLAUDE_POOL = None
+    assert reply.endswith("who?"), reply
+    assert game_master.RESOLVED_CLAUDE_MODELS.pop("haiku-test") == "claude-haiku-9"
+    assert summary["calls"] == 1 and summary["pooled"] == 1, summary
+    assert summary["cold_starts"] == 1 and summary["recycled"] == 0, summary
+    print("call_claude through the pool OK")
+
+
+if __name__ == "__main__":
+    with_fake_claude(test_single_use_workers)
+    with_fake_claude(test_dead_spare_recycled)
+    with_fake_claude(test_chatty_stderr)
+    with_fake_claude(test_warm_spawns_unlocked)
+    with_fake_claude(test_call_claude_pooled)
+    print("ok")
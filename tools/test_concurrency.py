@@ -0,0 +1,105 @@
+"""Checks for the --max-workers auto controller (mafia/concurrency.py): it grows
+while the backend keeps up, halves on push-back, backs off a backend that
+slows down under load, and never moves when pinned.
+
+No network: the "backend" is a sleep whose length can depend on how many
+calls are in flight.
+
+    python tools/test_concurrency.py
+"""
+import asyncio
+import pathlib
+import sys
+import threading
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from mafia.concurrency import ConcurrencyLimit  # noqa: E402
+
+
+def hammer(limit, calls, seconds_for, callers=12):
+    """`calls` requests from `callers` threads; seconds_for(in_flight) is the
+    backend's latency at that load."""
+    state = {"in_flight": 0, "left": calls}
+    lock = threading.Lock()
+
+    def caller():
+        while True:
+            with lock:
+                if state["left"] == 0:
+                    return
+                state["left"] -= 1
+            with limit.slot(48):
+                with lock:
+                    state["in_flight"] += 1
+                    load = state["in_flight"]
+                time.sleep(seconds_for(load))
+                with lock:
+                    state["in_flight"] -= 1
+
+    threads = [threading.Thread(target=caller) for _ in range(callers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def test_grows_while_clean():
+    limit = ConcurrencyLimit()
+    hammer(limit, 120, lambda load: 0.01)
+    assert limit.limit >= 6, limit.stats()
+    assert all(d["reason"].startswith("clean") for d in limit.decisions), limit.decisions
+    assert limit.peak <= limit.limit
+    print(f"grows OK (2 → {limit.limit})")
+
+
+def test_backs_off_saturated_backend():
+    """A box that does 3 at a time: beyond that every call slows in step."""
+    limit = ConcurrencyLimit()
+    hammer(limit, 300, lambda load: 0.01 * max(1, load / 3))
+    reasons = [d["reason"] for d in limit.decisions]
+    assert any(r.startswith("latency") for r in reasons), reasons
+    assert limit.limit <= 8, limit.stats()
+    print(f"saturation OK (ended at {limit.limit}, {len(reasons)} changes)")
+
+
+def test_halves_once_per_pushback():
+    limit = ConcurrencyLimit(initial=8)
+
+    async def burst():
+        async def call():
+            async with limit.slot_async(48):
+                await asyncio.sleep(0.01)
+                raise RuntimeError("Error code: 429 - rate limited")
+
+        results = await asyncio.gather(*(call() for _ in range(8)), return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    asyncio.run(burst())
+    # eight 429s from one cohort are one signal, not eight
+    assert limit.limit == 4, limit.stats()
+    assert len(limit.decisions) == 1 and "429" in limit.decisions[0]["reason"]
+    print("one halving per push-back OK")
+
+
+def test_fixed_never_moves():
+    limit = ConcurrencyLimit.fixed(3)
+    hammer(limit, 60, lambda load: 0.005)
+    try:
+        with limit.slot():
+            raise RuntimeError("Error code: 503")
+    except RuntimeError:
+        pass
+    stats = limit.stats()
+    assert stats["mode"] == "fixed" and stats["limit"] == 3 and not stats["decisions"], stats
+    assert stats["peak_in_flight"] == 3, stats
+    print("fixed OK")
+
+
+if __name__ == "__main__":
+    test_grows_while_clean()
+    test_backs_off_saturated_backend()
+    test_halves_once_per_pushback()
+    test_fixed_never_moves()
+    print("ok")
@@ -8,12 +8,14 @@ asserts the public transcript is shared by all and private knowledge is not.
     python tools/test_context.py
 """
 import pathlib
+import re
 import sys
 
 ROOT = pathlib.Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT))
 
 from mafia.game import MafiaGame  # noqa: E402
+from mafia.game_state import DaySummaryCache, build_day_summary  # noqa: E402
 
 
 def main():
@@ -58,5 +60,69 @@ def main():
     print(f"OK: context split holds ({len(lines)} transcript lines, capped at {game.TRANSCRIPT_MAX_LINES})")
 
 
+def marked(transcript, name):
+    """The per-player re.sub the shared context replaced."""
+    return re.sub(rf"(?m)^{re.escape(name)}\b", f"{name} (YOU)", transcript)
+
+
+def shared_context():
+    game = MafiaGame(reveal_secrets=False, player_count=8)
+    game.day = 1
+    names = ["PIP", "PIPER", "DR. VANCE", "SAGE"]
+    for player, name in zip(game.players, names):
+        player.name = name
+    game.emit("statement", day=1, actor="PIP", text="short and sweet.")
+    game.emit("statement", day=1, actor="PIPER", text="PIP is too quiet.\nPIP\nSAGE_X said so.")
+    game.emit("question", day=1, actor="DR. VANCE", target="PIP", text="Why?\nDR. VANCEY is not me.")
+    game.emit("accusation", day=1, actor="SAGE", target="DR. VANCE", text="DR. VANCE.")
+    game.day_summaries[0] = "Nothing happened."
+
+    before = game.context_misses
+    contexts = [game.build_context_for_player(p, base_context="FACTS") for p in game.players]
+    assert game.context_misses == before + 1 and game.context_hits >= len(game.players) - 1
+    transcript = game.render_public_transcript(1)
+    for player, context in zip(game.players, contexts):
+        assert marked(transcript, player.name) in context, player.name
+        assert "Day 0: Nothing happened." in context
+    assert game.shared_context().transcript_for("NOBODY") == transcript
+
+    # A new event or a new recap renders it again
+    game.emit("vote", day=1, actor="PIP", target="SAGE")
+    game.build_context_for_player(game.players[0], base_context="FACTS")
+    game.day_summaries[1] = "Day one."
+    game.summary_version += 1
+    game.day = 2
+    game.build_context_for_player(game.players[0], base_context="FACTS")
+    assert game.context_misses == before + 3
+    assert game.compute_stats()["context_cache"]["misses"] == game.context_misses
+    # Each game renders under its own lock, not one shared by the process
+    assert MafiaGame(player_count=4)._context_lock is not game._context_lock
+    print(f"OK: shared context rendered once per phase ({game.context_hits} reuses)")
+
+
+def summary_cache():
+    cache = DaySummaryCache()
+    alive = ["PIP", "SAGE", "RICO"]
+    votes, kills = [], []
+    first = cache.get(1, alive, votes, kills)
+    assert cache.get(1, alive, votes, kills) is first
+    assert cache.get(1, alive, votes, kills, max_events=2) == first
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    # An append is seen at once, and the old entries go
+    kills.append({"night": 1, "victim": "DR. VANCE", "role": "Detective", "saved": False,
+                  "will": "investigated RICO — MAFIA"})
+    after_kill = cache.get(2, alive, votes, kills)
+    assert after_kill == build_day_summary(2, alive, votes, kills) and "DR. VANCE" in after_kill
+    votes.append({"day": 2, "eliminated": "RICO", "role": "Mafia", "votes": {"PIP": "RICO", "SAGE": "RICO"}})
+    alive = ["PIP", "SAGE"]
+    assert cache.get(2, alive, votes, kills) == build_day_summary(2, alive, votes, kills)
+    assert len(cache._entries) == 1
+    assert cache.stats() == {"hits": 1, "misses": 4}
+    print("OK: day summary cache follows history appends")
+
+
 if __name__ == "__main__":
     main()
+    shared_context()
+    summary_cache()
@@ -0,0 +1,262 @@
+"""Checks for several --lm-studio-url servers (mafia/endpoints.py): the faster
+box gets more of the work, a dead box is skipped and ejected, a rate-limited
+one is only backed off, an ejected one comes back through a single probe, the
+async client routes the same way, and a stream holds its endpoint until it is
+read.
+
+The "servers" are tiny local HTTP handlers speaking just enough of the
+OpenAI API, so the real openai client is on the wire.
+
+    python tools/test_endpoints.py
+"""
+import asyncio
+import json
+import pathlib
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+import mafia.endpoints as endpoints  # noqa: E402
+from mafia.endpoints import EJECT_AFTER, EndpointPool  # noqa: E402
+
+REPLY = {
+    "id": "x", "object": "chat.completion", "created": 0, "model": "m",
+    "choices": [{"index": 0, "finish_reason": "stop",
+                 "message": {"role": "assistant", "content": "{\"response\": \"RICO\"}"}}],
+}
+
+
+def chunk(content):
+    return {"id": "x", "object": "chat.completion.chunk", "created": 0, "model": "m",
+            "choices": [{"index": 0, "finish_reason": None, "delta": {"content": content}}]}
+
+
+def serve(delay, status=None):
+    """A server answering after `delay`; while status[0] isn't 200 it answers
+    every request with that error code instead. server.hits counts POSTs."""
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, payload, code=200):
+            body = json.dumps(payload).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            if code == 429:
+                self.send_header("Retry-After", "0.05")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _failing(self):
+            if status and status[0] != 200:
+                self._send({"error": {"message": "no", "type": "error"}}, status[0])
+                return True
+            return False
+
+        def do_GET(self):
+            if not self._failing():
+                self._send({"object": "list", "data": []})
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            server.hits += 1
+            time.sleep(delay)
+            if self._failing():
+                return
+            if not request.get("stream"):
+                self._send(REPLY)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            try:
+                for piece in ("RI", "CO"):
+                    self.wfile.write(f"data: {json.dumps(chunk(piece))}\n\n".encode())
+                    self.wfile.flush()
+                    time.sleep(delay)
+                self.wfile.write(b"data: [DONE]\n\n")
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # the client closed the stream early
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.hits = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/v1"
+
+
+def dead_url():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{s.getsockname()[1]}/v1"
+
+
+def ask(client):
+    return client.chat.completions.create(model="m", messages=[{"role": "user", "content": "x"}])
+
+
+def test_least_outstanding():
+    fast, fast_url = serve(0.01)
+    slow, slow_url = serve(0.2)
+    try:
+        pool = EndpointPool([slow_url, fast_url])
+        client = pool.client()
+        with ThreadPoolExecutor(4) as workers:
+            list(workers.map(lambda _: ask(client), range(24)))
+    finally:
+        fast.shutdown()
+        slow.shutdown()
+    stats = pool.stats()
+    assert stats[fast_url]["calls"] > 2 * stats[slow_url]["calls"], stats
+    assert stats[slow_url]["mean_latency_s"] > stats[fast_url]["mean_latency_s"]
+    print(f"least outstanding OK (fast {stats[fast_url]['calls']}, slow {stats[slow_url]['calls']})")
+
+
+def test_dead_endpoint_ejected():
+    live, live_url = serve(0)
+    gone = dead_url()
+    try:
+        pool = EndpointPool([gone, live_url])
+        client = pool.client()
+        for _ in range(EJECT_AFTER + 3):
+            assert ask(client).choices[0].message.content
+        health = pool.health_check(timeout=1)
+    finally:
+        live.shutdown()
+    stats = pool.stats()
+    assert stats[gone]["errors"] == EJECT_AFTER and stats[gone]["ejections"] >= 1, stats
+    assert health[live_url] is None and health[gone], health
+    print("dead endpoint ejected OK")
+
+
+def test_rate_limited_backed_off():
+    status = [429]
+    limited, limited_url = serve(0, status)
+    steady, steady_url = serve(0)
+    try:
+        pool = EndpointPool([limited_url, steady_url])
+        client = pool.client()
+        for _ in range(EJECT_AFTER + 2):
+            try:
+                ask(client)
+            except Exception as error:
+                assert getattr(error, "status_code", None) == 429, error
+            assert ask(client).choices[0].message.content  # backed off: the other box
+            time.sleep(0.06)  # past the Retry-After
+    finally:
+        limited.shutdown()
+        steady.shutdown()
+    stats = pool.stats()[limited_url]
+    assert stats["errors"] == stats["backoffs"] == EJECT_AFTER + 2, stats
+    assert stats["ejections"] == 0, stats
+    print("rate-limited endpoint backed off, not ejected OK")
+
+
+def test_single_probe():
+    saved = endpoints.EJECT_FOR
+    endpoints.EJECT_FOR = 0.1
+    status = [500]
+    flaky, flaky_url = serve(0.2, status)
+    steady, steady_url = serve(0.2)
+    try:
+        pool = EndpointPool([flaky_url, steady_url])
+        client = pool.client()
+        assert pool.health_check(timeout=1)[flaky_url]
+        time.sleep(0.15)
+        # A failed probe ejects again at once, not after EJECT_AFTER more
+        for _ in range(2):
+            try:
+                ask(client)
+            except Exception:
+                pass
+        assert pool.stats()[flaky_url]["ejections"] == 2, pool.stats()
+        status[0] = 200
+        time.sleep(0.15)
+        with ThreadPoolExecutor(4) as workers:
+            list(workers.map(lambda _: ask(client), range(4)))
+        probed = flaky.hits
+        with ThreadPoolExecutor(4) as workers:
+            list(workers.map(lambda _: ask(client), range(4)))
+    finally:
+        endpoints.EJECT_FOR = saved
+        flaky.shutdown()
+        steady.shutdown()
+    assert probed == 2, probed  # the failed probe, then one at a time on probation
+    assert flaky.hits == probed + 2, flaky.hits  # back in rotation after it passed
+    print("single probe OK (one request while on probation, then an even share)")
+
+
+def test_async_client():
+    a, a_url = serve(0.05)
+    b, b_url = serve(0.05)
+    try:
+        pool = EndpointPool([a_url, b_url])
+        client = pool.async_client()
+
+        async def burst():
+            try:
+                await asyncio.gather(*(client.chat.completions.create(model="m", messages=[]) for _ in range(6)))
+            finally:
+                await client.close()
+
+        asyncio.run(burst())
+    finally:
+        a.shutdown()
+        b.shutdown()
+    stats = pool.stats()
+    assert stats[a_url]["calls"] == stats[b_url]["calls"] == 3, stats
+    print("async routing OK")
+
+
+def test_stream_held():
+    server, url = serve(0.1)
+    try:
+        pool = EndpointPool([url])
+        endpoint = pool.endpoints[0]
+        stream = pool.client().chat.completions.create(model="m", messages=[], stream=True)
+        chunks = iter(stream)
+        assert next(chunks).choices[0].delta.content == "RI"
+        assert endpoint.outstanding == 1, "an unread stream still holds its endpoint"
+        assert "".join(c.choices[0].delta.content or "" for c in chunks) == "CO"
+        assert endpoint.outstanding == 0
+        stream.close()
+        latency = pool.stats()[url]["mean_latency_s"]
+        assert latency >= 0.25, latency  # the whole stream, not just the headers
+
+        stream = pool.client().chat.completions.create(model="m", messages=[], stream=True)
+        assert endpoint.outstanding == 1
+        stream.close()
+        assert endpoint.outstanding == 0
+
+        async def read_async():
+            client = pool.async_client()
+            try:
+                stream = await client.chat.completions.create(model="m", messages=[], stream=True)
+                async for _ in stream:
+                    assert endpoint.outstanding == 1
+                    break
+                await stream.close()
+            finally:
+                await client.close()
+
+        asyncio.run(read_async())
+    finally:
+        server.shutdown()
+    assert endpoint.outstanding == 0
+    assert pool.stats()[url]["calls"] == 3 and pool.stats()[url]["errors"] == 0, pool.stats()
+    print(f"stream held OK (busy until read or closed, latency {latency:.2f}s)")
+
+
+if __name__ == "__main__":
+    test_least_outstanding()
+    test_dead_endpoint_ejected()
+    test_rate_limited_backed_off()
+    test_single_probe()
+    test_async_client()
+    test_stream_held()
+    print("ok")
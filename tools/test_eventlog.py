@@ -0,0 +1,81 @@
+"""Checks for EventLog's indexes and views: on every published case log, the
+transcript, ballots, alive set and episode inputs read from the indexes match
+what the old full-list scans produced, byte for byte.
+
+    python tools/test_eventlog.py
+"""
+import json
+import pathlib
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from mafia.events import EventLog  # noqa: E402
+from mafia.game import MafiaGame  # noqa: E402
+from mafia.game_master import episode_inputs_from_events  # noqa: E402
+
+LOGS = sorted((pathlib.Path(__file__).resolve().parent.parent / "viewer/public/logs").glob("case-*.json"))
+
+
+def scanned_transcript(events, day):
+    """render_public_transcript as it was: a walk over the whole log."""
+    lines = []
+    for e in events:
+        if e.get("day") != day:
+            continue
+        t = e["type"]
+        if t == "statement":
+            lines.append(f"{e['actor']}: {e['text']}")
+        elif t == "question":
+            lines.append(f"{e['actor']} → {e['target']}: {e['text']}")
+        elif t == "answer":
+            lines.append(f"{e['actor']} (to {e['target']}): {e['text']}")
+        elif t == "accusation":
+            lines.append(f"{e['actor']} accuses: {e['text']}")
+        elif t == "vote":
+            lines.append(f"{e['actor']} votes {e['target']}")
+    return "\n".join(lines[-MafiaGame.TRANSCRIPT_MAX_LINES:])
+
+
+def scanned_timeline(events):
+    days, timeline = 1, []
+    for e in events:
+        days = max(days, e.get("day") or 1)
+        if e["type"] == "elimination":
+            timeline.append(f"Day {e['day']}: the town voted out {e['target']} — they were {e.get('role', '?')}.")
+        elif e["type"] == "night_kill" and not e.get("saved"):
+            timeline.append(f"Night {e['day']}: the mafia killed {e['target']} — they were {e.get('role', '?')}.")
+        elif e["type"] == "save" or (e["type"] == "night_kill" and e.get("saved")):
+            timeline.append(f"Night {e['day']}: the mafia struck, but the Doctor saved {e['target']}.")
+        elif e["type"] == "night_no_kill":
+            timeline.append(f"Night {e['day']}: nobody died.")
+    return days, timeline
+
+
+def test_case_logs():
+    assert LOGS, "no case logs to check against"
+    checked = 0
+    for path in LOGS:
+        events = json.loads(path.read_text())["events"]
+        log = EventLog.from_list(events)
+        game = SimpleNamespace(events=log, TRANSCRIPT_MAX_LINES=MafiaGame.TRANSCRIPT_MAX_LINES)
+        for day in range(0, log.last_day + 2):
+            assert MafiaGame.render_public_transcript(game, day) == scanned_transcript(events, day), (path.name, day)
+            ballots = {e["actor"]: e["target"] for e in events if e["type"] == "vote" and e.get("day") == day}
+            assert log.ballots(day) == ballots, (path.name, day)
+        over = log.first("game_over")
+        if over:
+            assert log.alive == set(over["survivors"]), (path.name, log.alive, over["survivors"])
+        inputs = episode_inputs_from_events(events)
+        if inputs:
+            days, timeline = scanned_timeline(events)
+            assert inputs["days"] == days and inputs["timeline"][:-1] == timeline, path.name
+            assert episode_inputs_from_events(log) == inputs
+        checked += 1
+    print(f"case logs OK ({checked} logs)")
+
+
+if __name__ == "__main__":
+    test_case_logs()
+    print("ok")
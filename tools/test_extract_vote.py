@@ -8,12 +8,15 @@ they parse with prefer_first=True; votes keep the default (last mention).
 
     python tools/test_extract_vote.py
 """
+import json
 import pathlib
+import re
 import sys
 
-sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
 
-from mafia.game import MafiaGame  # noqa: E402
+from mafia.game import AliasMatcher, MafiaGame, alias_matcher  # noqa: E402
 
 TARGETS = [
     "RICO", "ARIA", "SAGE", "HOLMES", "MARSHAL",
@@ -123,5 +126,41 @@ def main():
     print(f"test_extract_vote OK ({len(ACCUSATIONS)} accusations, {len(VOTES)} votes)")
 
 
+def scanned_hits(matcher, text_lower):
+    """The per-alias search the matcher replaced."""
+    hits = []
+    for key, name in matcher.name_map.items():
+        for hit in re.finditer(rf"\b{re.escape(key)}\b", text_lower):
+            hits.append((hit.start(), name))
+    return sorted(hits, key=lambda x: x[0])
+
+
+def matcher_parity():
+    """One pass over every case log's speech gives the same hits, in the same
+    order, as a search per alias; the matcher is built once per target list."""
+    assert alias_matcher(tuple(TARGETS)) is alias_matcher(tuple(TARGETS))
+    target_sets = [
+        TARGETS,
+        # "DR" is a prefix of another seat's full name; RED and RED FOX share "red"
+        ["DR", "DR. VANCE", "RED FOX", "FOX HUNTER", "RED", "O'NEIL", "JR."],
+        [],
+    ]
+    texts = [text for text, _ in ACCUSATIONS + VOTES]
+    texts += ["dr. vance and dr went out", "red fox hunter", "o'neil, jr. and jr.x", "fox-hunter"]
+    for path in sorted((ROOT / "viewer/public/logs").glob("case-*.json")):
+        texts += [e["text"] for e in json.loads(path.read_text())["events"] if e.get("text")]
+    checked = 0
+    for targets in target_sets:
+        matcher = AliasMatcher(tuple(targets))
+        for text in texts:
+            lowered = text.lower()
+            want = scanned_hits(matcher, lowered)
+            assert matcher.hits(lowered) == want, (targets, text[:80])
+            assert matcher.first(lowered) == (want[0][1] if want else None)
+            checked += 1
+    print(f"alias matcher parity OK ({checked} texts)")
+
+
 if __name__ == "__main__":
     main()
+    matcher_parity()
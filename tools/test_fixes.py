@@ -2,7 +2,9 @@
 
 Run: python tools/test_fixes.py
 """
+import random
 import sys
+import threading
 from pathlib import Path
 from types import SimpleNamespace
 
@@ -56,6 +58,7 @@ g.day = 1
 g.day_summaries = {}
 g.private_notes = {}
 g.events = EventLog()
+g._context_lock = threading.Lock()
 g.events.emit("statement", day=1, actor="RICO", text="SAGE is too quiet.")
 g.events.emit("question", day=1, actor="CHEN", target="RICO", text="Why so fast, RICO?")
 ctx = g.build_context_for_player(player, "facts")
@@ -95,6 +98,7 @@ assert "The Record Lied First" in titles, titles
 g.mafia_count = 5
 g.players = [SimpleNamespace(role=None, name=f"P{n}") for n in range(6)]
 g.log = lambda *a, **k: None
+g.rng = random.Random(0)
 g.assign_roles()
 assert sum(1 for p in g.players if p.role == Role.MAFIA) == 2  # (6-1)//2
 g.mafia_count = 0
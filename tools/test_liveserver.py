@@ -0,0 +1,109 @@
+"""Checks for the live event server (mafia/liveserver.py): spectators get
+every event over SSE as the game emits it, a reconnect with Last-Event-ID or
+?since= picks up where it left off, amends and the end of the game reach open
+streams, and private events stay out unless the game reveals secrets.
+
+    python tools/test_liveserver.py
+"""
+import json
+import pathlib
+import random
+import sys
+import threading
+import time
+import urllib.request
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from make_sample_log import scripted_game  # noqa: E402
+from mafia.liveserver import EventServer  # noqa: E402
+
+PRIVATE = {"mafia_chat", "protection", "investigation"}
+
+
+def read_stream(url, headers=None):
+    """(kind, id, data) for every SSE message until the server ends the stream."""
+    request = urllib.request.Request(url, headers=headers or {})
+    messages, fields = [], {}
+    with urllib.request.urlopen(request, timeout=30) as response:
+        assert response.headers["Content-Type"].startswith("text/event-stream")
+        for raw in response:
+            line = raw.decode("utf-8").rstrip("\n")
+            if line.startswith(":"):
+                continue
+            if line:
+                key, _, value = line.partition(": ")
+                fields[key] = value
+                continue
+            if fields:
+                kind = fields.get("event", "message")
+                messages.append((kind, fields.get("id"), json.loads(fields["data"])))
+                fields = {}
+                if kind == "end":
+                    break
+    return messages
+
+
+def test_stream_resume_amend():
+    server = EventServer().start()
+    events = [{"type": "phase", "day": day, "phase": "day"} for day in range(1, 6)]
+    server.event({"type": "game_start", "players": [], "player_count": 0})
+    seen = []
+    reader = threading.Thread(target=lambda: seen.extend(read_stream(f"{server.url}/events")))
+    reader.start()
+    for event in events:
+        time.sleep(0.02)
+        server.event(event)
+    server.amend(0, {"type": "game_start", "players": [], "player_count": 7})
+    time.sleep(0.1)
+    snapshot = json.loads(urllib.request.urlopen(f"{server.url}/log").read())
+    server.end()
+    reader.join()
+
+    plain = [(i, data) for kind, i, data in seen if kind == "message"]
+    assert [int(i) for i, _ in plain] == list(range(6)) and [d for _, d in plain][1:] == events
+    assert ("amend", None, {"seq": 0, "event": {"type": "game_start", "players": [], "player_count": 7}}) in seen
+    assert seen[-1][0] == "end"
+    assert snapshot["live"] and snapshot["events"][0]["player_count"] == 7
+
+    # A reconnecting browser names the last id it saw; a fresh one may ask ?since=
+    again = read_stream(f"{server.url}/events", {"Last-Event-ID": "3"})
+    assert [int(i) for kind, i, _ in again if kind == "message"] == [4, 5]
+    again = read_stream(f"{server.url}/events?since=2")
+    assert [int(i) for kind, i, _ in again if kind == "message"] == [2, 3, 4, 5]
+    server.close()
+    print(f"stream OK ({server.stats()['messages']} messages, resume by id and ?since=)")
+
+
+def watch(reveal_secrets):
+    random.seed(8)
+    server = EventServer().start()
+    game = scripted_game(gm_delay=0, player_count=7, max_workers=4, reveal_secrets=reveal_secrets, server=server)
+    spectators = [[], []]
+    readers = [threading.Thread(target=lambda s=s: s.extend(read_stream(f"{server.url}/events")))
+               for s in spectators]
+    for reader in readers:
+        reader.start()
+    while server.stats()["peak_spectators"] < 2:
+        time.sleep(0.01)
+    game.run()
+    for reader in readers:
+        reader.join()
+    server.close()
+    for seen in spectators:
+        assert [data for kind, _, data in seen if kind == "message"] == game.events.to_list()
+    assert game.compute_stats()["spectators"]["peak_spectators"] == 2
+    assert server.url not in json.dumps(game.compute_stats())
+    return {data["type"] for kind, _, data in spectators[0] if kind == "message"}
+
+
+def test_game_private_filtering():
+    assert not watch(reveal_secrets=False) & PRIVATE
+    assert watch(reveal_secrets=True) & PRIVATE
+    print("game OK (two spectators, private events only with reveal_secrets)")
+
+
+if __name__ == "__main__":
+    test_stream_resume_amend()
+    test_game_private_filtering()
+    print("ok")
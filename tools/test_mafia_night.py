@@ -0,0 +1,86 @@
+"""Checks for the mafia's night: round 1 and the final vote go out to every
+member at once, the confirmation round only with --parallel-mafia-confirm,
+the chat is still written up in seat order, and a unanimous round 1 still
+ends the night early.
+
+    python tools/test_mafia_night.py
+"""
+import asyncio
+import json
+import pathlib
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from mafia.game import MafiaGame  # noqa: E402
+from mafia.scheduler import GameScheduler  # noqa: E402
+from make_sample_log import fake_client  # noqa: E402
+
+STEPS = {"Suggest ONE": "suggest", "confirm or change": "confirm", "Final mafia vote": "final"}
+
+
+def night(unanimous=False, parallel_mafia_confirm=False):
+    random.seed(4)
+    game = MafiaGame(player_count=9, mafia_count=3, gm_enabled=False, max_workers=6,
+                     reveal_secrets=True, parallel_mafia_confirm=parallel_mafia_confirm)
+    game.assign_roles()
+    game.day = 1
+    mafia = game.get_mafia()
+    targets = [p.name for p in game.get_alive_players() if p not in mafia]
+    lock = threading.Lock()
+    flight, peak, calls = Counter(), Counter(), Counter()
+
+    def reply(kwargs):
+        step = next(v for k, v in STEPS.items() if k in kwargs["messages"][-1]["content"])
+        with lock:
+            calls[step] += 1
+            flight[step] += 1
+            peak[step] = max(peak[step], flight[step])
+            n = calls[step]
+        time.sleep(0.05)
+        with lock:
+            flight[step] -= 1
+        if step == "suggest":
+            pick = targets[0] if unanimous else targets[n % 2]
+            text = f"{pick}, they have been far too quiet."
+        else:
+            text = targets[1]
+        return json.dumps({"response": text})
+
+    game._lm_client = fake_client(reply)
+    game.scheduler = GameScheduler(6)
+    try:
+        choice = asyncio.run(game.mafia_conversation_and_choose_target(
+            mafia, [p.name for p in game.get_alive_players()], "context"))
+    finally:
+        game.scheduler.shutdown()
+    chat = [e["actor"] for e in game.events.to_list() if e["type"] == "mafia_chat"]
+    return choice, targets, [m.name for m in mafia], chat, peak, calls
+
+
+def test_blind_steps_fan_out():
+    choice, targets, mafia, chat, peak, calls = night()
+    assert choice == targets[1]
+    assert chat == mafia + mafia, chat  # round 1, then round 2, each in seat order
+    assert peak["suggest"] == peak["final"] == len(mafia), peak
+    assert peak["confirm"] == 1, peak
+    _, _, _, chat, peak, _ = night(parallel_mafia_confirm=True)
+    assert chat == mafia + mafia and peak["confirm"] == len(mafia), peak
+    print(f"blind steps fan out OK ({dict(peak)} in flight)")
+
+
+def test_unanimous_short_circuit():
+    choice, targets, mafia, chat, _, calls = night(unanimous=True)
+    assert choice == targets[0]
+    assert chat == mafia and dict(calls) == {"suggest": len(mafia)}, calls
+    print("unanimous round 1 ends the night OK")
+
+
+if __name__ == "__main__":
+    test_blind_steps_fan_out()
+    test_unanimous_short_circuit()
+    print("ok")
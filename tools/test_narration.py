@@ -0,0 +1,47 @@
+"""Checks for background GM narration (mafia/narration.py): the players don't
+wait on a slow narrator, the log still reads in game order, and a day's recap
+reaches the next day's prompts.
+
+    python tools/test_narration.py
+"""
+import pathlib
+import random
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from make_sample_log import scripted_game  # noqa: E402
+
+GM_DELAY = 0.3
+
+
+def play():
+    random.seed(9)
+    prompts = []
+    game = scripted_game(gm_delay=GM_DELAY, sent=prompts, player_count=7, max_workers=6)
+    game.run()
+    return game, prompts
+
+
+def test_background_narration():
+    game, prompts = play()
+    log = game.game_log
+    # Each day's opening narration sits right after the day header, before
+    # anyone speaks, even though the players started without it
+    for day in range(1, game.day + 1):
+        header = next(i for i, line in enumerate(log) if f"DAY {day} - TOWN MEETING" in line)
+        assert log[header + 1].startswith("Alive players"), log[header:header + 3]
+        assert "NARRATION Narrate the opening of Day" in log[header + 2], log[header:header + 3]
+    # Yesterday's recap is in today's prompts
+    assert game.day >= 2, "game too short to carry a recap"
+    assert game.day_summaries[1].startswith("RECAP Summarize Day 1")
+    assert any("Day 1: RECAP Summarize Day 1" in p for p in prompts)
+    stats = game.compute_stats()["narration"]
+    assert stats["calls"] >= 3 * game.day - 1, stats
+    assert stats["waited_s"] < stats["gm_s"] / 2, stats
+    print(f"narration OK ({stats['gm_s']}s of GM time, {stats['waited_s']}s waited on)")
+
+
+if __name__ == "__main__":
+    test_background_narration()
+    print("ok")
@@ -0,0 +1,98 @@
+"""Checks for --questioning pipelined: exchanges between different seats run
+side by side, question/answer events still come out in exchange order, and a
+seat's next exchange always sees its previous one. Sequential answerers see
+their question in the transcript; pipelined ones only in the prompt.
+
+    python tools/test_questioning.py
+"""
+import asyncio
+import json
+import pathlib
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from mafia.game import MafiaGame  # noqa: E402
+from mafia.scheduler import GameScheduler  # noqa: E402
+from make_sample_log import fake_client  # noqa: E402
+
+DELAY = 0.05
+
+
+def slow_client(sent):
+    lock = threading.Lock()
+    flight = {"now": 0, "max": 0}
+
+    def reply(kwargs):
+        with lock:
+            flight["now"] += 1
+            flight["max"] = max(flight["max"], flight["now"])
+            sent.append("\n".join(m["content"] for m in kwargs["messages"]))
+            n = len(sent)
+        time.sleep(DELAY)
+        with lock:
+            flight["now"] -= 1
+        return json.dumps({"response": f"Reply number {n}, and I stand by it completely."})
+
+    return fake_client(reply), flight
+
+
+def play_round(questioning, window=4):
+    random.seed(11)
+    game = MafiaGame(player_count=8, gm_enabled=False, max_workers=8,
+                     questioning=questioning, question_window=window)
+    game.assign_roles()
+    game.day = 1
+    game.scheduler = GameScheduler(8)
+    sent = []
+    game._lm_client, flight = slow_client(sent)
+    p = game.players
+    # p[0] asks twice and p[1] is in two exchanges: those have to wait their turn
+    pairs = [(0, 1), (2, 3), (0, 4), (5, 6), (1, 7), (3, 5)]
+    exchanges = [(p[a], p[b], f"Ask {p[b].name} something.") for a, b in pairs]
+    names = [x.name for x in p]
+    started = time.monotonic()
+    try:
+        asyncio.run(game.questioning_round(exchanges, names))
+    finally:
+        game.scheduler.shutdown()
+    return game, exchanges, sent, flight["max"], time.monotonic() - started
+
+
+def test_events_in_exchange_order():
+    for questioning in ("sequential", "pipelined"):
+        game, exchanges, sent, _, _ = play_round(questioning)
+        events = [e for e in game.events.to_list() if e["type"] in ("question", "answer")]
+        want = []
+        for asker, target, _ in exchanges:
+            want += [("question", asker.name, target.name), ("answer", target.name, asker.name)]
+        assert [(e["type"], e["actor"], e["target"]) for e in events] == want, (questioning, events)
+        # p[0]'s second question was asked with its first exchange on the record
+        first_q = events[0]["text"]
+        second_ask = next(m for m in sent if f"Ask {exchanges[2][1].name} something." in m)
+        assert first_q in second_ask, questioning
+        # The answer request: sequential has the question on the record already
+        asker, target = exchanges[0][0].name, exchanges[0][1].name
+        answer_ask = next(m for m in sent if f"just asked you: '{first_q}'" in m)
+        on_record = f"{asker} → {target}: {first_q}" in answer_ask
+        assert on_record == (questioning == "sequential"), (questioning, answer_ask[-600:])
+    print("events in exchange order OK")
+
+
+def test_pipelined_is_faster():
+    _, _, _, seq_flight, seq_s = play_round("sequential")
+    _, _, _, pipe_flight, pipe_s = play_round("pipelined", window=4)
+    _, _, _, one_flight, _ = play_round("pipelined", window=1)
+    assert seq_flight == one_flight == 1
+    assert 1 < pipe_flight <= 4, pipe_flight
+    assert pipe_s < seq_s * 0.75, (pipe_s, seq_s)
+    print(f"pipelined OK ({pipe_s:.2f}s vs {seq_s:.2f}s sequential, {pipe_flight} in flight)")
+
+
+if __name__ == "__main__":
+    test_events_in_exchange_order()
+    test_pipelined_is_faster()
+    print("ok")
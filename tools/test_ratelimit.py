@@ -0,0 +1,193 @@
+"""Checks for mafia/ratelimit.py: burst then steady rate, arrival-order service
+across threads and coroutines, priority classes with aging, a server-named
+back-off holding the bucket, and a cancelled call giving its token back.
+
+    python tools/test_ratelimit.py
+"""
+import asyncio
+import pathlib
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+import mafia.ratelimit as ratelimit  # noqa: E402
+from mafia.ratelimit import Limit, RateScheduler, parse_limit, retry_after  # noqa: E402
+
+
+def test_burst_then_rate():
+    limits = RateScheduler({("nvidia", None): Limit(per_minute=600, burst=2)})
+    waits = [limits.acquire("nvidia", "any-model") for _ in range(4)]
+    assert waits[0] < 0.02 and waits[1] < 0.02, waits
+    # one at a time after that, each 1/rate after the last
+    assert all(0.07 < w < 0.15 for w in waits[2:]), waits
+    assert limits.acquire("lm-studio", "m") == 0.0  # no bucket, no limit
+    stats = limits.stats()["nvidia"]
+    assert stats["calls"] == 4 and stats["burst"] == 2, stats
+    print("burst then rate OK")
+
+
+def test_model_limit_wins():
+    limits = RateScheduler({
+        ("nvidia", None): Limit(per_minute=6000, burst=5),
+        ("nvidia", "slow"): Limit(per_minute=60, burst=1),
+    })
+    limits.acquire("nvidia", "slow")
+    start = time.monotonic()
+    limits.acquire("nvidia", "fast")
+    assert time.monotonic() - start < 0.05, "fast model queued behind the slow one's bucket"
+    assert set(limits.stats()) == {"nvidia", "nvidia/slow"}
+    print("per-model limit OK")
+
+
+def test_arrival_order():
+    """Threads and coroutines share one queue and are let through in order."""
+    limits = RateScheduler({("nvidia", None): Limit(per_minute=1200, burst=1)})
+    limits.acquire("nvidia")  # drain the burst so everyone below queues
+    served = []
+
+    def thread_call(tag):
+        limits.acquire("nvidia")
+        served.append(tag)
+
+    async def coroutine_calls():
+        async def call(tag):
+            await limits.acquire_async("nvidia")
+            served.append(tag)
+
+        tasks = []
+        for tag in ("a1", "a2"):
+            tasks.append(asyncio.create_task(call(tag)))
+            await asyncio.sleep(0.005)
+        await asyncio.gather(*tasks)
+
+    threads = []
+    for tag in ("t1", "t2"):
+        threads.append(threading.Thread(target=thread_call, args=(tag,)))
+        threads[-1].start()
+        time.sleep(0.005)
+    asyncio.run(coroutine_calls())
+    for t in threads:
+        t.join()
+    assert served == ["t1", "t2", "a1", "a2"], served
+    print("arrival order OK")
+
+
+def test_cancel_after_grant():
+    """A coroutine cancelled after its token was granted, but before it ran,
+    hands the token back instead of leaving the bucket short."""
+    limits = RateScheduler({("nvidia", None): Limit(per_minute=60, burst=1)})
+
+    async def cancelled_call():
+        task = asyncio.create_task(limits.acquire_async("nvidia"))
+        await asyncio.sleep(0)  # queued and granted; the wake-up is still pending
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(cancelled_call())
+    waited = limits.acquire("nvidia")
+    assert waited < 0.05, f"the cancelled call's token was lost ({waited:.2f}s wait)"
+    assert limits.stats()["nvidia"]["calls"] == 1
+    print("cancel after grant OK")
+
+
+def queue_up(limits, calls, gap=0.005):
+    """Start one thread per (tag, priority), `gap` seconds apart, while the
+    bucket is empty; return the order they were let through."""
+    served = []
+
+    def call(tag, priority):
+        limits.acquire("nvidia", None, priority)
+        served.append(tag)
+
+    threads = []
+    for tag, priority in calls:
+        threads.append(threading.Thread(target=call, args=(tag, priority)))
+        threads[-1].start()
+        time.sleep(gap)
+    for t in threads:
+        t.join()
+    return served
+
+
+def test_priority_classes():
+    limits = RateScheduler({("nvidia", None): Limit(per_minute=1200, burst=1)})
+    limits.acquire("nvidia")  # drain the burst so everyone below queues
+    served = queue_up(limits, [
+        ("n1", "narration"), ("p1", "packaging"), ("d1", "discussion"),
+        ("v1", "decision"), ("n2", "narration"), ("v2", "decision"),
+    ])
+    assert served == ["v1", "v2", "d1", "n1", "n2", "p1"], served
+    classes = limits.stats()["nvidia"]["classes"]
+    assert list(classes) == ["decision", "discussion", "narration", "packaging"], classes
+    assert classes["narration"]["calls"] == 2
+    assert classes["decision"]["waited_s"] < classes["packaging"]["waited_s"]
+    try:
+        limits.acquire("nvidia", None, "urgent")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("unknown priority accepted")
+    print("priority classes OK")
+
+
+def test_aging():
+    """A call that has waited long enough goes ahead of fresher, better ones."""
+    saved = ratelimit.AGE_EVERY
+    ratelimit.AGE_EVERY = 0.01
+    try:
+        limits = RateScheduler({("nvidia", None): Limit(per_minute=300, burst=1)})
+        limits.acquire("nvidia")
+        # packaging is 3 classes down, but queued 5 aging steps ahead of v1
+        # and 10 ahead of v2; v0 was waiting before it and stays ahead
+        served = queue_up(limits, [("v0", "decision"), ("p1", "packaging"),
+                                   ("v1", "decision"), ("v2", "decision")], gap=0.05)
+    finally:
+        ratelimit.AGE_EVERY = saved
+    assert served == ["v0", "p1", "v1", "v2"], served
+    print("aging OK")
+
+
+def test_retry_after_holds_bucket():
+    headers = {"retry-after": "0.3"}
+    error = SimpleNamespace(response=SimpleNamespace(headers=headers))
+    assert retry_after(error) == 0.3
+    reset = {"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "1m0.5s"}
+    assert retry_after(SimpleNamespace(response=SimpleNamespace(headers=reset))) == 60.5
+    assert retry_after(RuntimeError("Error code: 429")) is None
+
+    limits = RateScheduler({("nvidia", None): Limit(per_minute=6000, burst=10)})
+    limits.throttle("nvidia", None, retry_after(error))
+    waited = limits.acquire("nvidia")
+    assert 0.25 < waited < 0.4, waited
+    assert limits.stats()["nvidia"]["throttled"] == 1
+    print("retry-after OK")
+
+
+def test_parse_limit():
+    assert parse_limit("40:3") == (None, Limit(40, 3))
+    assert parse_limit("qwen/qwen3.5-9b=20") == ("qwen/qwen3.5-9b", Limit(20, 1))
+    for bad in ("fast", "0", "10:0"):
+        try:
+            parse_limit(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"{bad!r} parsed")
+    print("parse_limit OK")
+
+
+if __name__ == "__main__":
+    test_burst_then_rate()
+    test_model_limit_wins()
+    test_arrival_order()
+    test_cancel_after_grant()
+    test_priority_classes()
+    test_aging()
+    test_retry_after_holds_bucket()
+    test_parse_limit()
+    print("ok")
@@ -0,0 +1,69 @@
+"""Checks for mafia/scheduler.py: one bounded worker pool per game that counts
+queue depth, tasks in flight, and each kind of task's wait and run time.
+
+    python tools/test_scheduler.py
+"""
+import asyncio
+import pathlib
+import random
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from mafia.scheduler import GameScheduler  # noqa: E402
+from make_sample_log import scripted_game  # noqa: E402
+
+
+def nap(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def test_bounded_pool():
+    scheduler = GameScheduler(2, max_queue=1)
+
+    async def burst():
+        async def coroutine():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        return await asyncio.gather(
+            *[scheduler.run(nap, 0.05) for _ in range(6)],
+            scheduler.track("coroutine", coroutine()),
+        )
+
+    try:
+        results = asyncio.run(burst())
+    finally:
+        scheduler.shutdown()
+    assert results == [0.05] * 6 + ["done"]
+    stats = scheduler.stats()
+    # two workers plus the tracked coroutine; at most workers + max_queue
+    # naps were ever submitted to the pool, the rest waited for room
+    assert stats["peak_in_flight"] == 3, stats
+    assert 1 <= stats["peak_queued"] <= 3, stats
+    assert stats["queued"] == stats["in_flight"] == 0
+    naps = stats["tasks"]["nap"]
+    assert naps["count"] == 6 and naps["run_s"] >= 0.3, naps
+    assert naps["max_wait_s"] >= 0.1, naps  # the last pair waited two rounds
+    assert stats["tasks"]["coroutine"]["count"] == 1
+    print(f"bounded pool OK ({naps['wait_s']}s queued, {naps['run_s']}s run)")
+
+
+def test_game_accounts_for_its_tasks():
+    random.seed(2)
+    game = scripted_game(player_count=7, max_workers=3)
+    game.run()
+    stats = game.compute_stats()["scheduler"]
+    tasks = stats["tasks"]
+    assert stats["workers"] == 3 and stats["peak_in_flight"] <= 3, stats
+    assert tasks["query_model"]["count"] > 20, tasks
+    assert "narrate_day_start" in tasks and tasks["narrate_day_start"]["count"] == game.day, tasks
+    print(f"game OK ({sum(t['count'] for t in tasks.values())} tasks over {len(tasks)} kinds)")
+
+
+if __name__ == "__main__":
+    test_bounded_pool()
+    test_game_accounts_for_its_tasks()
+    print("ok")
@@ -0,0 +1,208 @@
+"""Checks for mafia/sharedlimit.py: two games on one budget file take turns,
+token estimates are settled against real usage, a dead game's waiters
+don't block anyone, and an async wait on a locked file leaves the loop free.
+
+Both "games" live in this process: each SharedBudget opens the file on its
+own, so their flocks contend exactly as two processes' would. They're told
+apart by PID, borrowing the parent's so the liveness check passes.
+
+    python tools/test_sharedlimit.py
+"""
+import asyncio
+import fcntl
+import json
+import os
+import pathlib
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+import mafia.game_master as game_master  # noqa: E402
+from mafia.ratelimit import Limit  # noqa: E402
+from mafia.sharedlimit import SharedBudget  # noqa: E402
+
+MESSAGES = [{"role": "user", "content": "x" * 400}]  # ~100 tokens
+
+
+def test_games_take_turns():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = pathlib.Path(tmp) / "budget.json"
+        busy = SharedBudget(path, Limit(per_minute=1200))
+        quiet = SharedBudget(path, Limit(per_minute=1200))
+        quiet.pid = str(os.getppid())
+        busy.acquire(MESSAGES, 0)  # drain the burst so both games queue
+        order = []
+
+        def busy_seat():
+            busy.acquire(MESSAGES, 0)
+            order.append("busy")
+
+        def quiet_seat():
+            for _ in range(3):
+                quiet.acquire(MESSAGES, 0)
+                order.append("quiet")
+
+        seats = [threading.Thread(target=busy_seat) for _ in range(4)]
+        for seat in seats:
+            seat.start()
+        time.sleep(0.01)  # the busy game is already queued four deep
+        quiet_thread = threading.Thread(target=quiet_seat)
+        quiet_thread.start()
+        for thread in seats + [quiet_thread]:
+            thread.join()
+    assert len(order) == 7, order
+    # four waiting seats don't buy the busy game four turns in a row
+    assert order[:6].count("quiet") == 3, order
+    print("fair turns OK", order)
+
+
+def test_tokens_settle():
+    with tempfile.TemporaryDirectory() as tmp:
+        budget = SharedBudget(
+            pathlib.Path(tmp) / "budget.json", Limit(per_minute=6000, burst=10),
+            tokens_per_minute=60000,  # 1000 a second
+        )
+        cost = budget.acquire(MESSAGES, 59000)
+        assert cost == 59100, cost
+        budget.settle(cost, 100)  # the reply was short: give the rest back
+        start = time.monotonic()
+        budget.acquire(MESSAGES, 59000)
+        assert time.monotonic() - start < 0.05, "refund not credited"
+        start = time.monotonic()
+        budget.acquire(MESSAGES, 1000)  # 800 left, needs 1100: waits ~0.3s
+        waited = time.monotonic() - start
+        assert 0.2 < waited < 0.6, waited
+    print("token settle OK")
+
+
+def test_dead_game_pruned():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = pathlib.Path(tmp) / "budget.json"
+        now = time.time()
+        path.write_text(json.dumps({"games": {
+            "999999999": {"served": 0.0, "waiting": 5, "since": now - 60, "stamp": now},
+        }}))
+        budget = SharedBudget(path, Limit(per_minute=600))
+        start = time.monotonic()
+        budget.acquire(MESSAGES, 0)
+        assert time.monotonic() - start < 0.05, "blocked behind a dead game"
+        games = json.loads(path.read_text())["games"]
+        assert list(games) == [str(os.getpid())], games
+    print("dead game pruned OK")
+
+
+def test_async_wait_off_loop():
+    """Another game holding the file lock stalls acquire_async, not the loop;
+    a waiter cancelled mid-look leaves no grant spent and no waiter behind."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = pathlib.Path(tmp) / "budget.json"
+        budget = SharedBudget(path, Limit(per_minute=6, burst=5))
+        ticks = []
+
+        async def ticker(until):
+            while not until.done():
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        async def main():
+            with open(path, "a+") as held:
+                fcntl.flock(held, fcntl.LOCK_EX)  # the other game, mid read-modify-write
+                acquire = asyncio.ensure_future(budget.acquire_async(MESSAGES, 0))
+                ticking = asyncio.ensure_future(ticker(acquire))
+                await asyncio.sleep(0.2)
+                assert not acquire.done()
+                fcntl.flock(held, fcntl.LOCK_UN)
+            await asyncio.gather(acquire, ticking)
+
+            # Cancelled while its look at the locked file is still in flight
+            with open(path, "a+") as held:
+                fcntl.flock(held, fcntl.LOCK_EX)
+                waiter = asyncio.ensure_future(budget.acquire_async(MESSAGES, 0))
+                await asyncio.sleep(0.05)
+                waiter.cancel()
+                fcntl.flock(held, fcntl.LOCK_UN)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                pass
+            await asyncio.sleep(0.1)  # the cleanup runs in a worker thread
+
+        asyncio.run(main())
+        state = json.loads(path.read_text())
+    assert len(ticks) >= 15, f"the loop stalled on the file lock ({len(ticks)} ticks)"
+    assert budget.calls == 1, budget.calls
+    me = state["games"][str(os.getpid())]
+    assert me["waiting"] == 0 and me["served"] < 1.5, state
+    assert state["requests"]["level"] > 3.5, "the cancelled waiter's grant was not handed back"
+    print(f"async wait off the loop OK ({len(ticks)} ticks while the file was locked)")
+
+
+def test_call_llm_settles():
+    """call_llm draws from the shared budget and settles with reported usage."""
+    def create(**kwargs):
+        message = SimpleNamespace(content='{"response": "RICO"}', reasoning_content=None)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=message)],
+            usage=SimpleNamespace(total_tokens=42),
+        )
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    with tempfile.TemporaryDirectory() as tmp:
+        game_master.SHARED_BUDGET = SharedBudget(
+            pathlib.Path(tmp) / "budget.json", Limit(per_minute=600), tokens_per_minute=10000,
+        )
+        try:
+            reply = game_master.call_llm(client, "m", MESSAGES, use_nvidia=False, schema_key="response")
+            stats = game_master.shared_budget_stats()
+        finally:
+            game_master.SHARED_BUDGET = None
+    assert reply == "RICO", reply
+    assert stats["calls"] == 1 and stats["settled_tokens"] == 42, stats
+    print("call_llm settles OK")
+
+
+def test_claude_settles():
+    """The CLI path settles too: a failed call gives its estimate back, a
+    finished one is charged what was sent plus what came back."""
+    replies = iter([RuntimeError("usage limit reached"), "RICO, no question."])
+
+    def fake_claude(model, messages, early_stop=None):
+        reply = next(replies)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    call_claude = game_master.call_claude
+    game_master.call_claude = fake_claude
+    with tempfile.TemporaryDirectory() as tmp:
+        game_master.SHARED_BUDGET = SharedBudget(
+            pathlib.Path(tmp) / "budget.json", Limit(per_minute=600), tokens_per_minute=10000,
+        )
+        try:
+            for _ in range(2):
+                try:
+                    game_master.call_llm(None, "haiku", MESSAGES, use_nvidia=False, schema_key="response",
+                                         use_claude=True, max_tokens=2000)
+                except RuntimeError:
+                    pass
+            stats = game_master.shared_budget_stats()
+        finally:
+            game_master.SHARED_BUDGET = None
+            game_master.call_claude = call_claude
+    assert stats["calls"] == 2 and stats["estimated_tokens"] == 2 * 2100, stats
+    assert stats["settled_tokens"] == 100 + len("RICO, no question.") // 4, stats
+    print("claude settles OK")
+
+
+if __name__ == "__main__":
+    test_games_take_turns()
+    test_tokens_settle()
+    test_dead_game_pruned()
+    test_async_wait_off_loop()
+    test_call_llm_settles()
+    test_claude_settles()
+    print("ok")
@@ -0,0 +1,196 @@
+"""Checks for --stream-names: a name-only reply is cut at its first sentence
+that names exactly one target, over both the OpenAI-compatible stream and the
+CLI's stream-json, and the generation behind it really stops.
+
+The server is a tiny local HTTP handler that streams a long reply slowly and
+counts how much of it went out; the CLI is a stand-in `claude` on PATH.
+
+    python tools/test_streaming.py
+"""
+import asyncio
+import json
+import os
+import pathlib
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from openai import AsyncOpenAI, OpenAI  # noqa: E402
+
+import mafia.game_master as game_master  # noqa: E402
+from mafia.game import MafiaGame  # noqa: E402
+
+TARGETS = ["RICO", "SAGE", "DR. VANCE", "AMBASSADOR SILVA"]
+REPLY = "RICO. He dodged every question SAGE asked him today, and" + " he kept changing the subject" * 6
+MESSAGES = [{"role": "system", "content": "sys"}, {"role": "user", "content": "Vote."}]
+
+
+def name_stop(**kwargs):
+    game = object.__new__(MafiaGame)
+    game.stream_names = True
+    return game._name_stop(TARGETS, **kwargs)
+
+
+def test_name_stop():
+    stop = name_stop()
+    assert stop("RIC") is None
+    assert stop("I vote for RICO") is None  # sentence still being written
+    assert stop("RICO. SAGE") == "RICO."
+    assert stop("DR.") is None  # "dr" names nobody
+    assert stop("DR. VANCE.") == "DR. VANCE."
+    assert stop("RICO or SAGE, hard to say.") is None
+    assert stop("SILVA!") == "SILVA!"
+    assert name_stop(no_kill=True)("NO_KILL.") == "NO_KILL."
+    assert stop("NO_KILL.") is None
+    game = object.__new__(MafiaGame)
+    game.stream_names = False
+    assert game._name_stop(TARGETS) is None
+    print("name stop OK")
+
+
+def serve_stream(schema):
+    """A chat-completions server that streams REPLY a few characters per
+    chunk; `sent` counts the chunks that reached the socket."""
+    sent = []
+    text = json.dumps({"response": REPLY}) if schema else REPLY
+    pieces = [text[i:i + 4] for i in range(0, len(text), 4)]
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            assert body["stream"] is True
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            chunks = [
+                {"choices": [{"index": 0, "delta": {"reasoning_content": "thinking about RICO and SAGE"}}]}
+            ] + [
+                {"choices": [{"index": 0, "delta": {"content": piece}}]} for piece in pieces
+            ] + [
+                {"choices": [], "usage": {"prompt_tokens": 5, "completion_tokens": 60, "total_tokens": 65}}
+            ]
+            try:
+                for chunk in chunks:
+                    chunk.update(id="x", object="chat.completion.chunk", created=0, model="m")
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                    self.wfile.flush()
+                    sent.append(chunk)
+                    time.sleep(0.01)
+                self.wfile.write(b"data: [DONE]\n\n")
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/v1", sent, len(pieces) + 2
+
+
+def test_openai_stream():
+    for schema in (True, False):
+        server, url, sent, total = serve_stream(schema)
+        try:
+            before = len(game_master.STREAMED_CALLS)
+            reply = game_master.call_llm(
+                OpenAI(base_url=url, api_key="x"), "m", MESSAGES,
+                use_nvidia=not schema, schema_key="response", private_reasoning=True,
+                early_stop=name_stop(),
+            )
+            time.sleep(0.2)  # let the server notice the hang-up
+        finally:
+            server.shutdown()
+        assert reply == "RICO.", reply
+        assert game_master.STREAMED_CALLS[before:] == [True]
+        assert len(sent) < total / 2, (len(sent), total)
+    print(f"openai stream cut OK ({len(sent)} of {total} chunks sent)")
+
+
+def test_openai_stream_async():
+    server, url, sent, total = serve_stream(True)
+    stop = name_stop()
+
+    async def ask():
+        client = AsyncOpenAI(base_url=url, api_key="x")
+        try:
+            # Nothing names exactly one target: the stream runs to the end
+            full = await game_master.call_llm_async(
+                client, "m", MESSAGES, use_nvidia=False, schema_key="response",
+                private_reasoning=True, early_stop=lambda text: None,
+            )
+            cut = await game_master.call_llm_async(
+                client, "m", MESSAGES, use_nvidia=False, schema_key="response",
+                private_reasoning=True, early_stop=stop,
+            )
+        finally:
+            await client.close()
+        return full, cut
+
+    try:
+        full, cut = asyncio.run(ask())
+    finally:
+        server.shutdown()
+    assert full == REPLY, full
+    assert cut == "RICO.", cut
+    print("async openai stream OK")
+
+
+FAKE_CLAUDE = """#!{python}
+import json, sys, time
+reply = {reply!r}
+print(json.dumps({{"type": "system", "subtype": "init", "model": "claude-haiku-9"}}), flush=True)
+if "--input-format" in sys.argv:
+    sys.stdin.readline()
+for i in range(0, len(reply), 4):
+    event = {{"type": "content_block_delta", "delta": {{"type": "text_delta", "text": reply[i:i + 4]}}}}
+    print(json.dumps({{"type": "stream_event", "event": event}}), flush=True)
+    time.sleep(0.01)
+open({finished!r}, "w").close()
+print(json.dumps({{"type": "result", "is_error": False, "duration_api_ms": 50, "result": reply,
+                  "modelUsage": {{"claude-haiku-9": {{}}}}}}), flush=True)
+"""
+
+
+def test_claude_stream():
+    with tempfile.TemporaryDirectory() as tmp:
+        finished = pathlib.Path(tmp) / "finished"
+        fake = pathlib.Path(tmp) / "claude"
+        fake.write_text(FAKE_CLAUDE.format(python=sys.executable, reply=REPLY, finished=str(finished)))
+        fake.chmod(0o755)
+        original_path = os.environ["PATH"]
+        os.environ["PATH"] = f"{tmp}{os.pathsep}{original_path}"
+        try:
+            one_shot = game_master.call_claude("haiku-test", MESSAGES, early_stop=name_stop())
+            assert game_master.RESOLVED_CLAUDE_MODELS.pop("haiku-test") == "claude-haiku-9"
+            on_loop = asyncio.run(game_master.call_claude_async("haiku-test", MESSAGES, early_stop=name_stop()))
+            pool = game_master.use_claude_pool(1)
+            try:
+                pooled = game_master.call_claude("haiku-test", MESSAGES, early_stop=name_stop())
+            finally:
+                pool.close()
+                game_master.CLAUDE_POOL = None
+            time.sleep(0.5)
+            assert not finished.exists(), "a cut-short claude ran to the end"
+            whole = game_master.call_claude("haiku-test", MESSAGES, early_stop=lambda text: None)
+            assert finished.exists()
+        finally:
+            os.environ["PATH"] = original_path
+    assert one_shot == on_loop == pooled == "RICO.", (one_shot, on_loop, pooled)
+    assert whole == REPLY, whole
+    print("claude stream-json cut OK")
+
+
+if __name__ == "__main__":
+    test_name_stop()
+    test_openai_stream()
+    test_openai_stream_async()
+    test_claude_stream()
+    print("ok")
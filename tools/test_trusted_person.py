@@ -17,8 +17,8 @@ NAMES = ["RICO", "ARIA", "SAGE", "HOLMES", "MARSHAL",
 
 def run(mafia_count, seed):
     """ponytail: bare instance, assign_roles only touches these attrs."""
-    random.seed(seed)
     g = object.__new__(MafiaGame)
+    g.rng = random.Random(seed)
     g.players = [Player(name=n) for n in NAMES]
     g.mafia_count = mafia_count
     g.trusted_person = None
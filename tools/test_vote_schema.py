@@ -0,0 +1,77 @@
+"""Checks for the enum vote schema: name-only calls to LM Studio send a schema
+whose field is an enum of the valid targets (cached per target list), NVIDIA
+still gets none, and a game decoded against it never casts a defaulted vote.
+
+    python tools/test_vote_schema.py
+"""
+import json
+import pathlib
+import random
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+import mafia.game_master as game_master  # noqa: E402
+from mafia.game import MafiaGame  # noqa: E402
+from make_sample_log import accusation, fake_client  # noqa: E402
+
+MESSAGES = [{"role": "system", "content": "sys"}, {"role": "user", "content": "Vote."}]
+
+
+def recording_client(sent, answer):
+    def reply(kwargs):
+        sent.append(kwargs)
+        return answer(kwargs)
+
+    return fake_client(reply)
+
+
+def enum_of(kwargs):
+    field = kwargs["response_format"]["json_schema"]["schema"]["properties"]["response"]
+    return field.get("enum")
+
+
+def test_schema_cached_per_targets():
+    first = game_master._schema("response", ("RICO", "SAGE"))
+    assert first is game_master._schema("response", ("RICO", "SAGE"))
+    assert first is not game_master._schema("response", ("SAGE", "RICO"))
+    assert game_master._schema("response")["json_schema"]["schema"]["properties"]["response"] == {"type": "string"}
+
+    sent = []
+    client = recording_client(sent, lambda kwargs: json.dumps({"response": "SAGE"}))
+    reply = game_master.call_llm(client, "m", MESSAGES, use_nvidia=False, schema_key="response",
+                                 choices=["RICO", "SAGE"])
+    game_master.call_llm(client, "m", MESSAGES, use_nvidia=True, schema_key="response",
+                         choices=["RICO", "SAGE"])
+    assert reply == "SAGE"
+    assert enum_of(sent[0]) == ["RICO", "SAGE"]
+    assert "response_format" not in sent[1]
+    print("schema cached per target list OK")
+
+
+def test_game_never_defaults():
+    random.seed(7)
+    game = MafiaGame(player_count=8, gm_enabled=False, max_workers=1)
+    sent = []
+    rng = random.Random(7)
+
+    def answer(kwargs):
+        # Constrained decoding: the model can only emit one of the enum
+        choices = enum_of(kwargs)
+        if choices:
+            return json.dumps({"response": rng.choice(choices)})
+        return accusation(rng.choice([p.name for p in game.get_alive_players()]))
+
+    game._lm_client = recording_client(sent, answer)
+    game.run()
+    votes = [e for e in game.events.to_list() if e["type"] == "vote"]
+    assert votes and not any(e.get("defaulted") for e in votes), votes
+    pinned = [kwargs for kwargs in sent if enum_of(kwargs)]
+    assert pinned, "no call was constrained"
+    print(f"game OK ({len(votes)} votes, {len(pinned)} of {len(sent)} calls pinned to an enum)")
+
+
+if __name__ == "__main__":
+    test_schema_cached_per_targets()
+    test_game_never_defaults()
+    print("ok")
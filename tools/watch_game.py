@@ -0,0 +1,48 @@
+"""Follow a game while it is being played, from its event stream.
+
+Usage:
+    python tools/watch_game.py                         # ./game_log.events.jsonl
+    python tools/watch_game.py runs/2026-07-28-1930.events.jsonl
+    python tools/watch_game.py --events --since 120    # raw events from #120 on
+
+Prints the public console lines as the game writes them (mafia/eventsink.py)
+and stops when the game ends. Waits for the file if the game has not started.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from mafia.eventsink import default_path, tail
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Follow a running game")
+    parser.add_argument(
+        "path", nargs="?", default=str(default_path(REPO_ROOT / "game_log.json")),
+        help="The game's .events.jsonl (default: the one next to game_log.json)",
+    )
+    parser.add_argument("--events", action="store_true", help="Print events as JSON instead of the console")
+    parser.add_argument("--since", type=int, default=0, help="Start at this event number")
+    parser.add_argument(
+        "--secrets", action="store_true",
+        help="Also print the private console lines (roles, night actions)",
+    )
+    args = parser.parse_args()
+
+    for record in tail(args.path, since=args.since):
+        if args.events:
+            if "event" in record and "amend" not in record:
+                print(json.dumps({"seq": record["seq"], **record["event"]}, ensure_ascii=False))
+        elif "log" in record and (record["public"] or args.secrets):
+            print(record["log"])
+        if "end" in record:
+            print(f"\n🏁 Game over on day {record['end']['day']}")
+
+
+if __name__ == "__main__":
+    main()
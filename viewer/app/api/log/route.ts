@@ -1,10 +1,13 @@
-import { readFile } from "node:fs/promises";
+import { readFile, stat } from "node:fs/promises";
 import path from "node:path";
 import { NextResponse } from "next/server";
 
 // The bridge between the engine and the viewer. The Python game writes
 // ../game_log.json (repo root); this route reads it fresh on every request and
 // falls back to the bundled sample so the viewer always has something to show.
+// While a game is running, its events stream to ../game_log.events.jsonl
+// (mafia/eventsink.py); when that is newer than game_log.json, the events so
+// far are served from it, so re-fetching follows the game.
 export const dynamic = "force-dynamic";
 
 async function tryRead(p: string) {
@@ -17,10 +20,49 @@ async function tryRead(p: string) {
   return null;
 }
 
+async function mtime(p: string) {
+  try {
+    return (await stat(p)).mtimeMs;
+  } catch {
+    return null;
+  }
+}
+
+// The events of a game still being written, in game_log.json's shape.
+// Mirrors compact() in mafia/eventsink.py, events only.
+async function tryReadLive(p: string) {
+  let text: string;
+  try {
+    text = await readFile(p, "utf8");
+  } catch {
+    return null;
+  }
+  const events: unknown[] = [];
+  for (const line of text.split("\n")) {
+    let record: { event?: unknown; amend?: number };
+    try {
+      record = JSON.parse(line);
+    } catch {
+      continue; // blank, or the line the game is still writing
+    }
+    if (typeof record.amend === "number") events[record.amend] = record.event;
+    else if (record.event) events.push(record.event);
+  }
+  return events.length > 0 ? { events } : null;
+}
+
 export async function GET() {
   const root = path.join(process.cwd(), "..", "game_log.json");
+  const live = path.join(process.cwd(), "..", "game_log.events.jsonl");
   const sample = path.join(process.cwd(), "public", "logs", "sample.json");
 
+  const liveAt = await mtime(live);
+  const rootAt = await mtime(root);
+  if (liveAt !== null && (rootAt === null || liveAt > rootAt)) {
+    const running = await tryReadLive(live);
+    if (running) return NextResponse.json({ source: "game", live: true, log: running });
+  }
+
   const game = await tryRead(root);
   if (game) return NextResponse.json({ source: "game", log: game });
 
@@ -12,16 +12,38 @@ import { SKIN_COMPONENTS } from "@/components/EpisodePlayer";
 export default function Viewer() {
   const [events, setEvents] = useState<GameEvent[] | null>(null);
   const [error, setError] = useState<string | null>(null);
-  const [source, setSource] = useState<"game" | "sample" | "upload" | null>(null);
+  const [source, setSource] = useState<"game" | "sample" | "upload" | "live" | null>(null);
   const [skin, setSkin] = useState<SkinId>("chat");
   const fileInput = useRef<HTMLInputElement>(null);
 
   // Load whatever the engine last wrote (../game_log.json), else the sample.
+  // With ?live=http://127.0.0.1:PORT, follow a game started with
+  // `python main.py --serve PORT` instead (mafia/liveserver.py).
   useEffect(() => {
+    const live = new URLSearchParams(window.location.search).get("live");
+    if (live) return followLive(live);
     loadFromServer();
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, []);
 
+  function followLive(url: string) {
+    setSource("live");
+    setEvents([]);
+    // EventSource reconnects by itself, sending Last-Event-ID, so a dropped
+    // connection resumes after the last event instead of starting over
+    const stream = new EventSource(`${url.replace(/\/$/, "")}/events`);
+    stream.onmessage = (m) => {
+      const event = JSON.parse(m.data) as GameEvent;
+      setEvents((prev) => [...(prev ?? []), event]);
+    };
+    stream.addEventListener("amend", (m) => {
+      const { seq, event } = JSON.parse((m as MessageEvent).data) as { seq: number; event: GameEvent };
+      setEvents((prev) => (prev ? prev.map((e, i) => (i === seq ? event : e)) : prev));
+    });
+    stream.addEventListener("end", () => stream.close());
+    return () => stream.close();
+  }
+
   function loadFromServer() {
     fetch("/api/log", { cache: "no-store" })
       .then((r) => (r.ok ? r.json() : Promise.reject()))
@@ -79,11 +101,17 @@ export default function Viewer() {
         )}
         {source && (
           <span
-            className={`source-badge${source === "game" ? " live" : ""}`}
+            className={`source-badge${source === "game" || source === "live" ? " live" : ""}`}
             title="Where this replay came from"
           >
             <span className="dot" />
-            {source === "game" ? "latest game" : source === "sample" ? "bundled sample" : "uploaded file"}
+            {source === "live"
+              ? "live game"
+              : source === "game"
+                ? "latest game"
+                : source === "sample"
+                  ? "bundled sample"
+                  : "uploaded file"}
           </span>
         )}
         <button className="menu-btn" onClick={loadFromServer} title="Reload ../game_log.json from the engine">
@@ -64,8 +64,17 @@ export function useReplay(
   const [speed, setSpeed] = useState<Speed>(initialSpeed);
   const timer = useRef<ReturnType<typeof setTimeout> | null>(null);
 
-  // Reset when the log changes.
+  // Reset when the log changes. A live game only grows (an amend rewrites
+  // game_start in place), so keep the place when the new list extends the old.
+  const previous = useRef<GameEvent[]>([]);
   useEffect(() => {
+    const before = previous.current;
+    previous.current = events;
+    const grew =
+      before.length > 0 &&
+      events.length >= before.length &&
+      events[before.length - 1] === before[before.length - 1];
+    if (grew) return;
     setCursor(0);
     setPlaying(autoplay);
     // eslint-disable-next-line react-hooks/exhaustive-deps